@@ -0,0 +1,196 @@
+# The MIT License (MIT)
+# Copyright (c) 2014-2017 University of Bristol
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+# DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+# OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+Benchmark of the cold start time of HyperStream() against a synthetic database of stream definitions, plates and
+workflows. The database is populated once, and HyperStream is then started in a fresh process for each repeat,
+reporting the import time and the time taken by each phase of the initialisation (see HyperStream.startup_profile).
+
+This requires the mongo server given in hyperstream_config.json. The synthetic data is written to a separate database
+(--db), which is dropped afterwards unless --keep is given. With --budget, the script exits with an error if the median
+total start time exceeds the budget, so that it can be used to catch regressions.
+
+Usage:
+    python benchmarks/startup.py --streams 100000 --plates 10 --workflows 100 --repeat 3 --budget 5
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+ROOT = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+
+def write_config(db, lazy_workflows):
+    """
+    Write a copy of the configuration that points at the benchmark database
+
+    :param db: The database name
+    :param lazy_workflows: Whether the workflows are loaded lazily
+    :return: The configuration file name
+    """
+    with open(os.path.join(ROOT, "hyperstream_config.json")) as f:
+        config = json.load(f)
+    config["mongo"]["db"] = db
+    config["lazy_workflows"] = lazy_workflows
+    fd, filename = tempfile.mkstemp(suffix=".json", prefix="hyperstream_startup_")
+    with os.fdopen(fd, "w") as f:
+        json.dump(config, f)
+    return filename
+
+
+def start(config_filename):
+    from hyperstream import HyperStream
+    return HyperStream(loglevel=logging.CRITICAL, file_logger=False, console_logger=False, mqtt_logger=None,
+                       config_filename=config_filename)
+
+
+def populate(config_filename, n_streams, n_plates, n_workflows, plate_size=10, batch_size=10000):
+    """
+    Populate the benchmark database
+
+    :param config_filename: The configuration file name
+    :param n_streams: The number of (mongo) stream definitions
+    :param n_plates: The number of plates, each with its own meta data
+    :param n_workflows: The number of workflows (one in ten of which are online)
+    :param plate_size: The number of values per plate
+    :param batch_size: The number of stream definitions per bulk insert
+    """
+    from mongoengine.context_managers import switch_db
+    from hyperstream.models import StreamDefinitionModel, TimeIntervalModel
+    from hyperstream.stream import StreamId
+    from hyperstream.utils import UTC
+
+    hs = start(config_filename)
+
+    for i in range(n_plates):
+        tag = "benchmark_{}".format(i)
+        for j in range(plate_size):
+            hs.plate_manager.meta_data_manager.insert(
+                tag=tag, identifier="{}_{}".format(tag, j), parent="root", data=str(j))
+        hs.plate_manager.create_plate(
+            plate_id=tag, description=tag, meta_data_id=tag, values=[], complement=True, parent_plate=None)
+
+    t1 = datetime(2016, 1, 1, tzinfo=UTC)
+    intervals = [TimeIntervalModel(start=t1 + timedelta(days=d), end=t1 + timedelta(days=d, hours=1)) for d in range(3)]
+    with switch_db(StreamDefinitionModel, "hyperstream"):
+        collection = StreamDefinitionModel._get_collection()
+        for offset in range(0, n_streams, batch_size):
+            collection.insert_many([StreamDefinitionModel(
+                stream_id=StreamId("benchmark", (("stream", str(k)),)).as_dict(),
+                channel_id="mongo",
+                last_updated=t1,
+                calculated_intervals=intervals
+            ).to_mongo() for k in range(offset, min(offset + batch_size, n_streams))])
+
+    for i in range(n_workflows):
+        workflow_id = "benchmark_{}".format(i)
+        with hs.create_workflow(workflow_id=workflow_id, name=workflow_id, owner="benchmark",
+                                description="Startup benchmark workflow", online=i % 10 == 0) as w:
+            ticker = w.create_node("benchmark_ticker_{}".format(i), hs.channel_manager.memory, None)
+            w.create_factor(hs.tools.clock(), sources=[], sink=ticker)
+        hs.workflow_manager.commit_workflow(workflow_id)
+
+    return hs
+
+
+def measure(config_filename):
+    """
+    Start HyperStream in this process and print the startup profile (including the import time) as json
+
+    :param config_filename: The configuration file name
+    """
+    t = time.time()
+    import hyperstream
+    import_time = time.time() - t
+
+    profile = dict(start(config_filename).startup_profile)
+    phases = OrderedDict([("import", import_time)])
+    phases.update(profile["phases"])
+    profile["phases"] = phases
+    profile["total"] += import_time
+    print(json.dumps(profile))
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main(args):
+    config_filename = write_config(args.db, args.lazy)
+    hs = None
+    try:
+        if not args.skip_populate:
+            print("Populating {} with {} streams, {} plates and {} workflows".format(
+                args.db, args.streams, args.plates, args.workflows))
+            t = time.time()
+            hs = populate(config_filename, args.streams, args.plates, args.workflows)
+            print("  populated in {:.1f} s".format(time.time() - t))
+
+        profiles = []
+        for _ in range(args.repeat):
+            output = subprocess.check_output([sys.executable, os.path.realpath(__file__), "--measure", config_filename],
+                                             cwd=ROOT)
+            profiles.append(json.loads(output.decode("utf-8").strip().splitlines()[-1], object_pairs_hook=OrderedDict))
+
+        print("Cold start (median of {}, lazy workflows {})".format(args.repeat, args.lazy))
+        print("  counts: {}".format(", ".join("{} {}".format(k, v) for k, v in sorted(profiles[0]["counts"].items()))))
+        for phase in profiles[0]["phases"]:
+            print("  {:<32} {:>12.3f} s".format(phase, median(p["phases"][phase] for p in profiles)))
+        total = median(p["total"] for p in profiles)
+        print("  {:<32} {:>12.3f} s".format("total", total))
+    finally:
+        if hs is not None and not args.keep:
+            hs.client.client.drop_database(args.db)
+        os.remove(config_filename)
+
+    if args.budget is not None and total > args.budget:
+        print("Start time {:.3f} s exceeds the budget of {:.3f} s".format(total, args.budget))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=10000, help="Number of stream definitions")
+    parser.add_argument("--plates", type=int, default=10, help="Number of plates")
+    parser.add_argument("--workflows", type=int, default=100, help="Number of workflows")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of cold starts")
+    parser.add_argument("--db", default="hyperstream_startup_benchmark", help="Name of the benchmark database")
+    parser.add_argument("--lazy", action="store_true", help="Load the workflows lazily")
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark database afterwards")
+    parser.add_argument("--skip-populate", action="store_true", help="Use the existing benchmark database")
+    parser.add_argument("--budget", type=float, default=None, help="Maximum median total start time (seconds)")
+    parser.add_argument("--measure", metavar="CONFIG", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        measure(args.measure)
+    else:
+        main(args)
@@ -0,0 +1,78 @@
+# The MIT License (MIT)
+# Copyright (c) 2014-2017 University of Bristol
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+# DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+# OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+Benchmark of the histogram and percentile functions (as used by the HistogramFromList and PercentilesFromList tools),
+comparing the numpy implementations against the pure python fallbacks on large documents.
+
+Usage:
+    python benchmarks/statistics.py --sizes 1000 1000000
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+
+from hyperstream.utils.statistics.histogram import histogram_numpy, histogram_python
+from hyperstream.utils.statistics.percentile import percentile_values_numpy, percentile_values_python
+
+
+def bench(label, func, number):
+    best = min(timeit.repeat(func, number=number, repeat=3)) / number
+    print("  {:<32} {:>12.3f} ms".format(label, best * 1000))
+    return best
+
+
+def main(sizes, number):
+    # The default bins and percentiles of the tools
+    breaks = [-float('inf')] + list(range(101)) + [float('inf')]
+    quantiles = [i / 100.0 for i in range(101)]
+
+    for n in sizes:
+        rng = random.Random(n)
+        document = [rng.gauss(50, 25) for _ in range(n)]
+        print("n = {}".format(n))
+
+        # Check that the results agree before timing
+        assert histogram_numpy(document, breaks) == histogram_python(document, breaks)
+        assert percentile_values_numpy(document, quantiles) == percentile_values_python(document, quantiles)
+
+        python_time = bench("histogram (python)", lambda: histogram_python(document, breaks), number)
+        numpy_time = bench("histogram (numpy)", lambda: histogram_numpy(document, breaks), number)
+        print("  {:<32} {:>12.1f} x".format("speedup", python_time / numpy_time))
+
+        python_time = bench("percentiles (python)", lambda: percentile_values_python(document, quantiles), number)
+        numpy_time = bench("percentiles (numpy)", lambda: percentile_values_numpy(document, quantiles), number)
+        print("  {:<32} {:>12.1f} x".format("speedup", python_time / numpy_time))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 1000000],
+                        help="Numbers of elements per document")
+    parser.add_argument("--number", type=int, default=1, help="Number of executions per timing")
+    args = parser.parse_args()
+    main(args.sizes, args.number)
@@ -0,0 +1,143 @@
+# The MIT License (MIT)
+# Copyright (c) 2014-2017 University of Bristol
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+# DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+# OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+Micro-benchmark of the TimeIntervals set operations against the previous split/set/compress implementation.
+
+Usage:
+    python benchmarks/time_intervals.py --sizes 100 1000 10000
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+
+from hyperstream import TimeInterval, TimeIntervals
+from hyperstream.utils import UTC
+
+
+class LegacyTimeIntervals(object):
+    """
+    The previous implementation of the union and difference operations, kept here for reference
+    """
+    def __init__(self, intervals):
+        self.intervals = [TimeInterval(i.start, i.end) for i in intervals]
+
+    def split(self, points):
+        # Iterative version of the recursive split (which exceeds the recursion limit on large inputs)
+        for p in reversed(points):
+            for i in range(len(self.intervals)):
+                interval = self.intervals[i]
+                if (interval.start < p) and (interval.end > p):
+                    self.intervals = self.intervals[:i] \
+                                     + [TimeInterval(interval.start, p), TimeInterval(p, interval.end)] \
+                                     + self.intervals[(i + 1):]
+
+    def compress(self):
+        if len(self.intervals) == 0:
+            return
+        v = self.intervals[:1]
+        for i in range(1, len(self.intervals)):
+            if self.intervals[i].start == v[-1].end:
+                v[-1] = TimeInterval(v[-1].start, self.intervals[i].end)
+            else:
+                v.append(self.intervals[i])
+        self.intervals = v
+
+    def _combine(self, other, op):
+        self_points = [point for interval in self.intervals for point in (interval.start, interval.end)]
+        other_points = [point for interval in other.intervals for point in (interval.start, interval.end)]
+        self.split(other_points)
+        other.split(self_points)
+        v = list(op(set(self.intervals), set(other.intervals)))
+        v.sort(key=lambda ii: ii.start)
+        new = LegacyTimeIntervals(v)
+        self.compress()
+        other.compress()
+        new.compress()
+        return new
+
+    def __add__(self, other):
+        return self._combine(other, set.union)
+
+    def __sub__(self, other):
+        return self._combine(other, set.difference)
+
+
+def random_intervals(n, seed):
+    """
+    Generate n disjoint intervals with random gaps and widths (in seconds)
+    """
+    rng = random.Random(seed)
+    start = datetime(2017, 1, 1, tzinfo=UTC)
+    intervals = []
+    t = start
+    for _ in range(n):
+        t += timedelta(seconds=rng.randint(1, 100))
+        end = t + timedelta(seconds=rng.randint(1, 100))
+        intervals.append(TimeInterval(t, end))
+        t = end
+    return intervals
+
+
+def bench(label, func, number):
+    best = min(timeit.repeat(func, number=number, repeat=3)) / number
+    print("  {:<32} {:>12.3f} ms".format(label, best * 1000))
+    return best
+
+
+def main(sizes, legacy_max, number):
+    for n in sizes:
+        a = random_intervals(n, seed=1)
+        b = random_intervals(n, seed=2)
+        x, y = TimeIntervals(a), TimeIntervals(b)
+        print("n = {}".format(n))
+        bench("TimeIntervals union", lambda: x + y, number)
+        bench("TimeIntervals intersection", lambda: x & y, number)
+        bench("TimeIntervals difference", lambda: x - y, number)
+        bench("TimeIntervals [interval] - set", lambda: TimeIntervals([TimeInterval(x.start, x.end)]) - y, number)
+
+        if n > legacy_max:
+            print("  (legacy implementation skipped, use --legacy-max {} to include it)".format(n))
+            continue
+
+        # Check that the results agree before timing
+        assert list(x + y) == (LegacyTimeIntervals(a) + LegacyTimeIntervals(b)).intervals
+        assert list(x - y) == (LegacyTimeIntervals(a) - LegacyTimeIntervals(b)).intervals
+
+        bench("legacy union", lambda: LegacyTimeIntervals(a) + LegacyTimeIntervals(b), 1)
+        bench("legacy difference", lambda: LegacyTimeIntervals(a) - LegacyTimeIntervals(b), 1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="Numbers of intervals")
+    parser.add_argument("--legacy-max", type=int, default=1000,
+                        help="Largest size for which to run the (quadratic) legacy implementation")
+    parser.add_argument("--number", type=int, default=10, help="Number of executions per timing")
+    args = parser.parse_args()
+    main(args.sizes, args.legacy_max, args.number)
@@ -26,7 +26,7 @@ from .channels import ChannelManager
 from .hyperstream import HyperStream
 from .online_engine import OnlineEngine
 from .stream import StreamId, Stream, StreamInstance, StreamMetaInstance, DatabaseStream, StreamDict, \
-    StreamInstanceCollection, StreamView
+    StreamInstanceCollection, StreamInstanceArray, StreamView
 from .time_interval import TimeInterval, TimeIntervals, RelativeTimeInterval
 from .tool import Tool, MultiOutputTool, AggregateTool, SelectorTool, PlateCreationTool
 from .utils import MIN_DATE, UTC, StreamNotAvailableError, StreamAlreadyExistsError, StreamDataNotAvailableError, \
@@ -18,7 +18,7 @@
 #  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
 #  OR OTHER DEALINGS IN THE SOFTWARE.
 from .base_channel import BaseChannel
-from .memory_channel import MemoryChannel, ReadOnlyMemoryChannel
+from .memory_channel import MemoryChannel, ArrayMemoryChannel, ReadOnlyMemoryChannel
 from .tool_channel import ToolChannel
 from .file_channel import FileChannel
 from .module_channel import ModuleChannel
@@ -178,6 +178,16 @@ class BaseChannel(Printable):
         """
         raise NotImplementedError
 
+    def flush_stream(self, stream):
+        """
+        Writes out any documents that the stream writer has buffered for the stream. Channels that write documents
+        immediately do not need to override this.
+
+        :param stream: The stream
+        :return: None
+        """
+        pass
+
     def __str__(self):
         s = self.__class__.__name__ + ' with ID: ' + str(self.channel_id)
         s += ' and containing {} streams:'.format(len(self.streams))
@@ -31,7 +31,7 @@ from six import string_types
 
 from hyperstream.models import StreamDefinitionModel
 from hyperstream.stream import StreamId, DatabaseStream, AssetStream
-from hyperstream.utils import Printable, utcnow, MIN_DATE, StreamAlreadyExistsError, ChannelNotFoundError, \
+from hyperstream.utils import Printable, utcnow, StreamAlreadyExistsError, ChannelNotFoundError, \
     ToolNotFoundError, ChannelAlreadyExistsError, ToolInitialisationError
 from hyperstream.channels import ToolChannel, MemoryChannel, DatabaseChannel, AssetsChannel, AssetsFileChannel
 
@@ -40,7 +40,19 @@ class ChannelManager(dict, Printable):
     """
     Container for channels.
     """
-    def __init__(self, plugins, **kwargs):
+    # The fields of the stream definitions that are read at startup. The calculated intervals (which can be long) are
+    # only read when a stream is first accessed
+    stream_definition_fields = ('stream_id', 'stream_type', 'channel_id', 'last_updated', 'last_accessed', 'sandbox')
+
+    def __init__(self, plugins, write_batch_size=None, coalesce_calculated_intervals=False, **kwargs):
+        """
+        Initialise the channel manager
+
+        :param plugins: The plugins
+        :param write_batch_size: The bulk write batch size for the mongo channel (None writes documents one at a time)
+        :param coalesce_calculated_intervals: Whether the mongo channel defers writing calculated intervals until the
+        streams are flushed
+        """
         super(ChannelManager, self).__init__(**kwargs)
 
         # See this answer http://stackoverflow.com/a/14620633 for why we do the following:
@@ -50,7 +62,8 @@ class ChannelManager(dict, Printable):
 
         self.tools = ToolChannel("tools", tool_path, up_to_timestamp=utcnow())
         self.memory = MemoryChannel("memory")
-        self.mongo = DatabaseChannel("mongo")
+        self.mongo = DatabaseChannel("mongo", write_batch_size=write_batch_size,
+                                     coalesce_calculated_intervals=coalesce_calculated_intervals)
         self.assets = AssetsChannel("assets")
 
         for plugin in plugins:
@@ -96,29 +109,28 @@ class ChannelManager(dict, Printable):
 
     def update_channels(self):
         """
-        Pulls out all of the stream definitions from the database, and populates the channels with stream references
+        Pulls out all of the stream definitions from the database, and populates the channels with stream references.
+
+        The definitions are read with a single projected query, and kept as raw documents. Database streams are only
+        constructed (and their calculated intervals read) when they are first accessed.
         """
         logging.info("Updating channels")
         with switch_db(StreamDefinitionModel, 'hyperstream'):
-            for s in StreamDefinitionModel.objects():
-                try:
-                    stream_id = StreamId(name=s.stream_id.name, meta_data=s.stream_id.meta_data)
-                except AttributeError as e:
-                    raise e
+            documents = StreamDefinitionModel._get_collection().find({}, projection=self.stream_definition_fields)
+
+            for document in documents:
+                stream_id = StreamId(name=document['stream_id']['name'],
+                                     meta_data=document['stream_id'].get('meta_data'))
                 logging.debug("Processing {}".format(stream_id))
 
                 try:
                     # This can fail if a plugin has been defined by a different instantiation of HyperStream on the same
                     # database.
-                    channel = self.get_channel(s.channel_id)
+                    channel = self.get_channel(document.get('channel_id'))
                 except ChannelNotFoundError as e:
                     logging.warn(e)
                     continue
 
-                # calculated_intervals = TimeIntervals(map(lambda x: (x.start, x.end), s.calculated_intervals))
-                last_accessed = utcnow()
-                last_updated = s.last_updated if s.last_updated else utcnow()
-
                 if stream_id in channel.streams:
                     if isinstance(channel, (AssetsChannel, AssetsFileChannel)):
                         continue
@@ -133,26 +145,51 @@ class ChannelManager(dict, Printable):
                     else:
                         stream_type = DatabaseStream
 
-                    channel.streams[stream_id] = stream_type(
-                        channel=channel,
-                        stream_id=stream_id,
-                        calculated_intervals=None,  # Not required since it's initialised from mongo_model in __init__
-                        last_accessed=last_accessed,
-                        last_updated=last_updated,
-                        sandbox=s.sandbox,
-                        mongo_model=s
-                    )
+                    channel.streams.add_lazy(stream_id, self._stream_loader(stream_type, channel, stream_id, document))
                 else:
                     logging.warn("Unable to parse stream {}".format(stream_id))
 
-    def get_tool_class(self, tool):
+    @staticmethod
+    def _stream_loader(stream_type, channel, stream_id, document):
         """
-        Gets the actual class which can then be instantiated with its parameters
+        Get a function that constructs the stream from its raw stream definition document, reading its calculated
+        intervals
+
+        :param stream_type: The stream class
+        :param channel: The channel
+        :param stream_id: The stream id
+        :param document: The raw stream definition
+        :return: The loader function
+        """
+        def load():
+            with switch_db(StreamDefinitionModel, 'hyperstream'):
+                intervals = StreamDefinitionModel._get_collection().find_one(
+                    {'_id': document['_id']}, projection=('calculated_intervals', ))
+                if intervals and 'calculated_intervals' in intervals:
+                    document['calculated_intervals'] = intervals['calculated_intervals']
+                mongo_model = StreamDefinitionModel._from_son(document)
+            return stream_type(
+                channel=channel,
+                stream_id=stream_id,
+                calculated_intervals=None,  # Not required since it's initialised from mongo_model in __init__
+                last_accessed=utcnow(),
+                last_updated=mongo_model.last_updated if mongo_model.last_updated else utcnow(),
+                sandbox=mongo_model.sandbox,
+                mongo_model=mongo_model
+            )
+        return load
+
+    def get_tool_entry(self, tool, version=None, as_of=None):
+        """
+        Gets the cache entry for the tool, resolving the tool class from the tool channel(s) if it is not cached. The
+        entries are cached in the tool channel, keyed by the tool id, version and timestamp, and are resolved again when
+        the modification time of the directory of the tool (or the channel's up to timestamp) changes.
 
         :param tool: The tool name or id
+        :param version: The string representation of the version (None for the latest version)
+        :param as_of: Resolve the latest version as of this timestamp (None for the channel's up to timestamp)
         :type tool: str | unicode | StreamId
-        :rtype: Tool | MultiOutputTool
-        :return: The tool class
+        :return: The cache entry, a dict containing the tool_class and (once requested) the arg_spec
         """
         if isinstance(tool, string_types):
             tool_id = StreamId(tool)
@@ -161,29 +198,52 @@ class ChannelManager(dict, Printable):
         else:
             raise TypeError(tool)
 
-        tool_stream_view = None
+        tool_channel = None
 
         # Look in the main tool channel first
         if tool_id in self.tools:
-            tool_stream_view = self.tools[tool_id].window((MIN_DATE, self.tools.up_to_timestamp))
+            tool_channel = self.tools
         else:
             # Otherwise look through all the channels in the order they were defined
-            for tool_channel in self.tool_channels:
-                if tool_channel == self.tools:
+            for channel in self.tool_channels:
+                if channel == self.tools:
                     continue
-                if tool_id in tool_channel:
-                    # noinspection PyTypeChecker
-                    tool_stream_view = tool_channel[tool_id].window((MIN_DATE, tool_channel.up_to_timestamp))
+                if tool_id in channel:
+                    tool_channel = channel
 
-        if tool_stream_view is None:
+        if tool_channel is None:
             raise ToolNotFoundError(tool)
 
-        # TODO: Use tool versions - here we just take the latest one
-        last = tool_stream_view.last()
-        if last is None:
+        if version is not None:
+            version = str(version)
+        key = (tool_id, version, as_of)
+        state = (tool_channel.get_tool_mtime(tool_id.name), tool_channel.up_to_timestamp)
+        entry = tool_channel.tool_cache.get(key)
+        if entry is not None and entry['state'] == state:
+            return entry
+
+        tool_class = tool_channel.get_tool_class(tool_id.name, version=version, as_of=as_of)
+        if tool_class is None:
+            if version is not None:
+                raise ToolNotFoundError("{} version {}".format(tool, version))
             raise ToolNotFoundError(tool)
 
-        return tool_stream_view.last().value
+        entry = dict(state=state, tool_class=tool_class, arg_spec=None)
+        tool_channel.tool_cache[key] = entry
+        return entry
+
+    def get_tool_class(self, tool, version=None, as_of=None):
+        """
+        Gets the actual class which can then be instantiated with its parameters
+
+        :param tool: The tool name or id
+        :param version: The string representation of the version (None for the latest version)
+        :param as_of: Resolve the latest version as of this timestamp (None for the channel's up to timestamp)
+        :type tool: str | unicode | StreamId
+        :rtype: Tool | MultiOutputTool
+        :return: The tool class
+        """
+        return self.get_tool_entry(tool, version=version, as_of=as_of)['tool_class']
 
     def get_tool(self, name, parameters, version=None):
         """
@@ -191,17 +251,16 @@ class ChannelManager(dict, Printable):
 
         :param name: The name or stream id for the tool in the tool channel
         :param parameters: The parameters for the tool
-        :param version: The string representation of the version
+        :param version: The string representation of the version (None for the latest version)
         :return: The instantiated tool object
         """
-        # TODO: use the version
-        if version is not None:
-            logging.warn("Tool versions not yet supported")
-
-        tool_class = self.get_tool_class(name)
+        entry = self.get_tool_entry(name, version=version)
+        tool_class = entry['tool_class']
 
         # Check that the number of arguments is correct for this tool
-        arg_spec = inspect.getargspec(tool_class.__init__)
+        if entry['arg_spec'] is None:
+            entry['arg_spec'] = inspect.getargspec(tool_class.__init__)
+        arg_spec = entry['arg_spec']
         max_expected = len(arg_spec[0])
         if arg_spec.defaults:
             min_expected = max_expected - len(arg_spec.defaults)
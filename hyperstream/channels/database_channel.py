@@ -22,8 +22,9 @@ Database channel module.
 """
 from mongoengine import NotUniqueError, InvalidDocumentError
 from mongoengine.context_managers import switch_db
-from pymongo.errors import InvalidDocument
+from pymongo.errors import InvalidDocument, BulkWriteError
 import logging
+from itertools import islice
 
 from .base_channel import BaseChannel
 from ..time_interval import TimeIntervals
@@ -32,17 +33,33 @@ from ..stream import StreamInstance, DatabaseStream
 from ..utils import utcnow, StreamNotFoundError, StreamAlreadyExistsError
 
 
+DUPLICATE_KEY_ERROR = 11000
+
+
 class DatabaseChannel(BaseChannel):
     """
     Database Channel. Data stored and retrieved in mongodb using mongoengine.
     """
-    def __init__(self, channel_id):
+    # The number of instances that are read from the database and constructed at a time
+    read_batch_size = 1000
+
+    def __init__(self, channel_id, write_batch_size=None, coalesce_calculated_intervals=False):
         """
         Initialise this channel
 
         :param channel_id: The channel identifier
+        :param write_batch_size: If given, the stream writers buffer the instances and write them with unordered bulk
+        inserts of this size, rather than saving each instance individually. Buffers are written out by flush_stream
+        :param coalesce_calculated_intervals: If True, updates to the calculated intervals of the streams are kept in
+        memory and written to the database when the stream is flushed (e.g. at the end of a factor execution), rather
+        than on every update
+        :type write_batch_size: int | None
+        :type coalesce_calculated_intervals: bool
         """
         super(DatabaseChannel, self).__init__(channel_id=channel_id, can_calc=True, can_create=False)
+        self.write_batch_size = write_batch_size
+        self.coalesce_calculated_intervals = coalesce_calculated_intervals
+        self._write_buffers = {}
         # self.update_streams(utcnow())
 
     def update_streams(self, up_to_timestamp):
@@ -65,8 +82,14 @@ class DatabaseChannel(BaseChannel):
         query = stream.stream_id.as_raw()
         query['datetime'] = {'$gt': time_interval.start, '$lte': time_interval.end}
         with switch_db(StreamInstanceModel, 'hyperstream'):
-            for instance in StreamInstanceModel.objects(__raw__=query):
-                yield StreamInstance(timestamp=instance.datetime, value=instance.value)
+            documents = iter(StreamInstanceModel.objects(__raw__=query))
+            while True:
+                # The instances are constructed in batches, each checked against a single clock reading
+                batch = list(islice(documents, self.read_batch_size))
+                if not batch:
+                    break
+                for instance in StreamInstance.from_arrays([d.datetime for d in batch], [d.value for d in batch]):
+                    yield instance
 
     def create_stream(self, stream_id, sandbox=None):
         """
@@ -107,6 +130,7 @@ class DatabaseChannel(BaseChannel):
             raise StreamNotFoundError("Stream with id '{}' not found".format(stream_id))
 
         stream = self.streams[stream_id]
+        self._write_buffers.pop(stream_id, None)
         query = stream_id.as_raw()
         with switch_db(StreamInstanceModel, 'hyperstream'):
             StreamInstanceModel.objects(__raw__=query).delete()
@@ -125,31 +149,111 @@ class DatabaseChannel(BaseChannel):
         Gets the database channel writer
         The mongoengine model checks whether a stream_id/datetime pair already exists in the DB (unique pairs)
         Should be overridden by users' personal channels - allows for non-mongo outputs.
+        If a write batch size has been set for this channel, the writer only buffers the documents, and they are written
+        to the database when the buffer is full or when flush_stream is called.
 
         :param stream: The stream
         :return: The stream writer function
         """
-
-        def writer(document_collection):
-            with switch_db(StreamInstanceModel, 'hyperstream'):
+        if self.write_batch_size:
+            def buffered_writer(document_collection):
                 if isinstance(document_collection, StreamInstance):
                     document_collection = [document_collection]
 
-                for t, doc in document_collection:
-                    instance = StreamInstanceModel(
-                        stream_id=stream.stream_id.as_dict(),
-                        datetime=t,
-                        value=doc)
-                    try:
-                        instance.save()
-                    except NotUniqueError as e:
+                buffer = self._write_buffers.setdefault(stream.stream_id, [])
+                buffer.extend(document_collection)
+                if len(buffer) >= self.write_batch_size:
+                    self.flush_stream(stream)
+            return buffered_writer
+
+        def writer(document_collection):
+            if isinstance(document_collection, StreamInstance):
+                document_collection = [document_collection]
+            self._save_documents(stream, document_collection)
+        return writer
+
+    def flush_stream(self, stream):
+        """
+        Writes any buffered documents for the stream to the database using unordered bulk inserts.
+        Documents that already exist in the database are reconciled in the same way as for single writes.
+        Batches are only removed from the buffer once they have been written, so if a batch fails, it and the batches
+        after it stay buffered (and are written by the next flush).
+
+        :param stream: The stream
+        :return: None
+        """
+        buffer = self._write_buffers.get(stream.stream_id)
+        if not buffer:
+            return
+
+        written = 0
+        try:
+            while written < len(buffer):
+                self._insert_documents(stream, buffer[written:written + self.write_batch_size])
+                written += self.write_batch_size
+        finally:
+            del buffer[:written]
+        del self._write_buffers[stream.stream_id]
+
+    def _insert_documents(self, stream, documents):
+        """
+        Writes a batch of documents with a single unordered bulk insert
+
+        :param stream: The stream
+        :param documents: The (timestamp, value) pairs
+        :return: None
+        """
+        stream_id = stream.stream_id.as_dict()
+        with switch_db(StreamInstanceModel, 'hyperstream'):
+            instances = []
+            for t, doc in documents:
+                instance = StreamInstanceModel(stream_id=stream_id, datetime=t, value=doc)
+                # Validate as save() would, since the documents are inserted directly into the collection
+                instance.validate()
+                instances.append(instance.to_mongo())
+            try:
+                # noinspection PyProtectedMember
+                StreamInstanceModel._get_collection().insert_many(instances, ordered=False)
+            except BulkWriteError as e:
+                for error in e.details['writeErrors']:
+                    t, doc = documents[error['index']]
+                    if error['code'] == DUPLICATE_KEY_ERROR:
                         # Implies that this has already been written to the database
                         # Raise an error if the value differs from that in the database
-                        logging.warn("Found duplicate document: {}".format(e.message))
-                        existing = StreamInstanceModel.objects(stream_id=stream.stream_id.as_dict(), datetime=t)[0]
+                        logging.warn("Found duplicate document: {}".format(error['errmsg']))
+                        existing = StreamInstanceModel.objects(stream_id=stream_id, datetime=t)[0]
                         if existing.value != doc:
-                            raise e
-                    except (InvalidDocumentError, InvalidDocument) as e:
-                        # Something wrong with the document - log the error
-                        logging.error(e)
-        return writer
+                            raise NotUniqueError(error['errmsg'])
+                    else:
+                        logging.error(error['errmsg'])
+            except InvalidDocument:
+                # Something wrong with one of the documents - fall back to saving them one at a time to find it
+                self._save_documents(stream, documents)
+
+    @staticmethod
+    def _save_documents(stream, document_collection):
+        """
+        Saves the documents one at a time
+
+        :param stream: The stream
+        :param document_collection: The (timestamp, value) pairs
+        :return: None
+        """
+        with switch_db(StreamInstanceModel, 'hyperstream'):
+            for t, doc in document_collection:
+                instance = StreamInstanceModel(
+                    stream_id=stream.stream_id.as_dict(),
+                    datetime=t,
+                    value=doc)
+                try:
+                    instance.save()
+                except NotUniqueError as e:
+                    # Implies that this has already been written to the database
+                    # Raise an error if the value differs from that in the database
+                    logging.warn("Found duplicate document: {}".format(e.message))
+                    existing = StreamInstanceModel.objects(stream_id=stream.stream_id.as_dict(), datetime=t)[0]
+                    if existing.value != doc:
+                        raise e
+                except (InvalidDocumentError, InvalidDocument) as e:
+                    # Something wrong with the document - log the error
+                    logging.error(e)
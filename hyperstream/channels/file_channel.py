@@ -111,16 +111,16 @@ class FileChannel(ReadOnlyMemoryChannel):
         #     raise ValueError(
         #         'The stream is not available after ' + str(self.up_to_timestamp) + ' and cannot be calculated')
         
-        result = []
+        timestamps = []
+        values = []
         module_path = os.path.join(self.path, stream.stream_id.name)
         
         for file_info in self.file_filter(sorted(os.listdir(module_path))):
             if file_info.timestamp in time_interval and file_info.timestamp <= self.up_to_timestamp:
-                result.append(StreamInstance(
-                    timestamp=file_info.timestamp,
-                    value=self.data_loader(stream.stream_id.name, file_info)
-                ))
+                timestamps.append(file_info.timestamp)
+                values.append(self.data_loader(stream.stream_id.name, file_info))
         
+        result = StreamInstance.from_arrays(timestamps, values)
         result.sort(key=lambda x: x.timestamp)
         return result
 
@@ -19,7 +19,7 @@
 #  OR OTHER DEALINGS IN THE SOFTWARE.
 
 from .base_channel import BaseChannel
-from ..stream import Stream, StreamInstance, StreamInstanceCollection
+from ..stream import Stream, StreamInstance, StreamInstanceCollection, StreamInstanceArray
 from ..time_interval import TimeIntervals
 from ..utils import MIN_DATE, StreamNotFoundError, StreamAlreadyExistsError
 
@@ -28,6 +28,8 @@ class MemoryChannel(BaseChannel):
     """
     Channel whose data lives in memory
     """
+    collection_type = StreamInstanceCollection
+
     def __init__(self, channel_id):
         """
         Initialise the channel
@@ -55,7 +57,7 @@ class MemoryChannel(BaseChannel):
         stream = Stream(channel=self, stream_id=stream_id, calculated_intervals=None, sandbox=None)
         
         self.streams[stream_id] = stream
-        self.data[stream_id] = StreamInstanceCollection()
+        self.data[stream_id] = self.collection_type()
         return stream
 
     def purge_all(self, remove_definitions=False):
@@ -89,7 +91,7 @@ class MemoryChannel(BaseChannel):
         if stream_id not in self.streams:
             raise StreamNotFoundError(stream_id)
 
-        self.data[stream_id] = StreamInstanceCollection()
+        self.data[stream_id] = self.collection_type()
         self.streams[stream_id].calculated_intervals = TimeIntervals()
 
         if remove_definition:
@@ -103,7 +105,7 @@ class MemoryChannel(BaseChannel):
         :param time_interval: The time interval
         :return: The sorted data items
         """
-        return [StreamInstance(t, self.data[stream.stream_id][t])
+        return [StreamInstance.from_normalised(t, self.data[stream.stream_id][t])
                 for t in sorted(self.data[stream.stream_id]) if t in time_interval]
 
     def get_stream_writer(self, stream):
@@ -122,6 +124,24 @@ class MemoryChannel(BaseChannel):
         return writer
 
 
+class ArrayMemoryChannel(MemoryChannel):
+    """
+    Memory channel that stores each stream column-wise, as sorted arrays of timestamps and values (see
+    StreamInstanceArray). Window queries use binary search rather than scanning and sorting the whole stream, which
+    makes this channel better suited to long streams.
+    """
+    collection_type = StreamInstanceArray
+
+    def get_results(self, stream, time_interval):
+        """
+        Calculates/receives the documents in the stream interval determined by the stream
+        :param stream: The stream reference
+        :param time_interval: The time interval
+        :return: The sorted data items
+        """
+        return list(self.data[stream.stream_id].window(time_interval))
+
+
 class ReadOnlyMemoryChannel(BaseChannel):
     """
     An abstract channel with a read-only set of memory-based streams.
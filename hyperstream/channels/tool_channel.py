@@ -20,19 +20,184 @@
 
 from .module_channel import ModuleChannel
 from ..stream import StreamInstance
+from ..utils import MIN_DATE
+
+from bisect import bisect_right
+from collections import namedtuple
+import os
+from semantic_version import Version
+from six import string_types
+
+
+ToolVersion = namedtuple("ToolVersion", "timestamp version loader")
+
+
+class ToolVersionIndex(object):
+    """
+    The versions of a single tool, sorted by timestamp and then by semantic version, so that the latest version, a
+    given version, or the latest version as of a given timestamp can be found in O(log n) time
+    """
+    def __init__(self, tool_versions, mtime=None):
+        """
+        Initialise the index
+
+        :param tool_versions: The versions of the tool
+        :param mtime: The modification time of the directory of the tool when the index was built
+        :type tool_versions: list[ToolVersion]
+        """
+        self.tool_versions = sorted(tool_versions, key=lambda tv: (tv.timestamp, tv.version))
+        self.timestamps = [tv.timestamp for tv in self.tool_versions]
+        self.versions = dict((tv.version, tv) for tv in self.tool_versions)
+        self.mtime = mtime
+
+    def __len__(self):
+        return len(self.tool_versions)
+
+    def latest(self, as_of=None):
+        """
+        Get the latest version of the tool
+
+        :param as_of: Only consider the versions with timestamps up to (and including) this timestamp
+        :return: The tool version (None if there are none)
+        :rtype: ToolVersion | None
+        """
+        if as_of is None:
+            i = len(self.tool_versions)
+        else:
+            i = bisect_right(self.timestamps, as_of)
+        return self.tool_versions[i - 1] if i > 0 else None
+
+    def exact(self, version, as_of=None):
+        """
+        Get the given version of the tool
+
+        :param version: The version
+        :param as_of: Only consider the versions with timestamps up to (and including) this timestamp
+        :type version: Version
+        :return: The tool version (None if it does not exist)
+        :rtype: ToolVersion | None
+        """
+        tool_version = self.versions.get(version)
+        if tool_version is None or (as_of is not None and tool_version.timestamp > as_of):
+            return None
+        return tool_version
 
 
 class ToolChannel(ModuleChannel):
     """
     Special case of the file/module channel to load the tools to execute other streams
     """
+    def __init__(self, channel_id, path, up_to_timestamp=MIN_DATE):
+        # Resolved tool classes (and argument specifications), see ChannelManager.get_tool_class
+        self.tool_cache = {}
+        # The versions of each tool, by tool name
+        self.tool_index = {}
+        super(ToolChannel, self).__init__(channel_id=channel_id, path=path, up_to_timestamp=up_to_timestamp)
+
+    def update_streams(self, up_to_timestamp):
+        super(ToolChannel, self).update_streams(up_to_timestamp)
+        for stream_id in self.streams:
+            self.tool_index[stream_id.name] = self.index_tool(stream_id.name)
+
+    def get_tool_mtime(self, name):
+        """
+        Get the modification time of the directory of the tool, which changes when versions are added or removed
+
+        :param name: The tool name
+        :return: The modification time (None if the directory does not exist)
+        """
+        try:
+            return os.stat(os.path.join(self.path, name)).st_mtime
+        except OSError:
+            return None
+
+    def index_tool(self, name):
+        """
+        Build the index of the versions of the tool from the files in its directory
+
+        :param name: The tool name
+        :return: The index
+        :rtype: ToolVersionIndex
+        """
+        mtime = self.get_tool_mtime(name)
+        if mtime is None:
+            return ToolVersionIndex([])
+        tool_versions = []
+        for file_info in self.file_filter(sorted(os.listdir(os.path.join(self.path, name)))):
+            version, module_importer = self.data_loader(name, file_info)
+            tool_versions.append(ToolVersion(file_info.timestamp, version, module_importer))
+        return ToolVersionIndex(tool_versions, mtime=mtime)
+
+    def get_tool_index(self, name):
+        """
+        Get the index of the versions of the tool, which is rebuilt if the directory of the tool has changed
+
+        :param name: The tool name
+        :return: The index
+        :rtype: ToolVersionIndex
+        """
+        index = self.tool_index.get(name)
+        if index is None or index.mtime != self.get_tool_mtime(name):
+            index = self.tool_index[name] = self.index_tool(name)
+        return index
+
+    def find_tool(self, name, version=None, as_of=None):
+        """
+        Find the version of the tool: the given version if one is specified, and otherwise the latest version. Versions
+        with timestamps after the channel's up to timestamp (or after as_of, if given) are not considered.
+
+        :param name: The tool name
+        :param version: The version (e.g. "0.1.0")
+        :param as_of: The timestamp
+        :type version: str | unicode | Version | None
+        :return: The tool version (None if it is not found)
+        :rtype: ToolVersion | None
+        """
+        up_to_timestamp = self.up_to_timestamp if as_of is None else min(as_of, self.up_to_timestamp)
+        index = self.get_tool_index(name)
+        if version is None:
+            return index.latest(as_of=up_to_timestamp)
+        if isinstance(version, string_types):
+            version = Version(version)
+        return index.exact(version, as_of=up_to_timestamp)
+
+    def get_tool_class(self, name, version=None, as_of=None):
+        """
+        Get the class of the tool (see find_tool)
+
+        :param name: The tool name
+        :param version: The version (e.g. "0.1.0")
+        :param as_of: The timestamp
+        :return: The tool class (None if it is not found)
+        """
+        tool_version = self.find_tool(name, version=version, as_of=as_of)
+        if tool_version is None:
+            return None
+        return self.load_tool_class(name, tool_version)
+
+    @staticmethod
+    def load_tool_class(name, tool_version):
+        """
+        Import the module of the tool version, and get the tool class from it. The class name is the name of the tool
+        in camel case (e.g. SplitterFromStream), and the class records its version.
+
+        :param name: The tool name
+        :param tool_version: The tool version
+        :type tool_version: ToolVersion
+        :return: The tool class
+        """
+        module = tool_version.loader()
+        class_name = name.title().replace("_", "")
+        tool_class = getattr(module, class_name)
+        tool_class.version = str(tool_version.version)
+        return tool_class
+
     def get_results(self, stream, time_interval):
-        results = super(ToolChannel, self).get_results(stream, time_interval)
+        name = stream.stream_id.name
+        results = [tv for tv in self.get_tool_index(name).tool_versions
+                   if tv.timestamp in time_interval and tv.timestamp <= self.up_to_timestamp]
         if results:
-            for timestamp, (version, module_importer) in results:
-                module = module_importer()
-                class_name = stream.stream_id.name.title().replace("_", "")
-                tool_class = getattr(module, class_name)
-                yield StreamInstance(timestamp, tool_class)
+            for tool_version in results:
+                yield StreamInstance(tool_version.timestamp, self.load_tool_class(name, tool_version))
         else:
             yield None
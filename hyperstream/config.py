@@ -24,6 +24,7 @@ HyperStream configuration module.
 import logging
 import json
 import os
+from datetime import timedelta
 
 from .utils import Printable, ConfigurationError
 from .plugin_manager import Plugin
@@ -31,11 +32,22 @@ from .time_interval import RelativeTimeInterval
 
 
 class OnlineEngineConfig(Printable):
-    def __init__(self, interval, sleep=5, iterations=100, alarm=None):
+    def __init__(self, interval, sleep=5, iterations=100, alarm=None, max_catch_up=None):
+        """
+        Initialise the online engine configuration
+
+        :param interval: The relative time interval that is executed at each tick
+        :param sleep: The period between the starts of successive ticks (seconds)
+        :param iterations: The number of ticks
+        :param alarm: The time after which a tick is aborted (seconds)
+        :param max_catch_up: The longest interval that is executed for a workflow in a single tick (seconds), or None
+            for no limit. Workflows that are further behind catch up over several ticks.
+        """
         self.interval = RelativeTimeInterval(**interval)
         self.sleep = sleep
         self.iterations = iterations
         self.alarm = sleep * iterations if not alarm else alarm
+        self.max_catch_up = timedelta(seconds=max_catch_up) if max_catch_up else None
 
 
 class HyperStreamConfig(Printable):
@@ -47,6 +59,10 @@ class HyperStreamConfig(Printable):
         Initialise the configuration - currently uses fixed file name (hyperstream_config.json)
         """
         self.mongo = None
+        self.write_batch_size = None
+        self.coalesce_calculated_intervals = False
+        self.plate_executor = None
+        self.lazy_workflows = False
 
         try:
             with open(filename, 'r') as f:
@@ -57,6 +73,10 @@ class HyperStreamConfig(Printable):
                 self.history_channel = config.get('history_channel', 'memory')
                 self.output_path = config.get('output_path', 'output')
                 self.plugins = [Plugin(**p) for p in config.get('plugins', [])]
+                self.write_batch_size = config.get('write_batch_size', None)
+                self.coalesce_calculated_intervals = config.get('coalesce_calculated_intervals', False)
+                self.plate_executor = config.get('plate_executor', None)
+                self.lazy_workflows = config.get('lazy_workflows', False)
                 self.online_engine = OnlineEngineConfig(**config["online_engine"])
         except (OSError, IOError, TypeError) as e:
             raise ConfigurationError(str(e))
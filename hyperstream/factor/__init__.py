@@ -20,3 +20,4 @@
 # OR OTHER DEALINGS IN THE SOFTWARE.
 
 from .factor import Factor, NodeCreationFactor, MultiOutputFactor
+from .plate_executor import PlateExecutor, limit_workers
@@ -21,17 +21,50 @@
 
 import logging
 import itertools
+from functools import wraps
+from threading import RLock
 
 from ..node import Node
 from ..plate import Plate
 from ..time_interval import TimeIntervals
 from ..tool import BaseTool, MultiOutputTool, AggregateTool, SelectorTool, PlateCreationTool
 from ..utils import Printable, IncompatibleToolError, IncompatiblePlatesError
+from .plate_executor import PlateExecutor
+
+
+def synchronised(execute):
+    """
+    Decorator for factor execution, so that a factor is only executed by one thread at a time (e.g. when it is
+    executed by the workflow scheduler and pulled by a downstream factor at the same time). The second execution then
+    finds the intervals already calculated.
+
+    :param execute: The execute method
+    :return: The wrapped method
+    """
+    @wraps(execute)
+    def wrapper(self, *args, **kwargs):
+        with self._execute_lock:
+            return execute(self, *args, **kwargs)
+    return wrapper
 
 
 class FactorBase(Printable):
     def __init__(self, tool):
         self.tool = tool
+        # Executes the tool over the plate values (serially unless set by the workflow)
+        self.plate_executor = PlateExecutor()
+        self._execute_lock = RLock()
+
+    def flush_sinks(self):
+        """
+        Flush the sink streams, so that any buffered documents and calculated intervals are written
+
+        :return: None
+        """
+        if self.sink is None:
+            return
+        for stream in self.sink.streams.values():
+            stream.flush()
 
     @property
     def factor_id(self):
@@ -90,6 +123,7 @@ class Factor(FactorBase):
         
         self.alignment_node = alignment_node
     
+    @synchronised
     def execute(self, time_interval):
         """
         Execute the factor over the given time interval
@@ -112,10 +146,12 @@ class Factor(FactorBase):
                 # Here we should loop through the plate values of the sink, and get the sources that are appropriate for
                 # that given plate value, and pass only those sources to the tool. This is cleaner than making the tool
                 # deal with all of the sources
+                tasks = []
                 for pv in self.sink.plate_values:
-                    sources = [all_sources.streams[s] for s in all_sources.streams if all([v in s for v in pv])]
+                    sources = all_sources.streams_for_plate_value(pv)
                     sink = self.sink.streams[pv]
-                    self.tool.execute(sources=sources, sink=sink, interval=time_interval, alignment_stream=None)
+                    tasks.append(dict(sources=sources, sink=sink, interval=time_interval, alignment_stream=None))
+                self.plate_executor.execute(self.tool, tasks)
             elif isinstance(self.tool, SelectorTool):
                 if len(self.sources) == 1:
                     sources = self.sources[0].streams.values()
@@ -148,11 +184,13 @@ class Factor(FactorBase):
                 # What we probably want is to take the cartesian product of plate values
                 if len(self.plates) == 1:
                     plate = self.plates[0]
+                    tasks = []
                     for pv in plate.values:
                         sources = self.get_sources(plate, pv)
                         sink = self.sink.streams[pv]
-                        self.tool.execute(sources=sources, sink=sink, interval=time_interval,
-                                          alignment_stream=self.get_alignment_stream(None, None))
+                        tasks.append(dict(sources=sources, sink=sink, interval=time_interval,
+                                          alignment_stream=self.get_alignment_stream(None, None)))
+                    self.plate_executor.execute(self.tool, tasks)
                 else:
                     if len(self.sources) != 1 and not all(s.plates == self.plates for s in self.sources):
                         source_plates = sorted(p.plate_id for s in self.sources for p in s.plates)
@@ -175,11 +213,13 @@ class Factor(FactorBase):
 
                         else:
                             raise NotImplementedError
+                    tasks = []
                     for pv in Plate.get_overlapping_values(self.plates):
                         sources = [source.streams[s] for source in self.sources for s in source.streams if pv == s]
                         sink = self.sink.streams[pv]
-                        self.tool.execute(sources=sources, sink=sink, interval=time_interval,
-                                          alignment_stream=self.get_alignment_stream(None, None))
+                        tasks.append(dict(sources=sources, sink=sink, interval=time_interval,
+                                          alignment_stream=self.get_alignment_stream(None, None)))
+                    self.plate_executor.execute(self.tool, tasks)
         else:
             if isinstance(self.tool, AggregateTool):
                 # raise ValueError("Cannot execute an AggregateTool if no plates are defined for the factor")
@@ -199,6 +239,7 @@ class Factor(FactorBase):
                 sink = self.sink.streams[None]
                 self.tool.execute(sources=sources, sink=sink, interval=time_interval,
                                   alignment_stream=self.get_alignment_stream(None, None))
+        self.flush_sinks()
         return self
     
     def get_sources(self, plate, plate_value, sources=None):
@@ -321,6 +362,7 @@ class MultiOutputFactor(FactorBase):
         
         self.output_plates = output_plates
 
+    @synchronised
     def execute(self, time_interval):
         """
         Execute the factor over the given time interval. Note that this is normally done by the workflow,
@@ -385,6 +427,7 @@ class MultiOutputFactor(FactorBase):
                 output_plate_values=sub_plate_values_only)
             self.update_computed_intervals(sinks, time_interval)
 
+        self.flush_sinks()
         return self
 
     def get_splitting_stream(self, input_plate_value):
@@ -499,6 +542,7 @@ class NodeCreationFactor(FactorBase):
         self._plate_manager = plate_manager
         self._meta_data_manager = plate_manager.meta_data_manager
 
+    @synchronised
     def execute(self, time_interval):
         """
         Execute the factor over the given time interval. Note that this is normally done by the workflow,
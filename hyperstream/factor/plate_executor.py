@@ -0,0 +1,208 @@
+# The MIT License (MIT)
+# Copyright (c) 2014-2017 University of Bristol
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+# DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+# OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+Executors for the per plate value tool executions of a factor.
+"""
+
+from contextlib import contextmanager
+from itertools import count
+import logging
+import multiprocessing
+import threading
+from mongoengine.connection import disconnect
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    # Python 2 requires the futures backport
+    ThreadPoolExecutor = None
+
+from ..tool import Tool
+from ..utils import Printable
+
+
+# The tool and tasks of the process pool executions in progress, by execution id. These are inherited by the forked
+# worker processes, so that the tool and streams do not need to be pickled. Each execution has its own entry, so that
+# concurrent executions cannot pick up each other's tasks
+_process_tasks = {}
+_process_ids = count()
+
+# The limit on the number of workers of the plate executors in the current thread (see limit_workers)
+_local = threading.local()
+
+
+@contextmanager
+def limit_workers(max_workers):
+    """
+    Context manager that limits the number of workers used by the plate executors in the current thread, e.g. when
+    several factors are executed concurrently by the workflow scheduler
+
+    :param max_workers: The maximum number of workers
+    :type max_workers: int
+    """
+    previous = getattr(_local, "max_workers", None)
+    _local.max_workers = max_workers
+    try:
+        yield
+    finally:
+        _local.max_workers = previous
+
+
+def _reconnect():
+    """
+    Initialiser for the worker processes. The mongo clients inherited from the parent process are not fork-safe, so
+    they are disconnected and the HyperStream client connects again with its configuration. The models are always
+    accessed through switch_db, which looks up their collections on the new connections.
+
+    :return: None
+    """
+    from ..hyperstream import HyperStream
+    hyperstream = HyperStream._instance
+    if hyperstream is None or hyperstream.client is None:
+        return
+    for alias in ("hyperstream", "default"):
+        disconnect(alias)
+    hyperstream.client.connect(hyperstream.client.server_config)
+
+
+def _compute_task(key):
+    """
+    Compute the results of a single task in a worker process
+
+    :param key: The execution id and the index of the task
+    :return: The list of (interval, stream instances) tuples
+    """
+    execution_id, index = key
+    tool, tasks = _process_tasks[execution_id]
+    task = tasks[index]
+    return [(interval, list(stream_instances)) for interval, stream_instances in tool.compute(
+        sources=task['sources'], alignment_stream=task['alignment_stream'],
+        required_intervals=task['required_intervals'])]
+
+
+class PlateExecutor(Printable):
+    """
+    Runs the tool executions of a factor (one per plate value) serially, in a pool of threads, or in a pool of
+    processes.
+
+    Threads suit tools that are dominated by I/O, such as reading and writing mongo streams. Processes suit CPU-bound
+    tools: the worker processes are forked, compute the stream instances, and return them to the parent process, which
+    writes them to the sinks and updates the calculated intervals and the history. Process pools should only be used
+    where the source streams have already been calculated (e.g. by executing the workflow), since any calculations
+    pulled from upstream in a worker process are lost. Process pools are only available where processes can be forked,
+    and otherwise fall back to threads. Process pools are experimental: the reconnection of the worker processes to
+    mongo after forking (see _reconnect) has not yet been tested against a real mongo server.
+    """
+    kinds = ("serial", "thread", "process")
+
+    def __init__(self, kind="serial", max_workers=None):
+        """
+        Initialise the executor
+
+        :param kind: The kind of executor (serial, thread or process)
+        :param max_workers: The maximum number of concurrent executions (defaults to the number of cpus)
+        :type kind: str
+        :type max_workers: int | None
+        """
+        if kind not in self.kinds:
+            raise ValueError("Expected one of {}, got {}".format(self.kinds, kind))
+        if max_workers is not None and max_workers < 1:
+            raise ValueError("max_workers should be at least 1")
+        self.kind = kind
+        self.max_workers = max_workers or multiprocessing.cpu_count()
+
+    def workers(self, n_tasks):
+        """
+        Get the number of workers for the given number of tasks, within any limit set for the current thread (see
+        limit_workers)
+
+        :param n_tasks: The number of tasks
+        :return: The number of workers
+        """
+        limit = getattr(_local, "max_workers", None)
+        return min(self.max_workers, n_tasks, limit or self.max_workers)
+
+    def execute(self, tool, tasks):
+        """
+        Execute the tool for each of the tasks. Any error raised by an execution is re-raised in the calling thread.
+
+        :param tool: The tool
+        :param tasks: The keyword arguments for each call to tool.execute (sources, sink, interval, alignment_stream)
+        :type tool: Tool
+        :type tasks: list[dict]
+        :return: None
+        """
+        kind = self.kind
+        if self.workers(len(tasks)) < 2:
+            kind = "serial"
+        if kind == "process" and not isinstance(tool, Tool):
+            # Only standard (and aggregate) tools separate computation from writing
+            kind = "thread"
+        if kind == "thread" and ThreadPoolExecutor is None:
+            logging.warn("concurrent.futures not available, executing plate values serially")
+            kind = "serial"
+
+        if kind == "serial":
+            for task in tasks:
+                tool.execute(**task)
+        elif kind == "thread":
+            self._execute_threads(tool, tasks)
+        else:
+            self._execute_processes(tool, tasks)
+
+    def _execute_threads(self, tool, tasks):
+        with ThreadPoolExecutor(max_workers=self.workers(len(tasks))) as executor:
+            futures = [executor.submit(tool.execute, **task) for task in tasks]
+        for future in futures:
+            future.result()
+
+    def _execute_processes(self, tool, tasks):
+        try:
+            context = multiprocessing.get_context("fork")
+        except AttributeError:
+            # Python 2 always forks on posix
+            context = multiprocessing
+        except ValueError:
+            logging.warn("Cannot fork processes on this platform, executing plate values in threads")
+            return self._execute_threads(tool, tasks)
+
+        required = []
+        for task in tasks:
+            required_intervals = tool.required_intervals(task['sink'], task['interval'])
+            if not required_intervals.is_empty:
+                required.append(dict(task, required_intervals=required_intervals))
+
+        if not required:
+            return
+
+        execution_id = next(_process_ids)
+        _process_tasks[execution_id] = (tool, required)
+        pool = None
+        try:
+            pool = context.Pool(processes=self.workers(len(required)), initializer=_reconnect)
+            keys = [(execution_id, index) for index in range(len(required))]
+            for task, results in zip(required, pool.imap(_compute_task, keys)):
+                tool.write_results(task['sink'], results)
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+            del _process_tasks[execution_id]
@@ -24,8 +24,10 @@ Main HyperStream class
 
 from . import ChannelManager, HyperStreamConfig, PlateManager, WorkflowManager, Client, Workflow
 from .version import __version__
-from .utils import HyperStreamLogger, ToolContainer, PluginContainer, PluginWrapper, FactorContainer, Singleton
+from .utils import HyperStreamLogger, ToolContainer, PluginContainer, PluginWrapper, FactorContainer, Singleton, \
+    PhaseTimer
 from .session import Session
+from .channels import BaseChannel
 from .tool import Tool, MultiOutputTool, SelectorTool, AggregateTool, PlateCreationTool
 
 import logging
@@ -74,15 +76,29 @@ class HyperStream(object):
             mqtt_logger=mqtt_logger
         )
 
-        self.logger = HyperStreamLogger(
-            default_loglevel=loglevel, file_logger=file_logger, console_logger=console_logger, mqtt_logger=mqtt_logger)
-        self.config = HyperStreamConfig(filename=config_filename)
-        self.client = Client(self.config.mongo)
+        timer = PhaseTimer()
+
+        with timer("logger"):
+            self.logger = HyperStreamLogger(
+                default_loglevel=loglevel, file_logger=file_logger, console_logger=console_logger,
+                mqtt_logger=mqtt_logger)
+        with timer("config"):
+            self.config = HyperStreamConfig(filename=config_filename)
+        with timer("client"):
+            self.client = Client(self.config.mongo)
 
         # Define some managers
-        self.channel_manager = ChannelManager(self.config.plugins)
-        self.plate_manager = PlateManager()
-        self.workflow_manager = WorkflowManager(channel_manager=self.channel_manager, plate_manager=self.plate_manager)
+        with timer("channel_manager"):
+            self.channel_manager = ChannelManager(
+                self.config.plugins,
+                write_batch_size=self.config.write_batch_size,
+                coalesce_calculated_intervals=self.config.coalesce_calculated_intervals)
+        with timer("plate_manager"):
+            self.plate_manager = PlateManager()
+        with timer("workflow_manager"):
+            self.workflow_manager = WorkflowManager(
+                channel_manager=self.channel_manager, plate_manager=self.plate_manager,
+                plate_executor=self.config.plate_executor, lazy=self.config.lazy_workflows)
         self.plugins = PluginContainer()
 
         # The following are to keep pep happy - will be populated below
@@ -90,7 +106,20 @@ class HyperStream(object):
         self.factors = None
 
         self.current_workflow = None  # Used in the new API - the current workflow being defined
-        self.populate_tools_and_factors()
+        with timer("tools"):
+            self.populate_tools_and_factors()
+
+        # The time taken by each phase of the initialisation (seconds), along with the number of objects loaded
+        self.startup_profile = dict(
+            phases=timer.timings,
+            total=timer.total,
+            counts=dict(
+                channels=len(self.channel_manager),
+                streams=sum(len(channel.streams) for channel in self.channel_manager.values()
+                            if isinstance(channel, BaseChannel)),
+                plates=len(self.plate_manager.plates),
+                workflows=len(self.workflow_manager.workflows)))
+        logging.debug("Startup profile: {}".format(timer.report()))
 
     def __repr__(self):
         """
@@ -220,7 +249,8 @@ class HyperStream(object):
         Session.clear_sessions(self, inactive_only, clear_history)
 
     @contextmanager
-    def create_workflow(self, workflow_id, name, owner, description, online=False, monitor=False, safe=True):
+    def create_workflow(self, workflow_id, name, owner, description, online=False, monitor=False, safe=True,
+                        plate_executor=None):
         """
         Create a new workflow. Simple wrapper for creating a workflow and adding it to the workflow manager.
 
@@ -231,6 +261,8 @@ class HyperStream(object):
         :param online: Whether this workflow should be executed by the online engine
         :param monitor: Whether the workflow computations should be monitored
         :param safe: If safe=True, will throw an error if the workflow already exists
+        :param plate_executor: The executor for the plate values of the factors (PlateExecutor or dict of parameters).
+        If None, the plate_executor from the configuration is used
         :return: The workflow
 
         """
@@ -241,7 +273,8 @@ class HyperStream(object):
                 owner=owner,
                 description=description,
                 online=online,
-                monitor=monitor
+                monitor=monitor,
+                plate_executor=plate_executor
             )
 
             self.workflow_manager.add_workflow(w)
@@ -18,4 +18,7 @@
 #  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
 #  OR OTHER DEALINGS IN THE SOFTWARE.
 
-from .itertools2 import online_average, online_variance, online_product, online_sum, count, any_set
+from .itertools2 import online_average, online_variance, online_product, online_sum, count, any_set, \
+    online_average_step, online_average_remove, online_variance_step, online_variance_remove
+from .sliding_window import SlidingWindowBuffer, WindowAggregator, WindowCount, WindowSum, WindowMean, \
+    WindowVariance, WindowMin, WindowMax, WINDOW_AGGREGATORS, make_window_aggregator
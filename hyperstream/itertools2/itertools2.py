@@ -48,11 +48,68 @@ def online_product(data, total=1.0):
     return total
 
 
+def online_average_step(n, mean, x):
+    """
+    Add a value to a running mean
+
+    :param n: The number of values so far
+    :param mean: The mean of the values so far
+    :param x: The value to add
+    :return: The updated (n, mean)
+    """
+    n += 1
+    return n, mean + (x - mean) / n
+
+
+def online_average_remove(n, mean, x):
+    """
+    Remove a value from a running mean (the inverse of online_average_step)
+
+    :param n: The number of values, including x
+    :param mean: The mean of the values, including x
+    :param x: The value to remove
+    :return: The updated (n, mean)
+    """
+    n -= 1
+    if n < 1:
+        return 0, 0.0
+    return n, mean - (x - mean) / n
+
+
+def online_variance_step(n, mean, m2, x):
+    """
+    Add a value to a running variance (Welford's method)
+
+    :param n: The number of values so far
+    :param mean: The mean of the values so far
+    :param m2: The sum of squared differences from the mean of the values so far
+    :param x: The value to add
+    :return: The updated (n, mean, m2)
+    """
+    n, new_mean = online_average_step(n, mean, x)
+    return n, new_mean, m2 + (x - mean) * (x - new_mean)
+
+
+def online_variance_remove(n, mean, m2, x):
+    """
+    Remove a value from a running variance (the inverse of online_variance_step)
+
+    :param n: The number of values, including x
+    :param mean: The mean of the values, including x
+    :param m2: The sum of squared differences from the mean of the values, including x
+    :param x: The value to remove
+    :return: The updated (n, mean, m2)
+    """
+    n, new_mean = online_average_remove(n, mean, x)
+    if n < 1:
+        return 0, 0.0, 0.0
+    # Guard against small negative values due to rounding
+    return n, new_mean, max(m2 - (x - mean) * (x - new_mean), 0.0)
+
+
 def online_average(data, n=0, mean=0.0):
     for x in data:
-        n += 1
-        delta = (x.value if isinstance(x, StreamInstance) else x) - mean
-        mean += delta / n
+        n, mean = online_average_step(n, mean, x.value if isinstance(x, StreamInstance) else x)
     
     # TODO from niall: Possibly unnecessary bug: np.mean([1]) = 1. Suggest (n < 1)
     if n < 1:
@@ -63,11 +120,7 @@ def online_average(data, n=0, mean=0.0):
 
 def online_variance(data, n=0, mean=0.0, m2=0.0):
     for x in data:
-        n += 1
-        x = x.value if isinstance(x, StreamInstance) else x
-        delta = x - mean
-        mean += delta / n
-        m2 += delta * (x - mean)
+        n, mean, m2 = online_variance_step(n, mean, m2, x.value if isinstance(x, StreamInstance) else x)
     
     if n < 2:
         return float('nan')
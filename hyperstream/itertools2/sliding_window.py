@@ -0,0 +1,314 @@
+# The MIT License (MIT) # Copyright (c) 2014-2017 University of Bristol
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+Sliding windows over time ordered streams, with aggregators that are updated incrementally as instances enter and
+leave the window.
+"""
+
+from collections import deque
+from copy import deepcopy
+
+from .itertools2 import online_sum, online_average_step, online_average_remove, online_variance_step, \
+    online_variance_remove
+
+
+class WindowAggregator(object):
+    """
+    Base class for aggregators over a sliding window. Values are added as they enter the window, and removed (oldest
+    first) as they leave it, so that the aggregate never needs to rescan the window.
+    """
+    def add(self, value):
+        """
+        Add a value entering the window
+
+        :param value: The value
+        :return: None
+        """
+        raise NotImplementedError
+
+    def remove(self, value):
+        """
+        Remove a value leaving the window. Values leave the window in the order in which they were added.
+
+        :param value: The value
+        :return: None
+        """
+        raise NotImplementedError
+
+    @property
+    def value(self):
+        """
+        The current value of the aggregate
+        """
+        raise NotImplementedError
+
+
+class WindowCount(WindowAggregator):
+    """
+    The number of values in the window
+    """
+    def __init__(self):
+        self.n = 0
+
+    def add(self, value):
+        self.n += 1
+
+    def remove(self, value):
+        self.n -= 1
+
+    @property
+    def value(self):
+        return self.n
+
+
+class WindowSum(WindowAggregator):
+    """
+    The sum of the values in the window
+    """
+    def __init__(self, total=0.0):
+        self.total = total
+
+    def add(self, value):
+        self.total = online_sum((value, ), self.total)
+
+    def remove(self, value):
+        self.total = online_sum((-value, ), self.total)
+
+    @property
+    def value(self):
+        return self.total
+
+
+class WindowMean(WindowAggregator):
+    """
+    The mean of the values in the window (nan if the window is empty), updated with the same steps as online_average
+    """
+    def __init__(self, n=0, mean=0.0):
+        self.n = n
+        self.mean = mean
+
+    def add(self, value):
+        self.n, self.mean = online_average_step(self.n, self.mean, value)
+
+    def remove(self, value):
+        self.n, self.mean = online_average_remove(self.n, self.mean, value)
+
+    @property
+    def value(self):
+        if self.n < 1:
+            return float('nan')
+        return self.mean
+
+
+class WindowVariance(WindowAggregator):
+    """
+    The (sample) variance of the values in the window (nan if there are fewer than two values). This keeps the same
+    state as online_variance (n, mean, m2), updated with the same steps as values are added and removed, so that it
+    agrees with online_variance over the values in the window.
+    """
+    def __init__(self, n=0, mean=0.0, m2=0.0):
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, value):
+        self.n, self.mean, self.m2 = online_variance_step(self.n, self.mean, self.m2, value)
+
+    def remove(self, value):
+        self.n, self.mean, self.m2 = online_variance_remove(self.n, self.mean, self.m2, value)
+
+    @property
+    def value(self):
+        if self.n < 2:
+            return float('nan')
+        return self.m2 / (self.n - 1)
+
+
+class WindowMin(WindowAggregator):
+    """
+    The minimum of the values in the window (None if the window is empty). This keeps a monotonic deque of the values
+    that can still become the minimum, so that add and remove are amortised O(1).
+    """
+    def __init__(self):
+        self.candidates = deque()
+        self.added = 0
+        self.removed = 0
+
+    @staticmethod
+    def supersedes(new, old):
+        return new <= old
+
+    def add(self, value):
+        candidates = self.candidates
+        while candidates and self.supersedes(value, candidates[-1][1]):
+            candidates.pop()
+        candidates.append((self.added, value))
+        self.added += 1
+
+    def remove(self, value):
+        if self.candidates and self.candidates[0][0] == self.removed:
+            self.candidates.popleft()
+        self.removed += 1
+
+    @property
+    def value(self):
+        return self.candidates[0][1] if self.candidates else None
+
+
+class WindowMax(WindowMin):
+    """
+    The maximum of the values in the window (None if the window is empty)
+    """
+    @staticmethod
+    def supersedes(new, old):
+        return new >= old
+
+
+WINDOW_AGGREGATORS = {
+    'count': WindowCount,
+    'sum': WindowSum,
+    'mean': WindowMean,
+    'variance': WindowVariance,
+    'min': WindowMin,
+    'max': WindowMax,
+}
+
+
+def _is_window_aggregator(aggregator):
+    """
+    Whether the object can be used as a window aggregator, i.e. it has add and remove methods and a value (which need
+    not come from WindowAggregator)
+
+    :param aggregator: The object
+    :return: True if the object is an aggregator
+    """
+    if isinstance(aggregator, type):
+        return False
+    return callable(getattr(aggregator, 'add', None)) and callable(getattr(aggregator, 'remove', None)) \
+        and (hasattr(type(aggregator), 'value') or 'value' in getattr(aggregator, '__dict__', {}))
+
+
+def make_window_aggregator(aggregator):
+    """
+    Create a window aggregator
+
+    :param aggregator: The name of an aggregator in WINDOW_AGGREGATORS, an aggregator (which is copied, so that its
+        state is not shared between windows), or a callable (such as a WindowAggregator subclass) that returns a new
+        aggregator. Aggregators are objects with add(value) and remove(value) methods and a value.
+    :return: The aggregator
+    :rtype: WindowAggregator
+    """
+    if _is_window_aggregator(aggregator):
+        return deepcopy(aggregator)
+    if callable(aggregator):
+        instance = aggregator()
+        if not _is_window_aggregator(instance):
+            raise TypeError("Window aggregator factory {} returned {}, which does not have add, remove and value"
+                            .format(aggregator, instance))
+        return instance
+    try:
+        return WINDOW_AGGREGATORS[aggregator]()
+    except (KeyError, TypeError):
+        raise ValueError("Unknown window aggregator {}, expected one of {}".format(
+            aggregator, ", ".join(sorted(WINDOW_AGGREGATORS))))
+
+
+class SlidingWindowBuffer(object):
+    """
+    A sliding window over a time ordered iterable of stream instances. The window is moved forwards with update(lower,
+    upper), after which it contains the instances with lower < timestamp <= upper. Instances are read lazily from the
+    data, and held in a deque, so that each instance is added and evicted once (amortised O(1) per instance).
+
+    Aggregators (see WindowAggregator) are updated with the values of the instances entering and leaving the window.
+    """
+    def __init__(self, data, aggregators=None):
+        """
+        Initialise the window
+
+        :param data: The stream instances, in time order
+        :param aggregators: Dictionary of aggregators (see make_window_aggregator)
+        :type aggregators: dict | None
+        """
+        self._data = iter(data)
+        self._pending = None
+        self.items = deque()
+        self.aggregators = dict((name, make_window_aggregator(aggregator))
+                                for name, aggregator in (aggregators or {}).items())
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def _push(self, item):
+        self.items.append(item)
+        for aggregator in self.aggregators.values():
+            aggregator.add(item.value)
+
+    def _evict(self):
+        item = self.items.popleft()
+        for aggregator in self.aggregators.values():
+            aggregator.remove(item.value)
+
+    def update(self, lower, upper):
+        """
+        Move the window to (lower, upper]
+
+        :param lower: The (exclusive) lower bound
+        :param upper: The (inclusive) upper bound
+        :return: self
+        """
+        items = self.items
+        while items and not lower < items[0].timestamp <= upper:
+            self._evict()
+
+        if self._pending is not None:
+            if self._pending.timestamp > upper:
+                return self
+            item, self._pending = self._pending, None
+            if lower < item.timestamp:
+                self._push(item)
+
+        for item in self._data:
+            if item.timestamp > upper:
+                self._pending = item
+                break
+            if lower < item.timestamp:
+                self._push(item)
+
+        return self
+
+    def values(self):
+        """
+        The values of the instances in the window
+
+        :return: The values
+        """
+        return [item.value for item in self.items]
+
+    @property
+    def aggregates(self):
+        """
+        The current values of the aggregators
+
+        :return: Dictionary from aggregator name to value
+        """
+        return dict((name, aggregator.value) for name, aggregator in self.aggregators.items())
@@ -26,6 +26,7 @@ computational graph by factors.
 """
 import logging
 import itertools
+from collections import defaultdict
 
 from ..plate import Plate, PlateValue
 from ..stream import StreamId
@@ -62,6 +63,7 @@ class Node(Printable):
         self.plates = plates if plates else []
         self._is_leaf = True  # All nodes are leaf nodes until they are declared as a source node in a factor
         self._plate_cache = set()  # used in the new API when doing repeated get/set operations for nested plates
+        self._plate_value_index = {}  # stream keys indexed by partial plate value, see streams_for_plate_value
 
     @property
     def streams(self):
@@ -76,6 +78,27 @@ class Node(Printable):
         # return list(itertools.chain(*[p.values for p in self.plates]))
         return Plate.get_overlapping_values(self.plates)
 
+    def streams_for_plate_value(self, plate_value):
+        """
+        Get the streams whose plate values contain the given (partial) plate value, in the order of the streams. The
+        stream keys are indexed on their values for the meta data ids of the plate value, the first time that these
+        meta data ids are requested, so that subsequent lookups are a single dictionary access.
+
+        :param plate_value: The partial plate value, as a tuple of (meta data id, value) pairs
+        :return: The matching streams
+        :type plate_value: tuple
+        :rtype: list[Stream]
+        """
+        meta_data_ids = frozenset(meta_data_id for meta_data_id, _ in plate_value)
+        index = self._plate_value_index.get(meta_data_ids)
+        if index is None:
+            index = defaultdict(list)
+            for key in self._streams:
+                if key is not None:
+                    index[frozenset(x for x in key if x[0] in meta_data_ids)].append(key)
+            self._plate_value_index[meta_data_ids] = index
+        return [self._streams[key] for key in index.get(frozenset(plate_value), ())]
+
     @property
     def factor(self):
         return self._factor
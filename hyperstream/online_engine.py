@@ -21,7 +21,7 @@
 Online Engine module. This will be used in the online execution mode.
 """
 import logging
-from time import sleep
+from time import sleep, time
 import signal
 from datetime import datetime, timedelta
 import fasteners
@@ -34,19 +34,91 @@ from .utils import UTC, utcnow
 class OnlineEngine(object):
     """
     OnlineEngine class.
+
+    The engine runs at a fixed rate (one tick every config.online_engine.sleep seconds, measured from the start of the
+    previous tick). At each tick every online workflow is executed incrementally: from its watermark (the time up to
+    which its sink streams have been calculated without gaps) to the end of the configured interval, and no further
+    than its input watermark (the time up to which its input streams are available, where this is known). Parts that
+    have already been calculated after a gap are not recalculated. Workflows without new data are skipped. A workflow
+    that is far behind (e.g. after downtime) is executed over at most config.online_engine.max_catch_up seconds per
+    tick, so that it catches up over several ticks.
     """
-    def __init__(self, hyperstream):
+    def __init__(self, hyperstream, workflow_ids=None):
         """
         Initialise the engine.
 
         :param hyperstream: The hyperstream object
+        :param workflow_ids: The ids of the online workflows to execute, or None for all of them
         """
         self.hyperstream = hyperstream
+        self.workflow_ids = workflow_ids
+        self.max_catch_up = hyperstream.config.online_engine.max_catch_up
+
+    @property
+    def online_workflows(self):
+        """
+        The workflows that are executed by the online engine. Only these are loaded if the workflow manager loads
+        workflows lazily.
+
+        :return: The online workflows
+        """
+        workflows = self.hyperstream.workflow_manager.workflows
+        workflow_ids = sorted(workflows) if self.workflow_ids is None else \
+            [workflow_id for workflow_id in self.workflow_ids if workflow_id in workflows]
+        return [workflows[workflow_id] for workflow_id in workflow_ids if workflows.is_online(workflow_id)]
+
+    @staticmethod
+    def get_workflow_interval(workflow, time_interval, max_catch_up=None):
+        """
+        Get the interval over which to execute the workflow in this tick
+
+        :param workflow: The workflow
+        :param time_interval: The interval for this tick
+        :param max_catch_up: The maximum width of the interval, or None for no limit
+        :type max_catch_up: timedelta | None
+        :return: The time interval, or None if there is nothing new to calculate
+        """
+        watermark = workflow.watermark
+        start = time_interval.start if watermark is None else watermark
+        end = time_interval.end
+
+        input_watermark = workflow.input_watermark
+        if input_watermark is not None and input_watermark < end:
+            end = input_watermark
+
+        if max_catch_up is not None and end - start > max_catch_up:
+            logging.info("Workflow {} is behind by {}, catching up by {}".format(
+                workflow.workflow_id, end - start, max_catch_up))
+            end = start + max_catch_up
+
+        if end <= start:
+            return None
+        return TimeInterval(start, end)
+
+    def execute_tick(self, time_interval):
+        """
+        Execute each of the online workflows over the new part of the time interval
+
+        :param time_interval: The time interval for this tick
+        :return: The ids of the workflows that were executed
+        """
+        executed = []
+        for workflow in self.online_workflows:
+            interval = self.get_workflow_interval(workflow, time_interval, self.max_catch_up)
+            if interval is None:
+                logging.debug("No new data for workflow {}, skipping".format(workflow.workflow_id))
+                continue
+
+            workflow.requested_intervals = TimeIntervals([interval])
+            logging.info("Executing workflow {} over interval {}".format(workflow.workflow_id, interval))
+            workflow.execute(interval)
+            executed.append(workflow.workflow_id)
+        return executed
 
     @fasteners.interprocess_locked('/tmp/hyperstream.lock')
     def execute(self, debug=False):
         """
-        Execute the engine - currently simple executes all workflows.
+        Execute the engine, running the online workflows incrementally at a fixed rate.
         """
 
         if debug:
@@ -63,6 +135,9 @@ class OnlineEngine(object):
             relative_interval = self.hyperstream.config.online_engine.interval
             time_interval = relative_interval.absolute(utcnow())
 
+        period = self.hyperstream.config.online_engine.sleep
+        next_tick = time()
+
         for _ in range(self.hyperstream.config.online_engine.iterations):
             if not debug:
                 # if this takes more than x minutes, kill myself
@@ -70,17 +145,20 @@ class OnlineEngine(object):
 
             logging.info("Online engine starting up.")
 
-            # self.hyperstream.workflow_manager.set_requested_intervals(workflow_id, TimeIntervals([time_interval]))
-            self.hyperstream.workflow_manager.set_all_requested_intervals(TimeIntervals([time_interval]))
-            self.hyperstream.workflow_manager.execute_all()
+            executed = self.execute_tick(time_interval)
 
-            logging.info("Online engine shutting down.")
+            logging.info("Online engine shutting down ({} workflows executed).".format(len(executed)))
             logging.info("")
 
-            sleep(self.hyperstream.config.online_engine.sleep)
+            # Wait for the next tick. If the tick overran, start the next one immediately rather than catching up
+            next_tick += period
+            now = time()
+            if next_tick < now:
+                logging.warn("Online engine tick took longer than the period of {} seconds".format(period))
+                next_tick = now
+            sleep(next_tick - now)
 
             if debug:
                 time_interval += duration
             else:
-                time_interval = TimeInterval(time_interval.end, utcnow() + timedelta(seconds=relative_interval.end))
-
+                time_interval = relative_interval.absolute(utcnow())
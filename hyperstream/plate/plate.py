@@ -23,7 +23,7 @@ Plate definition.
 from hyperstream.utils import Printable
 
 import itertools
-from collections import deque, namedtuple
+from collections import defaultdict, namedtuple
 from six import string_types
 
 
@@ -61,6 +61,21 @@ class Plate(Printable):
         # self._values = [tuple(sorted(pv.items())) for pv in values]
         self._parent = parent_plate
 
+        # Derived data, computed on first use. The plate manager invalidates these when plates are added or deleted
+        self._ancestors = None
+        self._value_set = None
+        self._overlapping_values = {}
+
+    def invalidate_cache(self):
+        """
+        Clear the cached ancestor chain, value set and overlapping values of this plate
+
+        :return: None
+        """
+        self._ancestors = None
+        self._value_set = None
+        self._overlapping_values = {}
+
     @property
     def parent(self):
         return self._parent
@@ -69,6 +84,15 @@ class Plate(Printable):
     def values(self):
         return self._values
 
+    @property
+    def value_set(self):
+        """
+        The plate values as a set, for fast membership tests
+        """
+        if self._value_set is None:
+            self._value_set = frozenset(self._values)
+        return self._value_set
+
     @property
     def value_tuples(self):
         return [PlateValue(self, v) for v in self.values]
@@ -82,23 +106,6 @@ class Plate(Printable):
     # def identifier(self):
     #     return None
 
-    def _get_ancestors(self, current=None):
-        """
-        Gets the ancestors of this node
-        :param current: The current ancestor list
-        :return: The ancestor list
-        :type current: list[Plate] | list[str] | list[unicode] | None
-        :rtype: list[Plate] | list[str] | list[unicode]
-        """
-        if not current:
-            current = []
-        current.insert(0, self)
-        if self.is_root:
-            if current:
-                return current
-        else:
-            return self.parent._get_ancestors(current)
-
     @property
     def ancestor_plate_ids(self):
         """
@@ -109,9 +116,11 @@ class Plate(Printable):
     @property
     def ancestor_plates(self):
         """
-        All ancestor plates in the tree
+        All ancestor plates in the tree, from the root down to (and including) this plate
         """
-        return self._get_ancestors(current=None)
+        if self._ancestors is None:
+            self._ancestors = (self.parent.ancestor_plates if self.parent else []) + [self]
+        return self._ancestors
 
     @property
     def ancestor_meta_data_ids(self):
@@ -135,7 +144,7 @@ class Plate(Printable):
         :param other: The other plate
         :return: True if this plate is a sub-plate of the other plate
         """
-        if all(v in set(other.values) for v in self.values):
+        if all(v in other.value_set for v in self.values):
             return True
         if all(any(all(spv in m for spv in v) for m in map(set, other.values)) for v in self.values):
             return True
@@ -252,72 +261,73 @@ class Plate(Printable):
         if len(plates) > 2:
             raise NotImplementedError
 
+        key = tuple(plates)
+        cache = plates[0]._overlapping_values
+        if key not in cache:
+            cache[key] = Plate._join_values(*plates)
+        return cache[key]
+
+    @staticmethod
+    def _join_values(first, second):
+        """
+        Compute the overlapping values of two plates (see get_overlapping_values). The values of each plate are hashed
+        on their values of the deepest plate that both share, so that each shared value is joined with the matching
+        values of both plates in a single pass.
+
+        :param first: The first plate
+        :param second: The second plate
+        :return: The plate values
+        :type first: Plate
+        :type second: Plate
+        """
         # First check for the simple case where one of the plates has no parent
         # and does not share meta data with the other
-        plates_sorted = sorted(plates, key=lambda item: len(item.ancestor_plates))
+        plates_sorted = sorted((first, second), key=lambda item: len(item.ancestor_plates))
         if plates_sorted[0].is_root:
             if plates_sorted[0].meta_data_id not in plates_sorted[1].ancestor_meta_data_ids:
-                return map(lambda x: tuple(itertools.chain(*x)), itertools.product(plates[0].values, plates[1].values))
+                return [tuple(itertools.chain(*x)) for x in itertools.product(first.values, second.values)]
+
+        # Find the deepest plate that is shared by both ancestor chains
+        shared = None
+        for a, b in zip(first.ancestor_plates, second.ancestor_plates):
+            if a is not b:
+                if a.meta_data_id == b.meta_data_id:
+                    # Not identical, but same meta data id
+                    raise NotImplementedError
+                break
+            shared = a
 
-        # Get all of the ancestors zipped together, padded with None
-        ancestors = deque(itertools.izip_longest(*(p.ancestor_plates for p in plates)))
+        if shared is None:
+            raise NotImplementedError
 
-        last_values = []
-        while len(ancestors) > 0:
-            current = ancestors.popleft()
-            if current[0] == current[1]:
-                # Plates are identical, take all values valid for matching parents
-                if last_values:
-                    raise NotImplementedError
-                else:
-                    last_values.extend(current[0].values)
+        shared_meta_data_ids = set(shared.ancestor_meta_data_ids)
 
-            elif current[0] is not None and current[1] is not None \
-                    and current[0].meta_data_id == current[1].meta_data_id:
-                # Not identical, but same meta data id. Take all overlapping values valid for matching parents
-                if last_values:
-                    raise NotImplementedError
-                else:
-                    raise NotImplementedError
-            else:
-                # Different plates, take cartesian product of values with matching parents.
-                # Note that one of them may be none
-                if last_values:
-                    tmp = []
-                    for v in last_values:
-                        # Get the valid ones based on v
-                        # valid = [filter(lambda x: all(xx in v for xx in x[:-1]), c.values)
-                        #          for c in current if c is not None]
-                        valid = [filter(lambda x: all(vv in x for vv in v), c.values)
-                                 for c in current if c is not None]
-
-                        # Strip out v from the valid ones
-                        stripped = [map(lambda y: tuple(itertools.chain(*(yy for yy in y if yy not in v))), val)
-                                    for val in valid]
-
-                        # Get the cartesian product. Note that this still works if one of the current is None
-                        prod = list(itertools.product(*stripped))
-
-                        # Now update the last values be the product with v put back in
-                        new_values = [v + p for p in prod]
-                        if new_values:
-                            tmp.append(new_values)
-
-                    last_values = list(itertools.chain(*tmp))
-                    if not last_values:
-                        raise ValueError("Plate value computation failed - possibly there were no shared plate values")
-                else:
-                    raise NotImplementedError
+        def index(plate):
+            # Group the values by their shared part, keeping the remaining part in order
+            indexed = defaultdict(list)
+            for value in plate.values:
+                joined = frozenset(x for x in value if x[0] in shared_meta_data_ids)
+                indexed[joined].append(tuple(x for x in value if x[0] not in shared_meta_data_ids))
+            return indexed
 
-        if not last_values:
+        first_index = index(first)
+        second_index = first_index if second is first else index(second)
+
+        values = []
+        for v in shared.values:
+            joined = frozenset(v)
+            for a, b in itertools.product(first_index.get(joined, ()), second_index.get(joined, ())):
+                values.append(v + a + b)
+
+        if not values:
             raise ValueError("Plate value computation failed - possibly there were no shared plate values")
 
-        return last_values
+        return values
 
     def __iter__(self):
         """
         Iterator that returns tuples of self and value so that for ... in notation can be used
-        
+
         :return: iterator over the value tuples
         """
         return iter(self.value_tuples)
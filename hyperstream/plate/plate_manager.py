@@ -93,6 +93,7 @@ class PlateManager(Printable):
                 p = PlateDefinitionModel.objects.get(plate_id=plate_id)
                 p.delete()
                 del self.plates[plate_id]
+                self.invalidate_plate_caches()
             except DoesNotExist as e:
                 logging.warn(e)
         logging.info("Plate {} deleted".format(plate_id))
@@ -154,8 +155,19 @@ class PlateManager(Printable):
             values=values,
             parent_plate=self.plates[plate_definition.parent_plate] if plate_definition.parent_plate else None)
 
+        self.invalidate_plate_caches()
+
         logging.debug("Added plate: {}".format(self.plates[plate_definition.plate_id]))
 
+    def invalidate_plate_caches(self):
+        """
+        Clear the cached ancestor chains and plate values of all plates. Called whenever the set of plates changes.
+
+        :return: None
+        """
+        for plate in self.plates.values():
+            plate.invalidate_cache()
+
     def get_plate_values(self, plate_definition):
         """
         Gets the plate values from the global meta data according to the given plate definition
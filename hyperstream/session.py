@@ -24,12 +24,18 @@ from .models import SessionModel, UnameField
 from .stream import StreamId, StreamInstance
 from .time_interval import TimeInterval
 
+from datetime import timedelta
 import os
 import uuid
+from threading import Lock
+from time import sleep
 from mongoengine.context_managers import switch_db
 
 
 class Session(object):
+    # The spacing of history entries that are written in the same millisecond
+    history_resolution = timedelta(milliseconds=1)
+
     def __init__(self, hyperstream, model=None, history_channel='mongo'):
         """
         Initialise the session object. A hyperstream session is used to store execution history
@@ -57,6 +63,8 @@ class Session(object):
 
         self._hyperstream = hyperstream
         self._history_stream = None
+        self._history_lock = Lock()
+        self._last_history_timestamp = None
         self._history_channel = self._hyperstream.channel_manager[history_channel]
 
         stream_id = StreamId("session", meta_data=(('uuid', str(self.session_id)), ))
@@ -154,8 +162,29 @@ class Session(object):
         return self._history_stream.window(TimeInterval.up_to_now()).items()
 
     def write_to_history(self, **kwargs):
-        instance = StreamInstance(utcnow(), kwargs)
+        """
+        Write an entry to the session history. This is safe to call from multiple threads (e.g. when plate values are
+        executed in parallel). Entries are given distinct timestamps, since a stream can only hold one value per
+        timestamp: an entry written in the same millisecond as the previous one is given the next millisecond, and is
+        only written once the clock has reached it, so that no entry is in the future. Only the timestamp allocation is
+        done under the lock, so that the entries are written (and wait for the clock) concurrently.
+
+        :param kwargs: The history entry
+        :return: None
+        """
+        with self._history_lock:
+            timestamp = utcnow()
+            if self._last_history_timestamp is not None and timestamp <= self._last_history_timestamp:
+                timestamp = self._last_history_timestamp + self.history_resolution
+            self._last_history_timestamp = timestamp
+
+        delay = (timestamp - utcnow()).total_seconds()
+        while delay > 0:
+            sleep(delay)
+            delay = (timestamp - utcnow()).total_seconds()
+        instance = StreamInstance(timestamp, kwargs)
         self._history_stream.writer(instance)
+        self._history_stream.flush()
 
     def close(self):
         """
@@ -22,4 +22,4 @@ from .stream_id import StreamId, get_stream_id
 from .stream_instance import StreamInstance, StreamMetaInstance
 from .stream_view import StreamView
 from .stream import Stream, DatabaseStream, AssetStream
-from .stream_collections import StreamDict, StreamInstanceCollection
+from .stream_collections import StreamDict, StreamInstanceCollection, StreamInstanceArray
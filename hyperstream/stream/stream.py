@@ -87,11 +87,33 @@ class Stream(Hashable):
     def __repr__(self):
         return str(self)
 
+    def __setattr__(self, key, value):
+        if key in ("channel", "stream_id"):
+            # The identity of the stream has changed
+            self.__dict__.pop("_identity", None)
+        super(Stream, self).__setattr__(key, value)
+
+    @property
+    def identity(self):
+        """
+        The hash of the fields that identify this stream (type, stream id and channel id), along with the fields. These
+        are computed once and cached, since streams are used as set members and dictionary keys.
+
+        :return: The hash and the tuple of identity fields
+        """
+        if self.__dict__.get("_identity") is None:
+            fields = (self.__class__.__name__, self.stream_id, getattr(self.channel, "channel_id", None))
+            self._identity = (hash(fields), fields)
+        return self._identity
+
     def __eq__(self, other):
-        return str(self) == str(other)
+        return isinstance(other, Stream) and self.identity == other.identity
+
+    def __ne__(self, other):
+        return not self == other
 
     def __hash__(self):
-        return hash(str(self))
+        return self.identity[0]
 
     @property
     def parent_node(self):
@@ -151,6 +173,15 @@ class Stream(Hashable):
     def writer(self):
         return self.channel.get_stream_writer(self)
 
+    def flush(self):
+        """
+        Flush any documents buffered by the stream writer. This should be called before the calculated intervals are
+        updated, so that intervals are never marked as calculated before their data has been written.
+
+        :return: None
+        """
+        self.channel.flush_stream(self)
+
     def window(self, time_interval=None, force_calculation=False):
         """
         Gets a view on this stream for the time interval given
@@ -192,6 +223,9 @@ class DatabaseStream(Stream):
             calculated_intervals=None,  # TODO: probably no point in having the actual calculated intervals here
             sandbox=sandbox)
 
+        # Whether the calculated intervals have been updated in memory but not yet written to the database
+        self._calculated_intervals_dirty = False
+
         if mongo_model:
             self.mongo_model = mongo_model
             self._calculated_intervals = self.mongo_model.get_calculated_intervals()
@@ -217,7 +251,10 @@ class DatabaseStream(Stream):
         """
         with switch_db(StreamDefinitionModel, 'hyperstream'):
             self.mongo_model = StreamDefinitionModel.objects.get(__raw__=self.stream_id.as_raw())
-            self._calculated_intervals = self.mongo_model.get_calculated_intervals()
+            if not self._calculated_intervals_dirty:
+                # Otherwise the in-memory calculated intervals are newer than those in the database, and are written to
+                # the model by save_calculated_intervals
+                self._calculated_intervals = self.mongo_model.get_calculated_intervals()
 
     def save(self):
         """
@@ -226,9 +263,39 @@ class DatabaseStream(Stream):
 
         :return: None
         """
+        if self._calculated_intervals_dirty:
+            self.mongo_model.set_calculated_intervals(self._calculated_intervals)
+            self._calculated_intervals_dirty = False
         with switch_db(StreamDefinitionModel, 'hyperstream'):
             self.mongo_model.save()
 
+    def save_calculated_intervals(self):
+        """
+        Writes the calculated intervals to the database, using an atomic update of that field only (rather than saving
+        the whole stream definition)
+
+        :return: None
+        """
+        self.mongo_model.set_calculated_intervals(self._calculated_intervals)
+        with switch_db(StreamDefinitionModel, 'hyperstream'):
+            if self.mongo_model.pk is None:
+                self.mongo_model.save()
+            else:
+                StreamDefinitionModel.objects(pk=self.mongo_model.pk).update_one(
+                    set__calculated_intervals=self.mongo_model.calculated_intervals)
+        self._calculated_intervals_dirty = False
+
+    def flush(self):
+        """
+        Flush any buffered documents, followed by any calculated intervals that have not yet been written to the
+        database
+
+        :return: None
+        """
+        super(DatabaseStream, self).flush()
+        if self._calculated_intervals_dirty:
+            self.save_calculated_intervals()
+
     @property
     def calculated_intervals(self):
         """
@@ -245,15 +312,20 @@ class DatabaseStream(Stream):
     @calculated_intervals.setter
     def calculated_intervals(self, intervals):
         """
-        Updates the calculated intervals in the database. Performs an upsert
+        Updates the calculated intervals. The in-memory intervals are the source of truth: they are written to the
+        database straight away, or on the next flush if the channel coalesces calculated interval updates. In the
+        latter case, an update only marks the stream as dirty, so that it does not depend on the number of intervals.
 
         :param intervals: The calculated intervals
         :return: None
         """
         logging.debug("set calculated intervals")
-        self.mongo_model.set_calculated_intervals(intervals)
-        self.save()
-        self._calculated_intervals = TimeIntervals(intervals)
+        if not isinstance(intervals, TimeIntervals):
+            intervals = TimeIntervals(intervals)
+        self._calculated_intervals = intervals
+        self._calculated_intervals_dirty = True
+        if not getattr(self.channel, "coalesce_calculated_intervals", False):
+            self.save_calculated_intervals()
 
     @property
     def last_accessed(self):
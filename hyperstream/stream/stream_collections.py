@@ -20,16 +20,106 @@
 # OR OTHER DEALINGS IN THE SOFTWARE.
 
 from . import Stream, StreamId, StreamInstance
-from ..utils import TypedBiDict, FrozenKeyDict
+from ..utils import TypedBiDict, FrozenKeyDict, datetime2unix_ms, unix_ms2datetime
+
+from array import array
+from bisect import bisect_left, bisect_right
+from six import integer_types
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    array('q')
+    INT64_TYPECODE = 'q'
+except ValueError:
+    # Python 2 does not support long long arrays
+    INT64_TYPECODE = 'l'
 
 
 class StreamDict(TypedBiDict):
     """
     Custom bi-directional dictionary where keys are StreamID objects and values are Stream objects.
-    Raises ValueDuplicationError if the same Stream is added again
+    Raises ValueDuplicationError if the same Stream is added again. Streams can also be registered lazily (see
+    add_lazy), in which case they are only constructed when first accessed.
     """
     def __init__(self, *args, **kwargs):
         super(StreamDict, self).__init__(StreamId, Stream, *args, **kwargs)
+        self._loaders = {}
+
+    def add_lazy(self, stream_id, loader):
+        """
+        Register a stream without constructing it. The loader is called to construct the stream the first time that it
+        is accessed by id (or when all of the streams are requested), after which the stream is stored as usual.
+
+        :param stream_id: The stream id
+        :param loader: Function without arguments that returns the stream
+        :type stream_id: StreamId
+        :return: None
+        """
+        if not isinstance(stream_id, self.key_type):
+            raise TypeError("expected {}, got {}".format(self.key_type, type(stream_id)))
+        self._loaders[stream_id] = loader
+
+    @property
+    def num_pending(self):
+        """
+        The number of registered streams that have not yet been constructed
+        """
+        return len(self._loaders)
+
+    def _materialise(self, stream_id):
+        loader = self._loaders.pop(stream_id)
+        self[stream_id] = loader()
+
+    def _materialise_all(self):
+        for stream_id in list(self._loaders):
+            self._materialise(stream_id)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self._store) + len(self._loaders)
+
+    def __getitem__(self, key):
+        if key in self._loaders:
+            self._materialise(key)
+        return super(StreamDict, self).__getitem__(key)
+
+    def __setitem__(self, key, value):
+        self._loaders.pop(key, None)
+        super(StreamDict, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        if key in self._loaders:
+            del self._loaders[key]
+        else:
+            super(StreamDict, self).__delitem__(key)
+
+    def __contains__(self, item):
+        return item in self._loaders or item in self._store
+
+    def keys(self):
+        return list(self._store.keys()) + list(self._loaders.keys())
+
+    def values(self):
+        self._materialise_all()
+        return super(StreamDict, self).values()
+
+    def items(self):
+        self._materialise_all()
+        return super(StreamDict, self).items()
+
+    def itervalues(self):
+        self._materialise_all()
+        return super(StreamDict, self).itervalues()
+
+    def iteritems(self):
+        self._materialise_all()
+        return super(StreamDict, self).iteritems()
 
 
 class StreamInstanceCollection(FrozenKeyDict):
@@ -44,3 +134,132 @@ class StreamInstanceCollection(FrozenKeyDict):
     def extend(self, instances):
         for instance in instances:
             self.append(instance)
+
+
+class StreamInstanceArray(object):
+    """
+    Columnar storage for the instances of a single stream. Timestamps are kept as sorted integer milliseconds since the
+    epoch, with the values in a parallel sequence. Appending in time order is amortised O(1), and the instances in a
+    time interval are found by binary search. Integer and float values are kept in typed arrays, which can be
+    retrieved as numpy arrays using arrays(). Will raise an exception if a repeated instance is added with a different
+    value (see StreamInstanceCollection)
+    """
+    def __init__(self):
+        self.timestamps = array(INT64_TYPECODE)
+        self.values = None
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __iter__(self):
+        return self.window()
+
+    @staticmethod
+    def _new_values(value):
+        """
+        Choose the storage for the values based on the first value
+
+        :param value: The first value
+        :return: The empty value sequence
+        """
+        if isinstance(value, bool):
+            return []
+        if isinstance(value, integer_types):
+            return array(INT64_TYPECODE)
+        if isinstance(value, float):
+            return array('d')
+        return []
+
+    def _accepts(self, value):
+        """
+        Whether the value can be stored in the current value sequence without changing its type
+
+        :param value: The value
+        :return: True if the value can be stored
+        """
+        if isinstance(self.values, list):
+            return True
+        if isinstance(value, bool):
+            return False
+        if self.values.typecode == 'd':
+            return isinstance(value, float)
+        return isinstance(value, integer_types)
+
+    def _insert(self, index, timestamp, value):
+        if self.values is None:
+            self.values = self._new_values(value)
+        if not self._accepts(value):
+            self.values = list(self.values)
+        try:
+            self.values.insert(index, value)
+        except OverflowError:
+            # Integer too large for the typed array
+            self.values = list(self.values)
+            self.values.insert(index, value)
+        self.timestamps.insert(index, timestamp)
+
+    def append(self, instance):
+        if not (isinstance(instance, StreamInstance)):
+            raise ValueError("Expected StreamInstance, got {}".format(type(instance)))
+        timestamp = datetime2unix_ms(instance.timestamp)
+        n = len(self.timestamps)
+
+        if n == 0 or timestamp > self.timestamps[-1]:
+            self._insert(n, timestamp, instance.value)
+            return
+
+        # Out of order or repeated instance
+        i = bisect_left(self.timestamps, timestamp)
+        if i < n and self.timestamps[i] == timestamp:
+            # Reconcile with the existing value in the same way as StreamInstanceCollection
+            existing = FrozenKeyDict([(instance.timestamp, self.values[i])])
+            existing[instance.timestamp] = instance.value
+        else:
+            self._insert(i, timestamp, instance.value)
+
+    def extend(self, instances):
+        for instance in instances:
+            self.append(instance)
+
+    def _bounds(self, time_interval):
+        """
+        Get the indices of the instances that lie within the time interval (start, end]
+
+        :param time_interval: The time interval
+        :return: The lower and upper indices
+        """
+        if time_interval is None:
+            return 0, len(self.timestamps)
+        lower = bisect_right(self.timestamps, datetime2unix_ms(time_interval.start))
+        upper = bisect_right(self.timestamps, datetime2unix_ms(time_interval.end), lower)
+        return lower, upper
+
+    def window(self, time_interval=None):
+        """
+        Generator over the stream instances in the time interval, in time order
+
+        :param time_interval: The time interval (None for all instances)
+        :return: The stream instances
+        """
+        lower, upper = self._bounds(time_interval)
+        for i in range(lower, upper):
+            yield StreamInstance.from_normalised(unix_ms2datetime(self.timestamps[i]), self.values[i])
+
+    def arrays(self, time_interval=None):
+        """
+        Get the timestamps (in milliseconds since the epoch) and values in the time interval.
+        If numpy is available these are numpy arrays, otherwise they are typed arrays or lists.
+
+        :param time_interval: The time interval (None for all instances)
+        :return: The timestamps and values
+        """
+        lower, upper = self._bounds(time_interval)
+        timestamps = self.timestamps[lower:upper]
+        values = self.values[lower:upper] if self.values is not None else []
+        if np is None:
+            return timestamps, values
+        if isinstance(values, array):
+            values = np.frombuffer(values, dtype=np.float64 if values.typecode == 'd' else np.int64)
+        else:
+            values = np.array(values)
+        return np.frombuffer(timestamps, dtype=np.int64), values
@@ -22,22 +22,31 @@
 from ..utils import Hashable
 
 import json
+import weakref
 from six import string_types
 
 
+# Shared instances of stream ids, keyed by name and canonical meta data (see StreamId.intern)
+_interned = weakref.WeakValueDictionary()
+
+
 def get_stream_id(item):
     if isinstance(item, StreamId):
         return item
     if isinstance(item, string_types):
         # Assume this is a simple stream definition with no metadata
-        return StreamId(name=item)
+        return StreamId(name=item).intern()
     # Assume that this is a dict containing the name and metadata
-    return StreamId(**item)
+    return StreamId(**item).intern()
 
 
 class StreamId(Hashable):
     """
-    Helper class for stream identifiers. A stream identifier contains the stream name and any meta-data
+    Helper class for stream identifiers. A stream identifier contains the stream name and any meta-data.
+
+    Stream ids are immutable. The canonical (sorted) meta data and the hash are computed once on construction, since
+    stream ids are used as dictionary keys throughout. The meta data keeps the order in which it was given, so that the
+    stored (mongo) representation does not change.
     """
 
     def __init__(self, name, meta_data=None):
@@ -56,6 +65,36 @@ class StreamId(Hashable):
         else:
             self.meta_data = tuple()
 
+        self._canonical = tuple(sorted(self.meta_data))
+        self._hash = hash((self.name, self._canonical))
+        self._frozen = True
+
+    def __setattr__(self, key, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError("{} objects are immutable".format(self.__class__.__name__))
+        super(StreamId, self).__setattr__(key, value)
+
+    def __reduce__(self):
+        # Reconstruct on unpickling/copying, since the hash of strings can differ between processes
+        return self.__class__, (self.name, self.meta_data)
+
+    def intern(self):
+        """
+        Get the shared instance of this stream id, so that repeated stream ids can share one object. The shared
+        instance is kept for as long as it is referenced elsewhere.
+
+        :return: The shared stream id (this object if there was none)
+        :rtype: StreamId
+        """
+        return _interned.setdefault((self.name, self._canonical), self)
+
+    @property
+    def canonical_meta_data(self):
+        """
+        The meta data sorted by key, as used for comparison and hashing
+        """
+        return self._canonical
+
     def __str__(self):
         if self.meta_data:
             # return self.name + ": [" + ", ".join("{}={}".format(k, v) for k, v in self.meta_data.items()) + "]"
@@ -71,12 +110,18 @@ class StreamId(Hashable):
         )
 
     def __eq__(self, other):
+        if self is other:
+            return True
         return isinstance(other, StreamId) and \
+               self._hash == other._hash and \
                self.name == other.name and \
-               sorted(self.meta_data) == sorted(other.meta_data)
+               self._canonical == other._canonical
+
+    def __ne__(self, other):
+        return not self == other
 
     def __hash__(self):
-        return hash(self.to_json())
+        return self._hash
 
     def to_json(self):
         return json.dumps(self.as_dict())
@@ -22,13 +22,16 @@
 from datetime import datetime
 from collections import namedtuple
 
-from ..utils import utcnow, remove_microseconds
+from ..utils import utcnow, remove_microseconds, MIN_DATE
 
 
 class StreamInstance(namedtuple("StreamInstance", "timestamp value")):
     """
     Simple helper class for storing data instances that's a bit neater than simple tuples
     """
+    # The most recent clock reading. Timestamps up to this are known not to be in the future, so the clock only needs to
+    # be read again for timestamps after it
+    _now = MIN_DATE
 
     def __new__(cls, timestamp, value):
         if not isinstance(timestamp, datetime):
@@ -37,11 +40,52 @@ class StreamInstance(namedtuple("StreamInstance", "timestamp value")):
         # HyperStream operates at millisecond precision
         timestamp = remove_microseconds(timestamp)
 
-        if timestamp > utcnow():
-            raise ValueError("Timestamp {} should not be in the future!".format(timestamp))
+        if timestamp > StreamInstance._now:
+            StreamInstance._now = utcnow()
+            if timestamp > StreamInstance._now:
+                raise ValueError("Timestamp {} should not be in the future!".format(timestamp))
 
         return super(StreamInstance, cls).__new__(cls, timestamp, value)
 
+    @classmethod
+    def from_normalised(cls, timestamp, value):
+        """
+        Construct a stream instance without validation, for timestamps that are known to be normalised (timezone aware
+        UTC with millisecond precision) and not in the future, e.g. the timestamps of existing stream instances.
+
+        :param timestamp: The timestamp
+        :param value: The value
+        :return: The stream instance
+        """
+        return tuple.__new__(cls, (timestamp, value))
+
+    @classmethod
+    def from_arrays(cls, timestamps, values):
+        """
+        Construct a batch of stream instances from parallel sequences of timestamps and values. The timestamps are
+        normalised (which is free when they are already millisecond aligned UTC), and are checked against a single
+        clock reading for the whole batch. They need not be in time order.
+
+        :param timestamps: The timestamps
+        :param values: The values
+        :type timestamps: list[datetime]
+        :return: The stream instances, in the order of the timestamps
+        :rtype: list[StreamInstance]
+        """
+        if len(timestamps) != len(values):
+            raise ValueError("Expected the same number of timestamps and values, got {} and {}".format(
+                len(timestamps), len(values)))
+        now = StreamInstance._now = utcnow()
+        instances = []
+        for timestamp, value in zip(timestamps, values):
+            if not isinstance(timestamp, datetime):
+                raise ValueError("Timestamp must be datetime.datetime")
+            timestamp = remove_microseconds(timestamp)
+            if timestamp > now:
+                raise ValueError("Timestamp {} should not be in the future!".format(timestamp))
+            instances.append(tuple.__new__(cls, (timestamp, value)))
+        return instances
+
     def as_list(self, flat=True):
         if flat:
             l = self.value.items()
@@ -126,13 +126,13 @@ class StreamView(Printable):
         # TODO: is this needed now we have a Component() tool?
         for (time, data) in self.iteritems():
             if key in data:
-                yield StreamInstance(time, data[key])
+                yield StreamInstance.from_normalised(time, data[key])
 
     def component_filter(self, key, values):
         # TODO: is this needed now we have a ComponentFilter() tool?
         for (time, data) in self.iteritems():
             if key in data and data[key] in values:
-                yield StreamInstance(time, data)
+                yield StreamInstance.from_normalised(time, data)
 
     def delete_nones(self):
         # TODO: Test this against ComponentFilter(key, values=[None], complement=true)
@@ -141,4 +141,4 @@ class StreamView(Printable):
             for (key, value) in data.items():
                 if value is not None:
                     data2[key] = value
-            yield StreamInstance(time, data2)
\ No newline at end of file
+            yield StreamInstance.from_normalised(time, data2)
\ No newline at end of file
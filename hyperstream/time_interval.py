@@ -21,13 +21,14 @@
 Module for dealing with time intervals containing TimeInterval, TimeIntervals, and RelativeTimeInterval
 """
 
-from .utils import MIN_DATE, MAX_DATE, utcnow, UTC, Printable, get_timedelta, is_naive, remove_microseconds
+from .utils import MIN_DATE, MAX_DATE, utcnow, UTC, Printable, get_timedelta, remove_microseconds
 
 from datetime import date, datetime, timedelta
 import ciso8601
 from collections import namedtuple
 import arrow
 import json
+import warnings
 
 
 def profile(ob):
@@ -45,6 +46,10 @@ class TimeIntervals(Printable):
     """
     Container class for time intervals, that manages splitting and joining
     Example object: (t1,t2] U (t3,t4] U ...
+
+    The intervals are always kept sorted and merged (no two intervals overlap or touch), and the object is immutable:
+    union (+), intersection (&) and difference (-) return new objects, and are computed with a single linear sweep over
+    the two sets of intervals.
     """
     @profile
     def __init__(self, intervals=None):
@@ -54,7 +59,20 @@ class TimeIntervals(Printable):
 
         :param intervals: The time intervals
         """
-        self.intervals = self.parse(intervals)
+        self.intervals = self.normalise(self.parse(intervals))
+
+    @classmethod
+    def from_normalised(cls, intervals):
+        """
+        Construct the object from intervals that are already sorted and merged, skipping parsing and normalisation
+
+        :param intervals: The sorted and merged time intervals
+        :type intervals: tuple[TimeInterval]
+        :return: The time intervals object
+        """
+        obj = cls.__new__(cls)
+        obj.intervals = intervals
+        return obj
 
     # @profile
     def __str__(self):
@@ -74,21 +92,56 @@ class TimeIntervals(Printable):
                         raise TypeError()
                     v = parse_time_tuple(*v)
                 elif isinstance(v, TimeInterval):
-                    v = TimeInterval(v.start, v.end)
+                    # The end points of an existing TimeInterval have already been validated
+                    v = TimeInterval.from_normalised(v.start, v.end)
                 else:
                     raise TypeError("Expected tuple/list/TimeInterval ({} given)".format(type(v)))
-                # try:
-                #     v = parse_time_tuple(*v)
-                # except Exception as e:
-                #     import logging
-                #     logging.debug(e)
-                #     if isinstance(v, TimeInterval):
-                #         v = TimeInterval(v.start, v.end)
-                #     else:
-                #         raise TypeError("Expected tuple/list/TimeInterval ({} given)".format(type(v)))
                 parsed.append(v)
         return parsed
 
+    @staticmethod
+    @profile
+    def normalise(intervals):
+        """
+        Sort the intervals and merge any that overlap or touch
+
+        :param intervals: The time intervals
+        :type intervals: list[TimeInterval]
+        :return: The sorted and merged time intervals
+        :rtype: tuple[TimeInterval]
+        """
+        if len(intervals) < 2:
+            return tuple(intervals)
+        intervals = sorted(intervals, key=lambda x: x.start)
+        merged = [intervals[0]]
+        for interval in intervals[1:]:
+            last = merged[-1]
+            if interval.start <= last.end:
+                if interval.end > last.end:
+                    merged[-1] = TimeInterval.from_normalised(last.start, interval.end)
+            else:
+                merged.append(interval)
+        return tuple(merged)
+
+    @staticmethod
+    def _coerce(other):
+        """
+        Convert the argument of a set operation to a TimeIntervals object
+
+        :param other: The other operand
+        :type other: TimeIntervals | TimeInterval | list | tuple | None
+        :return: The time intervals
+        :rtype: TimeIntervals
+        """
+        if isinstance(other, TimeIntervals):
+            return other
+        if isinstance(other, TimeInterval):
+            # Copy the interval, so that the result does not share it with the caller (see TimeInterval.start)
+            return TimeIntervals.from_normalised((TimeInterval.from_normalised(other.start, other.end), ))
+        if not other:
+            return TimeIntervals.from_normalised(())
+        return TimeIntervals(other)
+
     @property
     # @profile
     def is_empty(self):
@@ -97,17 +150,17 @@ class TimeIntervals(Printable):
     @property
     # @profile
     def start(self):
-        return min(self.intervals, key=lambda x: x.start).start if self.intervals else None
+        return self.intervals[0].start if self.intervals else None
 
     @property
     # @profile
     def end(self):
-        return max(self.intervals, key=lambda x: x.end).end if self.intervals else None
+        return self.intervals[-1].end if self.intervals else None
 
     @property
     # @profile
     def span(self):
-        return TimeInterval(self.start, self.end) if self.intervals else None
+        return TimeInterval.from_normalised(self.start, self.end) if self.intervals else None
 
     @property
     # @profile
@@ -115,109 +168,154 @@ class TimeIntervals(Printable):
         return " U ".join(map(lambda x: x.humanized, self.intervals)) if self.intervals else "Empty"
 
     @profile
-    def split(self, points):
-        if len(points) == 0:
-            return
-        p = points[-1]
-        for i in range(len(self.intervals)):
-            if (self.intervals[i].start < p) and (self.intervals[i].end > p):
-                self.intervals = self.intervals[:i] \
-                                 + [TimeInterval(self.intervals[i].start, p), TimeInterval(p, self.intervals[i].end)] \
-                                 + self.intervals[(i + 1):]
-        self.split(points[:-1])
+    def __add__(self, other):
+        """
+        Union of the time intervals. Merges the two sorted sequences, coalescing as it goes
 
-    # @profile
-    def compress(self):
-        if len(self.intervals) == 0:
-            return
-        v = self.intervals[:1]
-        for i in range(1, len(self.intervals)):
-            if self.intervals[i].start == v[-1].end:
-                v[-1] = TimeInterval(v[-1].start, self.intervals[i].end)
-            else:
-                v.append(self.intervals[i])
-        self.intervals = v
+        :param other: The other time intervals
+        :return: The union
+        """
+        other = self._coerce(other)
+        if not other.intervals:
+            return self
+        if not self.intervals:
+            return other
 
-    @profile
-    def __add__(self, other):
-        if isinstance(other, TimeInterval):
-            if self.is_empty:
-                return TimeIntervals([other])
-            if other.start > self.end:
-                self.intervals.append(other)
-            elif other.end < self.start:
-                self.intervals.insert(0, other)
-            elif other.start == self.end:
-                self.intervals[-1].end = other.end
-            elif other.end == self.start:
-                self.intervals[0].start = other.start
+        a, b = self.intervals, other.intervals
+
+        # Fast paths for appending a disjoint set of intervals to either end (e.g. extending the calculated intervals)
+        if a[-1].end < b[0].start:
+            return TimeIntervals.from_normalised(a + b)
+        if b[-1].end < a[0].start:
+            return TimeIntervals.from_normalised(b + a)
+
+        # Fast path for intervals that touch or overlap the last interval (e.g. calculated_intervals += interval): the
+        # earlier intervals end before the last one starts, so only the last interval needs merging
+        if b[0].start >= a[-1].start:
+            return TimeIntervals.from_normalised(a[:-1] + self._merge(a[-1:], b))
+
+        return TimeIntervals.from_normalised(self._merge(a, b))
+
+    @staticmethod
+    def _merge(a, b):
+        """
+        Merge two sorted sequences of sorted and merged intervals, coalescing as it goes
+
+        :param a: The first sequence of intervals
+        :param b: The second sequence of intervals
+        :type a: tuple[TimeInterval]
+        :type b: tuple[TimeInterval]
+        :return: The sorted and merged union
+        :rtype: tuple[TimeInterval]
+        """
+        n, m = len(a), len(b)
+        merged = []
+        i = j = 0
+        start = end = None
+        while i < n or j < m:
+            if j >= m or (i < n and a[i].start <= b[j].start):
+                interval = a[i]
+                i += 1
             else:
-                return self + TimeIntervals([other])
-            return self
+                interval = b[j]
+                j += 1
+            if start is None:
+                start, end = interval.start, interval.end
+            elif interval.start <= end:
+                if interval.end > end:
+                    end = interval.end
+            else:
+                merged.append(TimeInterval.from_normalised(start, end))
+                start, end = interval.start, interval.end
+        merged.append(TimeInterval.from_normalised(start, end))
+        return tuple(merged)
 
-        if self.is_empty:
-            return TimeIntervals(other.intervals)
+    __or__ = __add__
 
-        if other.is_empty:
-            return TimeIntervals(self.intervals)
+    @profile
+    def __and__(self, other):
+        """
+        Intersection of the time intervals
 
-        self_points = [point for interval in self.intervals for point in (interval.start, interval.end)]
-        other_points = [point for interval in other.intervals for point in (interval.start, interval.end)]
-        self.split(other_points)
-        other.split(self_points)
-        v = list(set(self.intervals).union(set(other.intervals)))
-        v.sort(key=lambda ii: ii.start)
-        new = TimeIntervals(v)
-        self.compress()
-        other.compress()
-        new.compress()
-        return new
+        :param other: The other time intervals
+        :return: The intersection
+        """
+        other = self._coerce(other)
+        a, b = self.intervals, other.intervals
+        n, m = len(a), len(b)
+        result = []
+        i = j = 0
+        while i < n and j < m:
+            start = max(a[i].start, b[j].start)
+            end = min(a[i].end, b[j].end)
+            if start < end:
+                result.append(TimeInterval.from_normalised(start, end))
+            if a[i].end < b[j].end:
+                i += 1
+            else:
+                j += 1
+        return TimeIntervals.from_normalised(tuple(result))
 
     @profile
     def __sub__(self, other):
-        if self == other:
-            return TimeIntervals([])
-        if not other:
-            other = TimeIntervals([])
-
-        self_points = [point for interval in self.intervals for point in (interval.start, interval.end)]
-        other_points = [point for interval in other.intervals for point in (interval.start, interval.end)]
-        self.split(other_points)
-        other.split(self_points)
-        v = list(set(self.intervals).difference(set(other.intervals)))
-        v.sort(key=lambda ii: ii.start)
-        new = TimeIntervals(v)
-        self.compress()
-        other.compress()
-        new.compress()
-        return new
+        """
+        Difference of the time intervals
+
+        :param other: The other time intervals
+        :return: The parts of these time intervals not covered by the other time intervals
+        """
+        other = self._coerce(other)
+        if not other.intervals or not self.intervals:
+            return self
+
+        b = other.intervals
+        m = len(b)
+        result = []
+        j = 0
+        for interval in self.intervals:
+            start, end = interval.start, interval.end
+            # Skip the intervals that finish before this one starts
+            while j < m and b[j].end <= start:
+                j += 1
+            k = j
+            while k < m and b[k].start < end:
+                if b[k].start > start:
+                    result.append(TimeInterval.from_normalised(start, b[k].start))
+                if b[k].end >= end:
+                    start = end
+                    break
+                start = b[k].end
+                k += 1
+            if start == interval.start:
+                result.append(interval)
+            elif start < end:
+                result.append(TimeInterval.from_normalised(start, end))
+        return TimeIntervals.from_normalised(tuple(result))
 
     # @profile
     def __eq__(self, other):
-        return isinstance(other, TimeIntervals) \
-               and len(self.intervals) == len(other.intervals) \
-               and all(z[0] == z[1] for z in zip(self.intervals, other.intervals))
+        return isinstance(other, TimeIntervals) and self.intervals == other.intervals
 
     # @profile
     def __ne__(self, other):
         return not self == other
 
+    def __hash__(self):
+        return hash(self.intervals)
+
     # @profile
     def __iter__(self):
-        return iter(sorted(self.intervals))
+        return iter(self.intervals)
 
     # @profile
     def __getitem__(self, key):
         if isinstance(key, slice):
-            items = self.intervals[key]
-            if isinstance(items, TimeInterval):
-                return items
-            return TimeIntervals(items)
+            return TimeIntervals.from_normalised(self.intervals[key])
         return self.intervals[key]
 
     # @profile
     def __bool__(self):
-        return self.intervals is not None and len(self.intervals) > 0
+        return len(self.intervals) > 0
 
     __nonzero__ = __bool__
 
@@ -232,7 +330,9 @@ class TimeIntervals(Printable):
 class TimeInterval(namedtuple("TimeInterval", "start end")):
     """
     Time interval object.
-    Thin wrapper around a (start, end) tuple of datetime objects that provides some validation
+    Thin wrapper around a (start, end) tuple of datetime objects that provides some validation. Time intervals should
+    be treated as immutable, since they are shared between TimeIntervals objects: the start and end setters are
+    deprecated, and will be removed in a future version.
     """
     @classmethod
     # @profile
@@ -262,6 +362,22 @@ class TimeInterval(namedtuple("TimeInterval", "start end")):
         """
         return super(TimeInterval, cls).__new__(cls, start, end)
 
+    @classmethod
+    def from_normalised(cls, start, end):
+        """
+        Construct a time interval without validation, for end points that are known to be normalised (timezone aware
+        UTC with millisecond precision) and with start strictly less than end, e.g. the end points of existing time
+        intervals. Only use this where the end points have been validated elsewhere.
+
+        :param start: The start time
+        :param end: The end time
+        :return: The time interval
+        """
+        interval = tuple.__new__(cls, (start, end))
+        interval._start = start
+        interval._end = end
+        return interval
+
     @profile
     def __init__(self, start, end):
         self._start = start
@@ -275,12 +391,7 @@ class TimeInterval(namedtuple("TimeInterval", "start end")):
 
     @profile
     def _validate(self):
-        if is_naive(self._start):
-            self._start = self._start.replace(tzinfo=UTC)
-        if is_naive(self._end):
-            self._end = self._end.replace(tzinfo=UTC)
-
-        # Remove the microseconds, since HyperStream is only millisecond precise
+        # Set the timezone to UTC and remove the microseconds, since HyperStream is only millisecond precise
         self._start = remove_microseconds(self._start)
         self._end = remove_microseconds(self._end)
 
@@ -311,6 +422,7 @@ class TimeInterval(namedtuple("TimeInterval", "start end")):
     @start.setter
     # @profile
     def start(self, value):
+        _deprecated_setter(self, "start")
         self._start = value
         self._validate()
 
@@ -322,6 +434,7 @@ class TimeInterval(namedtuple("TimeInterval", "start end")):
     @end.setter
     # @profile
     def end(self, value):
+        _deprecated_setter(self, "end")
         self._end = value
         self._validate()
 
@@ -384,6 +497,19 @@ class TimeInterval(namedtuple("TimeInterval", "start end")):
     #     return self + rti
 
 
+def _deprecated_setter(interval, name):
+    """
+    Warn that the start and end setters of time intervals are deprecated. Time intervals are shared between
+    TimeIntervals objects, so changing one in place can leave those unsorted or overlapping.
+
+    :param interval: The time interval
+    :param name: The name of the attribute being set
+    :return: None
+    """
+    warnings.warn("Setting {0}.{1} is deprecated and will be removed in a future version, create a new {0} instead"
+                  .format(interval.__class__.__name__, name), DeprecationWarning, stacklevel=3)
+
+
 # noinspection PyMissingConstructor
 class RelativeTimeInterval(TimeInterval):
     """
@@ -420,6 +546,7 @@ class RelativeTimeInterval(TimeInterval):
 
     @start.setter
     def start(self, value):
+        _deprecated_setter(self, "start")
         self._start = get_timedelta(value)
         self._validate()
 
@@ -429,6 +556,7 @@ class RelativeTimeInterval(TimeInterval):
 
     @end.setter
     def end(self, value):
+        _deprecated_setter(self, "end")
         self._end = get_timedelta(value)
         self._validate()
 
@@ -20,7 +20,7 @@
 # OR OTHER DEALINGS IN THE SOFTWARE.
 
 from ..models import ToolModel, ToolParameterModel
-from ..utils import Printable, Hashable, func_dump, func_load, camel_to_snake
+from ..utils import Printable, Hashable, func_dump, func_load, camel_to_snake, fingerprint
 
 import logging
 import pickle
@@ -30,6 +30,9 @@ class BaseTool(Printable, Hashable):
     """
     Base class for all tools
     """
+    # The version of the tool, set when the tool class is loaded from a tool channel
+    version = None
+
     def __init__(self, **kwargs):
         """
         Base class initializer. Note that this performs setattr on all of the keyword arguments, so this does not have
@@ -44,6 +47,12 @@ class BaseTool(Printable, Hashable):
         for k, v in kwargs.items():
             self.__setattr__(k, v)
 
+    def __setattr__(self, key, value):
+        if not key.startswith("_"):
+            # The parameters have changed, so the fingerprint needs recomputing
+            self.__dict__.pop("_fingerprint", None)
+        super(BaseTool, self).__setattr__(key, value)
+
     def __eq__(self, other):
         """
         Equality test
@@ -51,7 +60,26 @@ class BaseTool(Printable, Hashable):
         :param other: the other tool
         :return: whether self and other are equal
         """
-        return isinstance(other, BaseTool) and hash(self) == hash(other)
+        return isinstance(other, BaseTool) and self.fingerprint == other.fingerprint
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.fingerprint)
+
+    @property
+    def fingerprint(self):
+        """
+        Get a stable fingerprint of the tool name, version and parameters. This is computed once and cached until a
+        parameter changes, and is the same across processes and sessions, so it can also be used as a key for cached
+        results.
+
+        :return: The fingerprint
+        """
+        if self.__dict__.get("_fingerprint") is None:
+            self._fingerprint = fingerprint(dict(name=self.name, version=self.version, parameters=self.parameters_dict))
+        return self._fingerprint
 
     def message(self, interval):
         """
@@ -160,12 +188,12 @@ class BaseTool(Printable, Hashable):
         """
         Gets the mongoengine model for this tool, which serializes parameters that are functions
 
-        :return: The mongoengine model. TODO: Note that the tool version is currently incorrect (0.0.0)
+        :return: The mongoengine model. Note that the version is 0.0.0 for tools not loaded from a tool channel
         """
 
         return ToolModel(
             name=self.name,
-            version="0.0.0",
+            version=self.version or "0.0.0",
             parameters=self.parameters_from_dicts(self.parameters)
         )
 
@@ -50,6 +50,36 @@ class MultiOutputTool(BaseTool):
         """
         raise NotImplementedError
 
+    @staticmethod
+    def index_sinks(sinks, meta_data_id):
+        """
+        Index the sinks by their meta data, keeping the first sink for each. The sinks are all on the same input plate
+        value, which is also returned so that it can be added to the (output only) meta data of the items.
+
+        :param sinks: The sink streams
+        :param meta_data_id: The meta data id of the output plate
+        :return: Dictionary from the frozenset of meta data to the sink, and the meta data of the input plate value
+        """
+        index = {}
+        for sink in sinks:
+            index.setdefault(frozenset(sink.stream_id.meta_data), sink)
+        parent_meta_data = frozenset(m for m in sinks[0].stream_id.meta_data if m[0] != meta_data_id) \
+            if sinks else frozenset()
+        return index, parent_meta_data
+
+    @staticmethod
+    def find_sink(sink_index, parent_meta_data, meta_data):
+        """
+        Find the sink for the given meta data
+
+        :param sink_index: The index of the sinks (see index_sinks)
+        :param parent_meta_data: The meta data of the input plate value (see index_sinks)
+        :param meta_data: The meta data of the item
+        :return: The sink, or None if the meta data does not belong to the output plate
+        :raises TypeError: If the meta data cannot be hashed
+        """
+        return sink_index.get(parent_meta_data.union(meta_data))
+
     def execute(self, source, splitting_stream, sinks, interval, meta_data_id, output_plate_values):
         """
         Execute the tool over the given time interval.
@@ -92,6 +122,7 @@ class MultiOutputTool(BaseTool):
 
         if not required_intervals.is_empty:
             document_count = 0
+            sink_index, parent_meta_data = self.index_sinks(sinks, meta_data_id)
 
             for interval in required_intervals:
                 for item in self._execute(
@@ -104,18 +135,23 @@ class MultiOutputTool(BaseTool):
                     # meta_data = input_plate_value + (item.meta_data,) if input_plate_value else (item.meta_data, )
                     meta_data = item.meta_data if isinstance(item.meta_data[0], tuple) else (item.meta_data,)
                     try:
-                        # sink = next(s for s in sinks if set(s.stream_id.meta_data) == set(meta_data))
-                        sink = next(s for s in sinks if all(m in s.stream_id.meta_data for m in meta_data))
-                        sink.writer(item.stream_instance)
-                        document_count += 1
-                    except StopIteration:
-                        logging.warn("A multi-output tool has produced a value {} "
-                                     "which does not belong to the output plate".format(meta_data))
-                        continue
+                        sink = self.find_sink(sink_index, parent_meta_data, meta_data)
                     except TypeError:
                         logging.error("A multi-output tool has produced a value {} "
                                       "which cannot be hashed and does not belong to the output plate"
                                       .format(meta_data))
+                        continue
+                    if sink is None:
+                        logging.warn("A multi-output tool has produced a value {} "
+                                     "which does not belong to the output plate".format(meta_data))
+                        continue
+                    sink.writer(item.stream_instance)
+                    document_count += 1
+
+            # Write out any buffered documents before the calculated intervals of the sinks are updated
+            for sink in sinks:
+                sink.flush()
+
             if not document_count:
                 logging.debug("{} did not produce any data for time interval {} on stream {}".format(
                     self.name, required_intervals, source))
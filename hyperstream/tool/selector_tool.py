@@ -75,16 +75,16 @@ class SelectorTool(BaseTool):
         required_intervals = TimeIntervals([interval]) - calculated_intervals
 
         if not required_intervals.is_empty:
+            # Index the sinks by their normalised meta data, keeping the first of any duplicates
+            sink_index = dict((tuple(sorted(sink.stream_id.meta_data)), sink) for sink in reversed(sinks))
+
             for interval in required_intervals:
                 produced_data = set()
 
                 for item in self._execute(sources=sources, interval=interval):
                     # Join the output meta data with the parent plate meta data
-                    try:
-                        sink = next(s for s in sinks
-                                    if tuple(sorted(s.stream_id.meta_data)) == tuple(sorted(item.meta_data)))
-                    except StopIteration:
-                        # raise
+                    sink = sink_index.get(tuple(sorted(item.meta_data)))
+                    if sink is None:
                         continue
                     sink.writer(item.stream_instance)
                     produced_data.add(sink)
@@ -93,6 +93,7 @@ class SelectorTool(BaseTool):
                     if sink not in produced_data:
                         logging.debug("{} did not produce any data for time interval {} on sink {}".format(
                             self.name, interval, sink))
+                    sink.flush()
                     sink.calculated_intervals += interval
 
                 self.write_to_history(
@@ -61,6 +61,23 @@ class Tool(BaseTool):
         :type interval: TimeInterval
         :return: None
         """
+        required_intervals = self.required_intervals(sink, interval)
+
+        if not required_intervals.is_empty:
+            self.write_results(sink, self.compute(sources, alignment_stream, required_intervals))
+
+    @staticmethod
+    def required_intervals(sink, interval):
+        """
+        Get the parts of the time interval that have not yet been calculated for the sink
+
+        :param sink: The sink stream
+        :param interval: The time interval
+        :type sink: Stream
+        :type interval: TimeInterval
+        :return: The required intervals
+        :rtype: TimeIntervals
+        """
         if not isinstance(interval, TimeInterval):
             raise TypeError('Expected TimeInterval, got {}'.format(type(interval)))
         # logging.info(self.message(interval))
@@ -68,30 +85,58 @@ class Tool(BaseTool):
         if interval.end > sink.channel.up_to_timestamp:
             raise StreamNotAvailableError(sink.channel.up_to_timestamp)
 
-        required_intervals = TimeIntervals([interval]) - sink.calculated_intervals
+        return TimeIntervals([interval]) - sink.calculated_intervals
+
+    def compute(self, sources, alignment_stream, required_intervals):
+        """
+        Generator over the required intervals and the stream instances computed for each of them. This performs the
+        computation only, without writing to the sink, so that it can also be run in a separate process
+
+        :param sources: The source streams (possibly None)
+        :param alignment_stream: The alignment stream
+        :param required_intervals: The required intervals
+        :type required_intervals: TimeIntervals
+        :return: Generator of (interval, stream instances) tuples
+        """
+        for interval in required_intervals:
+            yield interval, self._execute(sources=sources, alignment_stream=alignment_stream, interval=interval)
+
+    def write_results(self, sink, results):
+        """
+        Write the results of compute to the sink, updating the calculated intervals and the execution history
 
+        :param sink: The sink stream
+        :param results: The (interval, stream instances) tuples
+        :type sink: Stream
+        :return: None
+        """
+        document_count = 0
+        interval = None
+
+        writer = sink.writer
+
+        for interval, stream_instances in results:
+            for stream_instance in stream_instances:
+                writer(stream_instance)
+                document_count += 1
+            sink.flush()
+            sink.calculated_intervals += interval
+
+        if interval is None:
+            return
+
+        required_intervals = TimeIntervals([interval]) - sink.calculated_intervals
         if not required_intervals.is_empty:
-            document_count = 0
-
-            for interval in required_intervals:
-                for stream_instance in self._execute(
-                        sources=sources, alignment_stream=alignment_stream, interval=interval):
-                    sink.writer(stream_instance)
-                    document_count += 1
-                sink.calculated_intervals += interval
-
-            required_intervals = TimeIntervals([interval]) - sink.calculated_intervals
-            if not required_intervals.is_empty:
-                # raise ToolExecutionError(required_intervals)
-                logging.error("{} execution error for time interval {} on stream {}".format(
-                    self.name, interval, sink))
-
-            if not document_count:
-                logging.debug("{} did not produce any data for time interval {} on stream {}".format(
-                    self.name, interval, sink))
-
-            self.write_to_history(
-                interval=interval,
-                tool=self.name,
-                document_count=document_count
-            )
+            # raise ToolExecutionError(required_intervals)
+            logging.error("{} execution error for time interval {} on stream {}".format(
+                self.name, interval, sink))
+
+        if not document_count:
+            logging.debug("{} did not produce any data for time interval {} on stream {}".format(
+                self.name, interval, sink))
+
+        self.write_to_history(
+            interval=interval,
+            tool=self.name,
+            document_count=document_count
+        )
@@ -0,0 +1,61 @@
+# The MIT License (MIT) # Copyright (c) 2014-2017 University of Bristol
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+
+from heapq import heappush, heappop
+
+from hyperstream.stream import StreamInstance
+from hyperstream.tool import AggregateTool
+
+
+class Aggregate(AggregateTool):
+    """
+    This tool aggregates over a given plate, for example, if the input is all the streams in a node on plate A.B,
+    and the aggregation is over plate B, the results will live on plate A alone.
+    This can also be thought of as marginalising one dimension of a tensor over the plates
+
+    This version performs a k-way merge of the (time ordered) source streams using a heap, rather than loading all of
+    the streams into memory, so it runs in O(n log k) time and O(k) memory for n instances over k streams. The output is
+    the same as version 0.1.0: func is called once per timestamp with the values of the streams that have data at that
+    timestamp, in the order of the sources (only the first value is used if a stream repeats a timestamp).
+    """
+    def __init__(self, func, aggregation_meta_data):
+        super(Aggregate, self).__init__(func=func, aggregation_meta_data=aggregation_meta_data)
+        self.func = func
+
+    def _execute(self, sources, alignment_stream, interval):
+        # The heap contains the next (timestamp, source index, value, iterator) of each source
+        heap = []
+        for i, source in enumerate(sources):
+            iterator = iter(source.window(interval, force_calculation=True))
+            for item in iterator:
+                heappush(heap, (item.timestamp, i, item.value, iterator))
+                break
+
+        while heap:
+            timestamp = heap[0][0]
+            values = []
+            while heap and heap[0][0] == timestamp:
+                _, i, value, iterator = heappop(heap)
+                values.append(value)
+                for item in iterator:
+                    if item.timestamp != timestamp:
+                        heappush(heap, (item.timestamp, i, item.value, iterator))
+                        break
+            yield StreamInstance(timestamp, self.func(values))
@@ -0,0 +1,81 @@
+"""
+The MIT License (MIT)
+Copyright (c) 2014-2017 University of Bristol
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+from heapq import heappush, heapreplace
+
+from hyperstream.stream import StreamInstance
+from hyperstream.tool import Tool
+
+import logging
+
+
+class AlignedMerge(Tool):
+    """
+    Merges streams that should have aligned timestamps.
+    This version takes account of missing data in streams: a merged instance is only produced for timestamps that are
+    present in all of the streams. The (time ordered) source streams are walked in lockstep using a heap, skipping
+    ahead on misalignment, so memory use does not depend on the length of the interval.
+    """
+    def __init__(self, names=None):
+        super(AlignedMerge, self).__init__(names=names)
+        self.names = names if names else []
+
+    # Note: cannot check stream count because the number depends on the length of self.names
+    def _execute(self, sources, alignment_stream, interval):
+        if self.names and len(self.names) != len(sources):
+            raise TypeError("Tool AlignedMerge expected {} streams as input, got {} instead".format(
+                len(self.names), len(sources)))
+
+        # The heap contains the current (timestamp, source index, value, iterator) of each source
+        heap = []
+        latest = None
+        for i, source in enumerate(sources):
+            iterator = iter(source.window(interval, force_calculation=True))
+            item = next(iterator, None)
+            if item is None:
+                logging.debug("{}: Stream {} empty".format(self.name, i))
+                return
+            heappush(heap, (item.timestamp, i, item.value, iterator))
+            if latest is None or item.timestamp > latest:
+                latest = item.timestamp
+
+        while heap:
+            timestamp = heap[0][0]
+            if timestamp == latest:
+                # The earliest and latest timestamps agree, so all of the streams are aligned
+                values = tuple(value for _, _, value, _ in sorted(heap, key=lambda x: x[1]))
+                if not self.names:
+                    yield StreamInstance(timestamp, values)
+                else:
+                    yield StreamInstance(timestamp, dict(zip(self.names, values)))
+
+            # Advance the earliest stream (or all of them after a match) to the next timestamp
+            while heap and heap[0][0] == timestamp:
+                _, i, _, iterator = heap[0]
+                item = next(iterator, None)
+                if item is None:
+                    # No further timestamps can be present in all of the streams
+                    return
+                heapreplace(heap, (item.timestamp, i, item.value, iterator))
+                if item.timestamp > latest:
+                    latest = item.timestamp
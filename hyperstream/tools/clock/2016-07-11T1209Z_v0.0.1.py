@@ -50,7 +50,7 @@ class Clock(Tool):
     @check_input_stream_count(0)
     def _execute(self, sources, alignment_stream, interval):
         if interval.start < self.first:
-            interval.start = self.first
+            interval = TimeInterval(self.first, interval.end)
         n_strides = int((interval.start - self.first).total_seconds() // self.stride.total_seconds())
         t = self.first + n_strides * self.stride
         while t <= interval.end:
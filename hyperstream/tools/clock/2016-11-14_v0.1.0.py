@@ -18,6 +18,7 @@
 #  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
 #  OR OTHER DEALINGS IN THE SOFTWARE.
 
+from hyperstream import TimeInterval
 from hyperstream.stream import StreamInstance
 from hyperstream.tool import Tool, check_input_stream_count
 from hyperstream.utils import MIN_DATE, get_timedelta
@@ -45,7 +46,7 @@ class Clock(Tool):
     @check_input_stream_count(0)
     def _execute(self, sources, alignment_stream, interval):
         if interval.start < self.first:
-            interval.start = self.first
+            interval = TimeInterval(self.first, interval.end)
         n_strides = int((interval.start - self.first).total_seconds() // self._stride.total_seconds())
         t = self.first + n_strides * self._stride
         while t <= interval.end:
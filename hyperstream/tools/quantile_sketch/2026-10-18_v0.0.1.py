@@ -0,0 +1,80 @@
+# The MIT License (MIT) # Copyright (c) 2014-2017 University of Bristol
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+
+from hyperstream import TimeInterval
+from hyperstream.stream import StreamInstance
+from hyperstream.tool import Tool, check_input_stream_count
+from hyperstream.utils import TDigest
+
+from collections import deque
+
+
+class QuantileSketch(Tool):
+    """
+    For each of the windows of a sliding window stream, summarise the data of the source stream in the window (start,
+    end] with a quantile sketch (see TDigest), and calculate the requested percentiles. Unlike SlidingListify followed
+    by PercentilesFromList, the data is never held in memory: each value is added to the sketches of the (open) windows
+    that contain it.
+
+    The output values are dictionaries containing the percentiles, their estimated values, and the serialised sketch.
+    Sketches can be combined (e.g. across a plate using the Aggregate tool with func=merge_quantile_sketches).
+    """
+    def __init__(self, n_segments=100, percentiles=None, compression=100):
+        super(QuantileSketch, self).__init__(n_segments=n_segments, percentiles=percentiles, compression=compression)
+
+    # noinspection PyCompatibility
+    @check_input_stream_count(2)
+    def _execute(self, sources, alignment_stream, interval):
+        if self.percentiles is not None:
+            percentiles = list(self.percentiles)
+        else:
+            percentiles = [i * 100.0 / self.n_segments for i in range(self.n_segments + 1)]
+
+        sliding_window = sources[0].window(interval, force_calculation=True)
+        first = sliding_window.first()
+        if first is None:
+            return
+        data = sources[1].window(TimeInterval(first.value.start, interval.end), force_calculation=True)
+
+        windows = iter(sliding_window)
+        next_window = next(windows, None)
+        open_windows = deque()
+
+        def output(time, digest):
+            return StreamInstance(time, dict(
+                percentiles=percentiles, values=digest.percentile(percentiles), sketch=digest.to_dict()))
+
+        for timestamp, value in data:
+            # Close the windows that end before this timestamp
+            while open_windows and open_windows[0][1].end < timestamp:
+                time, _, digest = open_windows.popleft()
+                yield output(time, digest)
+
+            # Open the windows that start before this timestamp (windows that also end before it are empty)
+            while next_window is not None and next_window.value.start < timestamp:
+                if next_window.value.end >= timestamp:
+                    open_windows.append((next_window.timestamp, next_window.value, TDigest(self.compression)))
+                next_window = next(windows, None)
+
+            for _, _, digest in open_windows:
+                digest.add(value)
+
+        for time, _, digest in open_windows:
+            yield output(time, digest)
@@ -0,0 +1,53 @@
+# The MIT License (MIT) # Copyright (c) 2014-2017 University of Bristol
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+
+from hyperstream import RelativeTimeInterval
+from hyperstream.itertools2 import SlidingWindowBuffer
+from hyperstream.stream import StreamInstance
+from hyperstream.tool import Tool, check_input_stream_count
+from datetime import timedelta
+
+
+class RelativeWindow(Tool):
+    """
+    Produces, for each timestamp of the alignment stream, the data in the window (t + relative_start, t + relative_end]
+    """
+    def __init__(self, relative_start, relative_end, values_only=True):
+        super(RelativeWindow, self).__init__(
+            relative_start=relative_start, relative_end=relative_end, values_only=values_only)
+        self.values_only = values_only
+        self.relative_interval = RelativeTimeInterval(start=relative_start, end=relative_end)
+
+    # noinspection PyCompatibility
+    @check_input_stream_count(1)
+    def _execute(self, sources, alignment_stream, interval):
+        data_stream = sources[0]
+        window = SlidingWindowBuffer(data_stream.window(interval + self.relative_interval))
+
+        start = timedelta(seconds=self.relative_interval.start)
+        end = timedelta(seconds=self.relative_interval.end)
+
+        for (t, _) in alignment_stream.window(interval, force_calculation=True):
+            window.update(t + start, t + end)
+
+            if self.values_only:
+                yield StreamInstance(t, window.values())
+            else:
+                yield StreamInstance(t, list(window))
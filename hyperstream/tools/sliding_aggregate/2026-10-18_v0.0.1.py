@@ -0,0 +1,69 @@
+"""
+The MIT License (MIT)
+Copyright (c) 2014-2017 University of Bristol
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+from six import string_types
+
+from hyperstream import TimeInterval
+from hyperstream.itertools2 import SlidingWindowBuffer, WINDOW_AGGREGATORS
+from hyperstream.stream import StreamInstance
+from hyperstream.tool import Tool, check_input_stream_count
+
+
+class SlidingAggregate(Tool):
+    """
+    Computes aggregates of the data in each of the windows of a sliding window stream. The windows are half open
+    (start, end]. Rather than applying a function to the whole window at each step (as SlidingApply does), the
+    aggregators are updated incrementally as data enters and leaves the window, so that the cost per window is
+    amortised O(1) for the built in aggregators: sum, count, mean, variance (as online_sum, count, online_average and
+    online_variance respectively), min and max.
+
+    The aggregators can be a single aggregator name, in which case the output values are its values, or a dictionary
+    from output names to aggregator names, in which case the output values are dictionaries. Only the names of the
+    aggregators in WINDOW_AGGREGATORS are accepted, so that the parameters can be committed with the workflow and
+    reloaded. Custom aggregators can be used with SlidingWindowBuffer directly.
+    """
+    def __init__(self, aggregators):
+        names = aggregators.values() if isinstance(aggregators, dict) else [aggregators]
+        for name in names:
+            if not isinstance(name, string_types) or name not in WINDOW_AGGREGATORS:
+                raise ValueError("Unknown window aggregator {}, expected one of {}".format(
+                    name, ", ".join(sorted(WINDOW_AGGREGATORS))))
+        super(SlidingAggregate, self).__init__(aggregators=aggregators)
+
+    # noinspection PyCompatibility
+    @check_input_stream_count(2)
+    def _execute(self, sources, alignment_stream, interval):
+        sliding_window = sources[0].window(interval, force_calculation=True)
+        first = sliding_window.first()
+        if first is None:
+            return
+        data = sources[1].window(TimeInterval(first.value.start, interval.end), force_calculation=True)
+
+        single = not isinstance(self.aggregators, dict)
+        aggregators = {None: self.aggregators} if single else self.aggregators
+        window = SlidingWindowBuffer(data, aggregators=aggregators)
+
+        for time, rel_window in sliding_window:
+            window.update(rel_window.start, rel_window.end)
+            aggregates = window.aggregates
+            yield StreamInstance(time, aggregates[None] if single else aggregates)
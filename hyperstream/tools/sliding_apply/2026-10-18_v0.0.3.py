@@ -0,0 +1,58 @@
+"""
+The MIT License (MIT)
+Copyright (c) 2014-2017 University of Bristol
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+from hyperstream.itertools2 import SlidingWindowBuffer
+from hyperstream.stream import StreamInstance
+from hyperstream.tool import Tool, check_input_stream_count
+
+
+class SlidingApply(Tool):
+    """
+    Applies a function to the data in each of the windows of a sliding window stream. The windows are half open
+    (start, end]. The data in the window is maintained incrementally (see SlidingWindowBuffer), rather than copied on
+    each step.
+    """
+    def __init__(self, func):
+        super(SlidingApply, self).__init__(func=func)
+        self.func = func
+
+    # noinspection PyCompatibility
+    @check_input_stream_count(2)
+    def _execute(self, sources, alignment_stream, interval):
+        sliding_window = sources[0].window(interval, force_calculation=True)
+        window = SlidingWindowBuffer(sources[1].window(interval, force_calculation=True))
+
+        for time, rel_window in sliding_window:
+            window.update(rel_window.start, rel_window.end)
+
+            value = self.func(iter(window))
+            try:
+                if len(value) > 0:
+                    yield StreamInstance(time, value)
+                else:
+                    # TODO: Should we yield anything???
+                    # yield StreamInstance(time, {})
+                    pass
+            except TypeError:
+                # Not iterable
+                yield StreamInstance(time, value)
@@ -0,0 +1,58 @@
+"""
+The MIT License (MIT)
+Copyright (c) 2014-2017 University of Bristol
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+from hyperstream import TimeInterval
+from hyperstream.itertools2 import SlidingWindowBuffer
+from hyperstream.stream import StreamInstance
+from hyperstream.tool import Tool, check_input_stream_count
+
+
+class SlidingListify(Tool):
+    """
+    Produces the list of the data (or the stream instances if include_time is set) in each of the non-empty windows of
+    a sliding window stream. The windows are half open (start, end].
+    """
+    def __init__(self, include_time=False):
+        super(SlidingListify, self).__init__(include_time=include_time)
+
+    # noinspection PyCompatibility
+    @check_input_stream_count(2)
+    def _execute(self, sources, alignment_stream, interval):
+        sliding_window = sources[0].window(interval, force_calculation=True)
+        first = sliding_window.first()
+        if first is None:
+            return
+        data = sources[1].window(TimeInterval(first.value.start, interval.end), force_calculation=True)
+        window = SlidingWindowBuffer(data)
+
+        for time, rel_window in sliding_window:
+            window.update(rel_window.start, rel_window.end)
+
+            if not len(window):
+                # TODO: Should we yield anything???
+                continue
+
+            if self.include_time:
+                yield StreamInstance(time, list(window))
+            else:
+                yield StreamInstance(time, window.values())
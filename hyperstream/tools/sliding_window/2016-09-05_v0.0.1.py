@@ -60,7 +60,7 @@ class SlidingWindow(Tool):
     @check_input_stream_count(0)
     def _execute(self, sources, alignment_stream, interval):
         if interval.start < self.first:
-            interval.start = self.first
+            interval = TimeInterval(self.first, interval.end)
 
         n_widths = int((interval.start - self.first).total_seconds() // self.width.total_seconds())
         
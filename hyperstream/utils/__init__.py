@@ -18,17 +18,17 @@
 #  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
 #  OR OTHER DEALINGS IN THE SOFTWARE.
 
-from .misc import camel_to_snake, snake_to_camel, touch
+from .misc import camel_to_snake, snake_to_camel, touch, PhaseTimer
 from .containers import MetaDataTree, Hashable, Printable, TypedBiDict, FrozenKeyDict, TypedFrozenKeyDict, \
     ToolContainer, PluginContainer, PluginWrapper, FactorContainer, Singleton
 from .hyperstream_logger import HyperStreamLogger
 from .time_utils import UTC, MIN_DATE, MAX_DATE, utcnow, get_timedelta, unix2datetime, construct_experiment_id, \
-    duration2str, reconstruct_interval, datetime2unix, is_naive, remove_microseconds
+    duration2str, reconstruct_interval, datetime2unix, is_naive, remove_microseconds, datetime2unix_ms, unix_ms2datetime
 from .decorators import timeit, check_output_format, check_tool_defined, check_input_stream_count
 from .errors import StreamNotAvailableError, StreamAlreadyExistsError, StreamDataNotAvailableError, \
     StreamNotFoundError, IncompatiblePlatesError, ToolNotFoundError, ChannelNotFoundError, ToolExecutionError, \
     PlateEmptyError, PlateDefinitionError, LinkageError, FactorAlreadyExistsError, NodeAlreadyExistsError, \
     FactorDefinitionError, ChannelAlreadyExistsError, NodeDefinitionError, ToolInitialisationError, \
     IncompatibleToolError, MultipleStreamsFoundError, PlateNotFoundError, ConfigurationError, handle_exception
-from .serialization import func_dump, func_load
-from .statistics import histogram, percentile
+from .serialization import func_dump, func_load, fingerprint
+from .statistics import histogram, percentile, TDigest, merge_quantile_sketches
@@ -21,6 +21,9 @@
 
 import re
 import os
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 
 
 FIRST_CAP_RE = re.compile('(.)([A-Z][a-z]+)')
@@ -47,3 +50,46 @@ def touch(full_name, times=None):
     """
     with open(full_name, 'a'):
         os.utime(full_name, times)
+
+
+class PhaseTimer(object):
+    """
+    Records the wall clock time taken by a sequence of named phases, e.g.
+
+    >>> timer = PhaseTimer()
+    >>> with timer("load"):
+    ...     pass
+    >>> list(timer.timings)
+    ['load']
+    """
+    def __init__(self):
+        self.timings = OrderedDict()
+
+    @contextmanager
+    def __call__(self, phase):
+        """
+        Time the phase (the times of repeated phases are added together)
+
+        :param phase: The name of the phase
+        """
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.timings[phase] = self.timings.get(phase, 0.0) + time.time() - start
+
+    @property
+    def total(self):
+        """
+        The total time of all of the phases
+        """
+        return sum(self.timings.values())
+
+    def report(self):
+        """
+        Get a one line summary of the timings
+
+        :return: The summary
+        """
+        phases = ", ".join("{} {:.3f}s".format(phase, t) for phase, t in self.timings.items())
+        return "{} (total {:.3f}s)".format(phases, self.total)
@@ -19,9 +19,18 @@
 # OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
 # OR OTHER DEALINGS IN THE SOFTWARE.
 
+import hashlib
+import json
 import types
 import marshal
 
+from .time_utils import json_serial
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 def func_dump(func):
     """
@@ -73,3 +82,115 @@ def func_reconstruct_closure(values):
     except:
         raise SyntaxError(src)
     return func(values).__closure__
+
+
+def _code_fingerprint(code):
+    """
+    Fingerprint a code object on its bytecode, constants and names, ignoring where it was defined
+
+    :param code: The code object
+    :return: The hex digest
+    """
+    consts = tuple(_code_fingerprint(c) if isinstance(c, types.CodeType) else repr(c) for c in code.co_consts)
+    content = repr((code.co_code, consts, code.co_names, code.co_varnames))
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def _code_names(code):
+    """
+    Get the global (and attribute) names used by a code object, including those used by nested functions
+
+    :param code: The code object
+    :return: The sorted names
+    """
+    names = set(code.co_names)
+    for c in code.co_consts:
+        if isinstance(c, types.CodeType):
+            names.update(_code_names(c))
+    return sorted(names)
+
+
+def _function_fingerprint(func, code, seen):
+    """
+    Fingerprint a function on its code, defaults, closure and the values of the globals that it references. A function
+    that is already being fingerprinted (i.e. a recursive reference) is represented by its name only, and empty closure
+    cells are represented by None.
+
+    :param func: The function
+    :param code: The code object of the function
+    :param seen: The ids of the functions that are being fingerprinted
+    :return: The hex digest
+    """
+    if id(func) in seen:
+        return "recursive {}".format(getattr(func, "__name__", None))
+    seen = seen | {id(func)}
+
+    closure = []
+    for cell in getattr(func, "__closure__", None) or ():
+        try:
+            closure.append(cell.cell_contents)
+        except ValueError:
+            closure.append(None)
+
+    globs = getattr(func, "__globals__", None) or {}
+    referenced = dict((name, globs[name]) for name in _code_names(code) if name in globs)
+
+    content = dict(code=_code_fingerprint(code), defaults=getattr(func, "__defaults__", None), closure=closure,
+                   globals=referenced)
+    try:
+        return _dumps_digest(content, seen)
+    except (TypeError, ValueError):
+        # Fall back on the code alone if the closure or globals cannot be serialized (e.g. they are self-referencing)
+        return _code_fingerprint(code)
+
+
+def _fingerprint_default(obj, seen=frozenset()):
+    """
+    JSON serialization helper for fingerprints, giving a representation of the object that does not depend on the
+    process (e.g. functions are represented by their code rather than their address, and numpy arrays by their data
+    rather than their truncated repr)
+
+    :param obj: The object
+    :param seen: The ids of the functions that are being fingerprinted
+    :return: A json serializable representation
+    """
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=repr)
+    if isinstance(obj, types.ModuleType):
+        return "module {}".format(obj.__name__)
+    if np is not None:
+        if isinstance(obj, np.ndarray):
+            if obj.dtype.hasobject:
+                return dict(dtype=str(obj.dtype), shape=obj.shape, data=obj.tolist())
+            data = hashlib.sha1(np.ascontiguousarray(obj).tobytes()).hexdigest()
+            return dict(dtype=str(obj.dtype), shape=obj.shape, data=data)
+        if isinstance(obj, np.generic):
+            return obj.item()
+    code = getattr(obj, "__code__", None)
+    if isinstance(code, types.CodeType):
+        return _function_fingerprint(obj, code, seen)
+    try:
+        return json_serial(obj)
+    except TypeError:
+        return repr(obj)
+
+
+def _dumps_digest(obj, seen=frozenset()):
+    dumped = json.dumps(obj, sort_keys=True, default=lambda x: _fingerprint_default(x, seen))
+    return hashlib.sha1(dumped.encode("utf-8")).hexdigest()
+
+
+def fingerprint(obj):
+    """
+    Get a fingerprint of the object (e.g. a tool name and its parameters) that is the same for equal objects.
+
+    Functions are represented by their code, defaults, closure and the values of the globals that they reference, and
+    numpy arrays by their dtype, shape and data. Other objects that are not json serializable are represented by their
+    repr. The fingerprint is only stable across processes and sessions where these reprs are (which is not the case
+    for objects whose repr contains their address), so it should not be used as a persistent cache key for such objects.
+
+    :param obj: The object
+    :return: The hex digest of the canonical json representation
+    :rtype: str
+    """
+    return _dumps_digest(obj)
@@ -20,3 +20,4 @@
 # OR OTHER DEALINGS IN THE SOFTWARE.
 from .histogram import histogram
 from .percentile import percentile
+from .quantile_sketch import TDigest, merge_quantile_sketches
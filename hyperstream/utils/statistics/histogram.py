@@ -21,6 +21,11 @@
 from collections import Counter
 from bisect import bisect_left, bisect_right
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 def argsort(seq):
     # http://stackoverflow.com/questions/3071415/efficient-method-to-calculate-the-rank-vector-of-a-list-in-python
@@ -68,48 +73,70 @@ def accumulate(lis):
 def histogram(a, bins):
     """
     Compute the histogram of a set of data.
+    Uses numpy (see histogram_numpy) where available and the data is a flat array of numbers, and otherwise falls back
+    on the pure python implementation (see histogram_python). Both give the same results.
 
     :param a: Input data
     :param bins: int or sequence of scalars or str, optional
     :type a: list | tuple
     :type bins: int | list[int] | list[str]
-    :return:
+    :return: The list of counts and the bins
     """
     if any(map(lambda x: x < 0, diff(bins))):
         raise ValueError(
             'bins must increase monotonically.')
 
+    counts = histogram_numpy(a, bins) if np is not None else None
+    if counts is None:
+        counts = histogram_python(a, bins)
+
+    return counts, bins
+
+
+def histogram_python(a, bins):
+    """
+    Compute the histogram counts of a set of data in pure python.
+
+    :param a: Input data
+    :param bins: The bins, which must increase monotonically
+    :return: The list of counts
+    """
     try:
         sa = sorted(a)
     except TypeError:
         # Perhaps just a single value? Treat as a list and carry on
         sa = sorted([a])
 
-    # import numpy as np
-    # nl = np.searchsorted(sa, bins[:-1], 'left')
-    # nr = np.searchsorted(sa, bins[-1], 'right')
-    # nn = np.r_[nl, nr]
-    #
-    # # cl = list(accumulate(Counter(map(lambda x: bisect_left(bins[:-1], x), sa)))
-    # # print("cl")
-    # # print([cl[i] for i in range(len(bins))])
-    # print("nl")
-    # print(list(nl))
-    # # print(Counter(map(lambda x: bisect_right([bins[-1]], x), sa)))
-    # print("nr")
-    # print([nr])
-    # print("nn")
-    # print(list(nn))
-    # print("hist")
-    # print(list(np.diff(nn)))
-    # print(list(np.histogram(a, bins)[0]))
-
-    nl = list(accumulate([Counter(map(lambda x: bisect_left(bins[:-1], x), sa))[i] for i in range(len(bins) - 1)]))
-    # print("nl")
-    # print(nl)
-    nr = Counter(map(lambda x: bisect_right([bins[1]], x), sa))[1]
-    # print(nl)
-    # print(nr)
+    edges = bins[:-1]
+    counts = Counter(map(lambda x: bisect_left(edges, x), sa))
+    nl = list(accumulate([counts[i] for i in range(len(bins) - 1)]))
+    second = [bins[1]]
+    nr = Counter(map(lambda x: bisect_right(second, x), sa))[1]
     n = list(nl) + [nr]
 
-    return diff(n), bins
+    return list(diff(n))
+
+
+def histogram_numpy(a, bins):
+    """
+    Compute the histogram counts of a set of data using numpy. This gives the same results as histogram_python, using
+    binary searches of the sorted data for the bins rather than for each of the data points.
+
+    :param a: Input data
+    :param bins: The bins, which must increase monotonically
+    :return: The list of counts, or None if the data is not a flat array of numbers
+    """
+    try:
+        sa = np.asarray(a)
+    except (TypeError, ValueError):
+        return None
+    if sa.ndim > 1 or sa.dtype.kind not in 'biuf':
+        return None
+    sa = np.sort(sa.ravel())
+
+    # The number of data points up to and including each bin edge (except the last)
+    nl = np.searchsorted(sa, bins[:-1], side='right')
+    # The number of data points from the second bin edge onwards
+    nr = len(sa) - np.searchsorted(sa, bins[1], side='left')
+
+    return np.diff(np.append(nl, nr)).tolist()
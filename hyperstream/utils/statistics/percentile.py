@@ -21,19 +21,38 @@
 
 import math
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 def flatten(a):
-    if not a:
-        return a
-    if isinstance(a[0], list):
-        return flatten(a[0]) + flatten(a[1:])
-    return a[:1] + flatten(a[1:])
+    """
+    Flatten nested lists (iteratively, so that deeply nested or long lists do not exceed the recursion limit)
+
+    :param a: The (possibly nested) list
+    :return: The flattened list
+    """
+    result = []
+    stack = [iter(a)]
+    while stack:
+        for x in stack[-1]:
+            if isinstance(x, list):
+                stack.append(iter(x))
+                break
+            result.append(x)
+        else:
+            stack.pop()
+    return result
 
 
 def percentile(a, q):
     """
     Compute the qth percentile of the data along the specified axis.
     Simpler version than the numpy version that always flattens input arrays.
+    Uses numpy to select the required order statistics (without a full sort) where available and the data is an array
+    of numbers, and otherwise sorts the data in pure python. Both give the same results.
 
     Examples
     --------
@@ -58,7 +77,7 @@ def percentile(a, q):
     if isinstance(q, (float, int)):
         qq = [q]
     elif isinstance(q, (tuple, list)):
-        qq = q
+        qq = list(q)
     else:
         raise ValueError("Quantile type {} not understood".format(type(q)))
 
@@ -70,21 +89,60 @@ def percentile(a, q):
             raise ValueError("Percentiles must be in the range [0,100]")
         qq[i] /= 100.
 
-    a = sorted(flatten(a))
-    r = []
+    values = percentile_values_numpy(a, qq) if np is not None else None
+    if values is None:
+        values = percentile_values_python(a, qq)
 
-    for q in qq:
-        k = (len(a) - 1) * q
-        f = math.floor(k)
-        c = math.ceil(k)
+    r = []
+    for k, f, c, (d0, d1) in values:
         if f == c:
-            r.append(float(a[int(k)]))
+            r.append(float(d0))
             continue
-        d0 = a[int(f)] * (c - k)
-        d1 = a[int(c)] * (k - f)
+        d0 = d0 * (c - k)
+        d1 = d1 * (k - f)
 
         r.append(float(d0 + d1))
 
     if len(r) == 1:
         return r[0]
     return r
+
+
+def _positions(n, qq):
+    for q in qq:
+        k = (n - 1) * q
+        yield k, math.floor(k), math.ceil(k)
+
+
+def percentile_values_python(a, qq):
+    """
+    Find the order statistics either side of each of the quantiles by sorting the data
+
+    :param a: The data
+    :param qq: The quantiles (between 0 and 1)
+    :return: List of (k, floor(k), ceil(k), (a[floor(k)], a[ceil(k)])), where k is the position of the quantile
+    """
+    a = sorted(flatten(a))
+    return [(k, f, c, (a[int(f)], a[int(c)])) for k, f, c in _positions(len(a), qq)]
+
+
+def percentile_values_numpy(a, qq):
+    """
+    Find the order statistics either side of each of the quantiles using numpy's partition
+
+    :param a: The data
+    :param qq: The quantiles (between 0 and 1)
+    :return: As for percentile_values_python, or None if the data is not an array of numbers
+    """
+    try:
+        arr = np.asarray(a)
+    except (TypeError, ValueError):
+        return None
+    if arr.dtype.kind not in 'biuf':
+        return None
+    arr = arr.ravel()
+
+    positions = list(_positions(len(arr), qq))
+    indices = sorted(set(int(i) for _, f, c in positions for i in (f, c)))
+    arr = np.partition(arr, indices)
+    return [(k, f, c, (arr[int(f)].item(), arr[int(c)].item())) for k, f, c in positions]
@@ -0,0 +1,260 @@
+# The MIT License (MIT)
+# Copyright (c) 2014-2017 University of Bristol
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+# DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+# OR OTHER DEALINGS IN THE SOFTWARE.
+
+import math
+
+
+class TDigest(object):
+    """
+    Mergeable, serialisable sketch for estimating quantiles of a stream of numbers in bounded memory (a merging
+    t-digest, see Dunning & Ertl, "Computing extremely accurate quantiles using t-digests").
+
+    The data is summarised by a sorted list of centroids (mean, weight), which are small near the extremes and larger in
+    the middle of the distribution, so that the number of centroids is bounded by roughly the compression. Values are
+    buffered before being merged into the centroids: until the buffer is first merged (after 5 x compression values),
+    the quantiles are exact and agree with percentile.
+
+    Examples
+    --------
+    >>> digest = TDigest().update(range(40))
+    >>> digest.percentile(25)
+    9.75
+    >>> other = TDigest.from_dict(digest.to_dict())
+    >>> digest.merge(other).count
+    80.0
+    """
+    def __init__(self, compression=100):
+        """
+        Initialise the digest
+
+        :param compression: The compression (larger values are more accurate, and use more memory)
+        """
+        if compression < 1:
+            raise ValueError("Compression must be at least 1, got {}".format(compression))
+        self.compression = compression
+        self.centroids = []
+        self.min = None
+        self.max = None
+        self._buffer = []
+        self._buffer_size = max(int(5 * compression), 10)
+
+    @property
+    def count(self):
+        """
+        The total weight of the data added to the digest
+        """
+        return float(sum(w for _, w in self.centroids) + sum(w for _, w in self._buffer))
+
+    def add(self, value, weight=1):
+        """
+        Add a value to the digest
+
+        :param value: The value
+        :param weight: The weight of the value
+        :return: self
+        """
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self._buffer.append((value, weight))
+        if len(self._buffer) >= self._buffer_size:
+            self.compress()
+        return self
+
+    def update(self, values):
+        """
+        Add each of the values to the digest
+
+        :param values: The values
+        :return: self
+        """
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other):
+        """
+        Merge another digest into this one
+
+        :param other: The other digest
+        :type other: TDigest
+        :return: self
+        """
+        if other.min is None:
+            return self
+        if self.min is None or other.min < self.min:
+            self.min = other.min
+        if self.max is None or other.max > self.max:
+            self.max = other.max
+        self._buffer.extend(other.centroids)
+        self._buffer.extend(other._buffer)
+        self.compress()
+        return self
+
+    def _k(self, q):
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _k_inverse(self, k):
+        return (math.sin(min(k * 2 * math.pi / self.compression, math.pi / 2)) + 1) / 2
+
+    def compress(self):
+        """
+        Merge the buffered values into the centroids
+
+        :return: None
+        """
+        if not self._buffer:
+            return
+        points = sorted(self.centroids + self._buffer)
+        self._buffer = []
+
+        total = float(sum(w for _, w in points))
+        centroids = []
+        weight_so_far = 0.0
+        q_limit = self._k_inverse(self._k(0.0) + 1)
+        mean, weight = points[0]
+
+        for x, w in points[1:]:
+            if (weight_so_far + weight + w) / total <= q_limit:
+                weight += w
+                mean += (x - mean) * w / weight
+            else:
+                centroids.append((mean, weight))
+                weight_so_far += weight
+                q_limit = self._k_inverse(self._k(weight_so_far / total) + 1)
+                mean, weight = x, w
+
+        centroids.append((mean, weight))
+        self.centroids = centroids
+
+    def _summary(self):
+        """
+        Get the centroids, merging any buffered values. If the buffer has never been merged, the buffered values are
+        used directly, so that the quantiles are exact.
+
+        :return: The sorted (mean, weight) centroids
+        """
+        if self.centroids:
+            self.compress()
+            return self.centroids
+        return sorted(self._buffer)
+
+    @staticmethod
+    def _quantile(centroids, minimum, maximum, q):
+        if q < 0. or q > 1.:
+            raise ValueError("Percentiles must be in the range [0,100]")
+        if not centroids:
+            return None
+
+        # The position of the quantile in the sorted data, and the (mean) position of each of the centroids
+        centres = []
+        cumulative = 0.0
+        for _, w in centroids:
+            centres.append(cumulative + (w - 1) / 2.0)
+            cumulative += w
+        rank = (cumulative - 1) * q
+
+        first_mean, last_mean = centroids[0][0], centroids[-1][0]
+        if rank <= centres[0]:
+            if centres[0] <= 0:
+                return float(first_mean)
+            return float(minimum + (first_mean - minimum) * rank / centres[0])
+        if rank >= centres[-1]:
+            end = cumulative - 1
+            if end <= centres[-1]:
+                return float(last_mean)
+            return float(last_mean + (maximum - last_mean) * (rank - centres[-1]) / (end - centres[-1]))
+
+        for i in range(1, len(centres)):
+            if rank <= centres[i]:
+                (m0, _), (m1, _) = centroids[i - 1], centroids[i]
+                if centres[i] == centres[i - 1]:
+                    return float(m1)
+                return float(m0 + (m1 - m0) * (rank - centres[i - 1]) / (centres[i] - centres[i - 1]))
+
+    def quantile(self, q):
+        """
+        Estimate the qth quantile of the data, using the same (linear) interpolation as percentile
+
+        :param q: The quantile, which must be between 0 and 1 inclusive
+        :return: The estimated quantile, or None if the digest is empty
+        """
+        return self._quantile(self._summary(), self.min, self.max, q)
+
+    def percentile(self, q):
+        """
+        Estimate the qth percentile(s) of the data (see percentile)
+
+        :param q: Percentile or list of percentiles to compute, which must be between 0 and 100 inclusive.
+        :return: the qth percentile(s)
+        """
+        centroids = self._summary()
+        if isinstance(q, (float, int)):
+            return self._quantile(centroids, self.min, self.max, q / 100.)
+        return [self._quantile(centroids, self.min, self.max, x / 100.) for x in q]
+
+    def to_dict(self):
+        """
+        Serialise the digest to a dictionary (e.g. for storage in a stream)
+
+        :return: The dictionary
+        """
+        self.compress()
+        return dict(
+            compression=self.compression,
+            min=self.min,
+            max=self.max,
+            centroids=[[mean, weight] for mean, weight in self.centroids])
+
+    @classmethod
+    def from_dict(cls, d):
+        """
+        Deserialise a digest from a dictionary (see to_dict)
+
+        :param d: The dictionary
+        :return: The digest
+        :rtype: TDigest
+        """
+        digest = cls(compression=d['compression'])
+        digest.min = d['min']
+        digest.max = d['max']
+        digest.centroids = [(mean, weight) for mean, weight in d['centroids']]
+        return digest
+
+
+def merge_quantile_sketches(values):
+    """
+    Merge quantile sketches, such as the output values of the QuantileSketch tool (dictionaries containing the
+    requested percentiles and the serialised sketch), into a single value of the same form. This can be used as the
+    function of the Aggregate tool to combine sketches across a plate.
+
+    :param values: The values to merge
+    :return: The merged value, with the same percentiles as the first value
+    """
+    values = list(values)
+    if not values:
+        return None
+    digest = TDigest.from_dict(values[0]['sketch'])
+    for value in values[1:]:
+        digest.merge(TDigest.from_dict(value['sketch']))
+    percentiles = values[0]['percentiles']
+    return dict(percentiles=percentiles, values=digest.percentile(percentiles), sketch=digest.to_dict())
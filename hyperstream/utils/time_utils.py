@@ -35,11 +35,20 @@ class UTC(pytz.UTC):
 
 MIN_DATE = datetime.min.replace(tzinfo=UTC)
 MAX_DATE = datetime.max.replace(tzinfo=UTC).replace(microsecond=0)
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
 
 
 def remove_microseconds(ts):
-    milliseconds = int(ts.microsecond / 1000 * 1000)
-    return datetime(ts.year, ts.month, ts.day, ts.hour, ts.minute, ts.second, milliseconds, UTC)
+    """
+    Truncate a datetime to millisecond precision in UTC. Datetimes that are already normalised (millisecond aligned,
+    with the UTC tzinfo) are returned as they are, so repeated normalisation does not allocate new objects
+
+    :param ts: The datetime
+    :return: The normalised datetime
+    """
+    if ts.tzinfo is UTC and not ts.microsecond % 1000:
+        return ts
+    return datetime(ts.year, ts.month, ts.day, ts.hour, ts.minute, ts.second, ts.microsecond // 1000 * 1000, UTC)
 
 
 def utcnow():
@@ -68,6 +77,27 @@ def datetime2unix(dt):
     return (dt - datetime(1970, 1, 1, tzinfo=UTC)).total_seconds()
 
 
+def datetime2unix_ms(dt):
+    """
+    Convert a timezone aware datetime to integer milliseconds since the unix epoch (exact, unlike datetime2unix)
+
+    :param dt: The datetime
+    :return: The milliseconds since the epoch
+    """
+    delta = dt - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000 + delta.microseconds // 1000
+
+
+def unix_ms2datetime(ms):
+    """
+    Convert integer milliseconds since the unix epoch to a UTC datetime (the inverse of datetime2unix_ms)
+
+    :param ms: The milliseconds since the epoch
+    :return: The datetime
+    """
+    return EPOCH + timedelta(milliseconds=ms)
+
+
 def duration2str(x):
     minutes, seconds = divmod(x.total_seconds(), 60)
     return '{} min {} sec'.format(int(minutes), int(seconds))
@@ -19,5 +19,6 @@
 # OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
 # OR OTHER DEALINGS IN THE SOFTWARE.
 
+from .scheduler import WorkflowScheduler
 from .workflow import Workflow
 from .workflow_manager import WorkflowManager
@@ -0,0 +1,178 @@
+# The MIT License (MIT)
+# Copyright (c) 2014-2017 University of Bristol
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+# DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+# OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+Dependency aware scheduling of the factors of a workflow.
+"""
+
+import logging
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    # Python 2 requires the futures backport
+    ThreadPoolExecutor = None
+
+from ..factor import Factor, MultiOutputFactor, NodeCreationFactor, limit_workers
+from ..utils import Printable, FactorDefinitionError
+
+
+class WorkflowScheduler(Printable):
+    """
+    Schedules the factors of a workflow from their dependency graph. A factor depends on the factors that produce its
+    input nodes (sources, alignment and splitting nodes). In addition, asset writers run before all other factors, and
+    node creation factors run before the factors defined after them, since these may live on the plates they create.
+
+    The factors are grouped into waves: each wave contains the factors whose dependencies are all in earlier waves.
+    Executing the waves in order runs every factor exactly once per time interval, after its upstream factors, so that
+    upstream data does not need to be pulled on demand. The factors within a wave are independent, and can be executed
+    concurrently. The workers are then shared between the factors of the wave, so that their plate executors do not
+    start more than max_workers threads in total.
+    """
+    def __init__(self, factors, max_workers=1):
+        """
+        Initialise the scheduler, building the dependency graph
+
+        :param factors: The factors of the workflow, in the order in which they were defined
+        :param max_workers: The maximum number of factors in a wave to execute concurrently
+        :type factors: list[FactorBase]
+        :type max_workers: int
+        """
+        self.factors = list(factors)
+        self.max_workers = max_workers
+        self.dependencies = self._get_dependencies()
+        self.waves = self._get_waves()
+
+    @staticmethod
+    def input_nodes(factor):
+        """
+        Get the nodes that the factor reads from
+
+        :param factor: The factor
+        :return: The input nodes
+        """
+        if isinstance(factor, Factor):
+            nodes = list(factor.sources) + [factor.alignment_node]
+        elif isinstance(factor, MultiOutputFactor):
+            nodes = [factor.source, factor.splitting_node]
+        elif isinstance(factor, NodeCreationFactor):
+            nodes = [factor.source]
+        else:
+            raise TypeError("Unknown factor type {}".format(type(factor)))
+        return [node for node in nodes if node is not None]
+
+    def _get_dependencies(self):
+        """
+        Get the dependencies of each factor, along with the reason for each dependency
+
+        :return: List (over factors) of dicts from the index of the upstream factor to the reason
+        """
+        index = dict((id(factor), i) for i, factor in enumerate(self.factors))
+        asset_writers = [i for i, factor in enumerate(self.factors) if factor.tool.name == "asset_writer"]
+        dependencies = []
+
+        for i, factor in enumerate(self.factors):
+            upstream = {}
+            for node in self.input_nodes(factor):
+                if node.factor is not None and id(node.factor) in index:
+                    upstream[index[id(node.factor)]] = "produces node {}".format(node.node_id)
+            if i not in asset_writers:
+                for j in asset_writers:
+                    upstream.setdefault(j, "asset writer")
+            for j, other in enumerate(self.factors[:i]):
+                if isinstance(other, NodeCreationFactor):
+                    upstream.setdefault(j, "creates plate {}".format(other.output_plate.get("plate_id")))
+            upstream.pop(i, None)
+            dependencies.append(upstream)
+
+        return dependencies
+
+    def _get_waves(self):
+        """
+        Group the factors into waves (Kahn's algorithm), keeping the definition order within each wave
+
+        :return: List of waves, each a list of factor indices
+        """
+        remaining = set(range(len(self.factors)))
+        done = set()
+        waves = []
+        while remaining:
+            wave = sorted(i for i in remaining if all(j in done for j in self.dependencies[i]))
+            if not wave:
+                raise FactorDefinitionError("Cycle in the workflow graph between factors {}".format(
+                    ", ".join(self.factors[i].factor_id for i in sorted(remaining))))
+            waves.append(wave)
+            done.update(wave)
+            remaining.difference_update(wave)
+        return waves
+
+    @property
+    def plan(self):
+        """
+        The execution plan: the waves of factors, with the sink node of each factor and the factors that it waits for
+
+        :return: List of waves, each a list of dicts
+        """
+        def describe(i):
+            factor = self.factors[i]
+            return dict(
+                factor=factor.factor_id,
+                sink=factor.sink.node_id if factor.sink is not None else None,
+                after=[dict(factor=self.factors[j].factor_id, reason=reason)
+                       for j, reason in sorted(self.dependencies[i].items())])
+
+        return [[describe(i) for i in wave] for wave in self.waves]
+
+    def execute(self, time_interval):
+        """
+        Execute the factors wave by wave over the time interval
+
+        :param time_interval: The time interval
+        :return: None
+        """
+        for n, wave in enumerate(self.waves):
+            factors = [self.factors[i] for i in wave]
+            logging.debug("Executing wave {} of {}: {}".format(
+                n + 1, len(self.waves), ", ".join(factor.factor_id for factor in factors)))
+
+            if self.max_workers > 1 and len(factors) > 1 and ThreadPoolExecutor is not None:
+                n_workers = min(self.max_workers, len(factors))
+                plate_workers = max(1, self.max_workers // n_workers)
+                with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                    futures = [executor.submit(self._execute_factor, factor, time_interval, plate_workers)
+                               for factor in factors]
+                for future in futures:
+                    future.result()
+            else:
+                for factor in factors:
+                    factor.execute(time_interval)
+
+    @staticmethod
+    def _execute_factor(factor, time_interval, max_workers):
+        """
+        Execute a factor in a worker thread, limiting the number of workers of its plate executor
+
+        :param factor: The factor
+        :param time_interval: The time interval
+        :param max_workers: The maximum number of workers for the plate values
+        :return: None
+        """
+        with limit_workers(max_workers):
+            factor.execute(time_interval)
@@ -27,7 +27,7 @@ from mongoengine.context_managers import switch_db
 import simplejson as json
 from collections import defaultdict
 
-from ..factor import Factor, MultiOutputFactor, NodeCreationFactor
+from ..factor import Factor, MultiOutputFactor, NodeCreationFactor, PlateExecutor
 from ..plate import Plate
 from ..node import Node
 from ..stream import StreamId
@@ -35,6 +35,7 @@ from ..tool import BaseTool, Tool, MultiOutputTool, AggregateTool, SelectorTool,
 from ..utils import Printable, IncompatiblePlatesError, FactorDefinitionError, NodeDefinitionError, utcnow
 from ..models import TimeIntervalModel, WorkflowStatusModel
 from ..time_interval import TimeIntervals, TimeInterval
+from .scheduler import WorkflowScheduler
 
 
 class Workflow(Printable):
@@ -42,7 +43,7 @@ class Workflow(Printable):
     Workflow.
     This defines the graph of operations through "nodes" and "factors".
     """
-    def __init__(self, workflow_id, name, description, owner, online=False, monitor=False):
+    def __init__(self, workflow_id, name, description, owner, online=False, monitor=False, plate_executor=None):
 
         """
         Initialise the workflow
@@ -53,6 +54,10 @@ class Workflow(Printable):
         :param owner: The owner/author of the workflow
         :param online: Whether this workflow should be executed by the online engine
         :param monitor: Whether to log monitoring messages for this workflow
+        :param plate_executor: The executor for the plate values of the factors. Either a PlateExecutor or a dict
+        of its parameters (kind, max_workers). If None, the default from the configuration is used when the workflow is
+        added to the workflow manager
+        :type plate_executor: PlateExecutor | dict | None
         """
         self.workflow_id = workflow_id
         self.name = name
@@ -62,6 +67,9 @@ class Workflow(Printable):
         self.factors = []
         self.online = online
         self.monitor = monitor
+        self._plate_executor = None
+        self.plate_executor = plate_executor
+        self._scheduler = None
 
         self._hyperstream = None
 
@@ -87,8 +95,10 @@ class Workflow(Printable):
     def execute(self, time_interval):
         """
         Here we execute the factors over the streams in the workflow
-        Execute the factors in reverse order. We can't just execute the last factor because there may be multiple
-        "leaf" factors that aren't triggered by upstream computations.
+        The factors are executed in dependency order (see WorkflowScheduler), each exactly once, so that upstream data
+        has been calculated before it is needed. Independent factors are executed concurrently if the workflow has a
+        thread plate executor, sharing its workers. With a process plate executor the factors are executed one at a
+        time, so that processes are not forked from several threads at once.
 
         :param time_interval: The time interval to execute this workflow over
         """
@@ -97,14 +107,120 @@ class Workflow(Printable):
         # if not self._hyperstream:
         #     raise ValueError("")
         with WorkflowMonitor(self):
-            # First look for asset writers
-            for factor in self.factors[::-1]:
-                if factor.tool.name == "asset_writer":
-                    factor.execute(time_interval)
+            self.scheduler.execute(time_interval)
 
-            for factor in self.factors[::-1]:
-                if factor.sink is None or factor.sink.is_leaf and factor.tool.name != "asset_writer":
-                    factor.execute(time_interval)
+    @property
+    def scheduler(self):
+        """
+        The scheduler for the factors of this workflow. The dependency graph is built once, and rebuilt if factors are
+        added or the plate executor changes
+
+        :return: The scheduler
+        :rtype: WorkflowScheduler
+        """
+        if self._scheduler is None:
+            if self.plate_executor is not None and self.plate_executor.kind == "thread":
+                max_workers = self.plate_executor.max_workers
+            else:
+                max_workers = 1
+            self._scheduler = WorkflowScheduler(self.factors, max_workers=max_workers)
+            logging.debug("Execution plan for workflow {}: {}".format(self.workflow_id, self._scheduler.plan))
+        return self._scheduler
+
+    @property
+    def execution_plan(self):
+        """
+        The execution plan of the workflow: the waves of factors, and the factors that each one waits for
+
+        :return: List of waves, each a list of dicts
+        """
+        return self.scheduler.plan
+
+    @property
+    def sink_streams(self):
+        """
+        The streams written by the factors of this workflow
+
+        :return: The sink streams
+        """
+        return [stream for factor in self.factors if getattr(factor, 'sink', None) is not None
+                for stream in factor.sink.streams.values()]
+
+    @property
+    def input_streams(self):
+        """
+        The streams read by the factors of this workflow that are not produced within the workflow
+
+        :return: The input streams
+        """
+        produced = set(id(factor) for factor in self.factors)
+        nodes = {}
+        for factor in self.factors:
+            for node in WorkflowScheduler.input_nodes(factor):
+                if node.factor is None or id(node.factor) not in produced:
+                    nodes[node.node_id] = node
+        return [stream for node in nodes.values() for stream in node.streams.values()]
+
+    @staticmethod
+    def _watermark(streams):
+        # The end of the first contiguous calculated interval, so that any gaps (e.g. after a failed execution) are
+        # before the watermark rather than skipped
+        ends = []
+        for stream in streams:
+            calculated_intervals = stream.calculated_intervals
+            if not calculated_intervals:
+                return None
+            ends.append(calculated_intervals[0].end)
+        return min(ends) if ends else None
+
+    @property
+    def watermark(self):
+        """
+        The time up to which all of the sink streams of the workflow have been calculated without gaps, or None if any
+        of them have not been calculated yet
+
+        :return: The watermark
+        :rtype: datetime | None
+        """
+        return self._watermark(self.sink_streams)
+
+    @property
+    def input_watermark(self):
+        """
+        The time up to which all of the input streams of the workflow are available without gaps, or None if this is not
+        known
+        (e.g. for workflows without inputs, or where an input has no calculated intervals)
+
+        :return: The input watermark
+        :rtype: datetime | None
+        """
+        return self._watermark(self.input_streams)
+
+    @property
+    def plate_executor(self):
+        """
+        The executor for the plate values of the factors in this workflow
+
+        :return: The plate executor
+        """
+        return self._plate_executor
+
+    @plate_executor.setter
+    def plate_executor(self, plate_executor):
+        """
+        Set the executor for the plate values of the factors in this workflow
+
+        :param plate_executor: The plate executor, a dict of its parameters, or None to execute serially
+        :type plate_executor: PlateExecutor | dict | None
+        """
+        if isinstance(plate_executor, dict):
+            plate_executor = PlateExecutor(**plate_executor)
+        elif plate_executor is not None and not isinstance(plate_executor, PlateExecutor):
+            raise TypeError("Expected PlateExecutor or dict, got {}".format(type(plate_executor)))
+        self._plate_executor = plate_executor
+        self._scheduler = None
+        for factor in self.factors:
+            factor.plate_executor = plate_executor or PlateExecutor()
 
     def _add_node(self, node):
         """
@@ -125,7 +241,10 @@ class Workflow(Printable):
         :type factor: Factor | MultiOutputFactor | NodeCreationFactor
         :return: None
         """
+        if self.plate_executor is not None:
+            factor.plate_executor = self.plate_executor
         self.factors.append(factor)
+        self._scheduler = None
         logging.info("Added factor with tool {} ".format(factor.tool))
 
     def create_node(self, stream_name, channel, plates):
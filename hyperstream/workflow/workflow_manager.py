@@ -53,30 +53,114 @@ def code_pickler(code):
 copy_reg.pickle(types.CodeType, code_pickler, code_unpickler)
 
 
+class WorkflowDict(FrozenKeyDict):
+    """
+    Dictionary of workflows by id, which also holds an index of workflow definitions that have not yet been loaded from
+    the database. These are loaded when first accessed by id (or when all of the workflows are requested), while
+    membership tests, iteration over ids and the online flags use the index.
+    """
+    def __init__(self, loader):
+        """
+        Initialise the dictionary
+
+        :param loader: Function that loads the workflow with the given id and adds it to this dictionary
+        """
+        super(WorkflowDict, self).__init__()
+        self.loader = loader
+        self.unloaded = {}  # Workflow id -> online flag
+
+    def __missing__(self, workflow_id):
+        if workflow_id not in self.unloaded:
+            raise KeyError(workflow_id)
+        try:
+            self.loader(workflow_id)
+        except (StreamNotFoundError, ToolInitialisationError, ToolNotFoundError, IncompatibleToolError) as e:
+            logging.warn(str(e))
+            self.unloaded.pop(workflow_id, None)
+            raise KeyError(workflow_id)
+        return super(WorkflowDict, self).__getitem__(workflow_id)
+
+    def __contains__(self, workflow_id):
+        return workflow_id in self.unloaded or super(WorkflowDict, self).__contains__(workflow_id)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return super(WorkflowDict, self).__len__() + len(self.unloaded)
+
+    def __delitem__(self, workflow_id):
+        if workflow_id in self.unloaded:
+            del self.unloaded[workflow_id]
+        else:
+            super(WorkflowDict, self).__delitem__(workflow_id)
+
+    def keys(self):
+        return list(super(WorkflowDict, self).keys()) + list(self.unloaded)
+
+    def load_all(self):
+        """
+        Load all of the workflows in the index. Workflows that fail to load are logged and dropped.
+
+        :return: None
+        """
+        for workflow_id in list(self.unloaded):
+            try:
+                self[workflow_id]
+            except KeyError:
+                pass
+
+    def values(self):
+        self.load_all()
+        return super(WorkflowDict, self).values()
+
+    def items(self):
+        self.load_all()
+        return super(WorkflowDict, self).items()
+
+    def is_online(self, workflow_id):
+        """
+        Whether the workflow is online, without loading it
+
+        :param workflow_id: The workflow id
+        :return: The online flag
+        """
+        if workflow_id in self.unloaded:
+            return self.unloaded[workflow_id]
+        return self[workflow_id].online
+
+
 class WorkflowManager(Printable):
     """
     Workflow manager. Responsible for reading and writing workflows to the database, and can execute all of the
     workflows
     """
 
-    def __init__(self, channel_manager, plate_manager):
+    def __init__(self, channel_manager, plate_manager, plate_executor=None, lazy=False):
         """
         Initialise the workflow object
         :param channel_manager: The channel manager
         :param plate_manager: The plate manager
+        :param plate_executor: The default plate executor parameters (kind, max_workers) for workflows that do not set
+        their own
+        :param lazy: Whether to only index the workflow definitions, and load each workflow when it is first accessed
+        (rather than loading all of them now)
+        :type plate_executor: dict | None
+        :type lazy: bool
         """
         self.channel_manager = channel_manager
         self.plate_manager = plate_manager
+        self.plate_executor = plate_executor
 
-        self.workflows = FrozenKeyDict()
+        self.workflows = WorkflowDict(self.load_workflow)
         self.uncommitted_workflows = set()
 
         with switch_db(WorkflowDefinitionModel, db_alias='hyperstream'):
-            for workflow_definition in WorkflowDefinitionModel.objects():
-                try:
-                    self.load_workflow(workflow_definition.workflow_id)
-                except (StreamNotFoundError, ToolInitialisationError, ToolNotFoundError, IncompatibleToolError) as e:
-                    logging.warn(str(e))
+            for workflow_definition in WorkflowDefinitionModel.objects.only('workflow_id', 'online'):
+                self.workflows.unloaded[workflow_definition.workflow_id] = workflow_definition.online
+
+        if not lazy:
+            self.workflows.load_all()
 
     def load_workflow(self, workflow_id):
         """
@@ -113,7 +197,9 @@ class WorkflowManager(Printable):
 
                 parameters = Tool.parameters_from_model(f.tool.parameters)
                 # tool = dict(name=f.tool.name, parameters=parameters)
-                tool = self.channel_manager.get_tool(f.tool.name, parameters, version=None)
+                # Workflows are loaded with the tool versions they were committed with (0.0.0 means unknown)
+                version = f.tool.version if f.tool.version != "0.0.0" else None
+                tool = self.channel_manager.get_tool(f.tool.name, parameters, version=version)
 
                 if f.factor_type == "Factor":
                     if len(sink_nodes) != 1:
@@ -187,6 +273,7 @@ class WorkflowManager(Printable):
                 else:
                     raise NotImplementedError("Unsupported factor type {}".format(f.factor_type))
 
+            self.workflows.unloaded.pop(workflow_id, None)
             self.add_workflow(workflow, False)
             return workflow
 
@@ -202,6 +289,9 @@ class WorkflowManager(Printable):
         if workflow.workflow_id in self.workflows:
             raise KeyError("Workflow with id {} already exists".format(workflow.workflow_id))
 
+        if workflow.plate_executor is None and self.plate_executor is not None:
+            workflow.plate_executor = self.plate_executor
+
         self.workflows[workflow.workflow_id] = workflow
         logging.info("Added workflow {} to workflow manager".format(workflow.workflow_id))
 
@@ -352,7 +442,7 @@ class WorkflowManager(Printable):
         Execute all workflows
         """
         for workflow_id in self.workflows:
-            if self.workflows[workflow_id].online:
+            if self.workflows.is_online(workflow_id):
                 for interval in self.workflows[workflow_id].requested_intervals:
                     logging.info("Executing workflow {} over interval {}".format(workflow_id, interval))
                     self.workflows[workflow_id].execute(interval)
@@ -379,5 +469,5 @@ class WorkflowManager(Printable):
         :type requested_intervals: TimeIntervals
         """
         for workflow_id in self.workflows:
-            if self.workflows[workflow_id].online:
+            if self.workflows.is_online(workflow_id):
                 self.workflows[workflow_id].requested_intervals = requested_intervals
@@ -21,7 +21,8 @@
 import unittest
 import sys
 
-from hyperstream import Stream, StreamId, TimeInterval, StreamAlreadyExistsError, StreamNotFoundError
+from hyperstream import Stream, StreamId, StreamInstance, TimeInterval, TimeIntervals, \
+    StreamAlreadyExistsError, StreamNotFoundError, ToolNotFoundError
 from hyperstream.utils import MIN_DATE, utcnow
 from .helpers import *
 
@@ -36,6 +37,205 @@ class TestChannels(unittest.TestCase):
             M.purge_stream(sid, remove_definition=True)
             self.assertRaises(StreamNotFoundError, M.find_stream, name=sid.name)
 
+    def test_stream_instance(self):
+        from hyperstream.stream import StreamInstance as SI
+        # Timestamps are normalised to millisecond precision
+        self.assertEqual(SI(t1 + timedelta(microseconds=1999), 1).timestamp, t1 + timedelta(milliseconds=1))
+        self.assertRaises(ValueError, SI, "not a date", 1)
+
+        # Timestamps up to the last clock reading do not read the clock again
+        SI._now = t2
+        SI(t1, 1)
+        self.assertEqual(SI._now, t2)
+
+        # Later timestamps read the clock, so future timestamps are still rejected
+        SI(t2 + second, 1)
+        self.assertGreater(SI._now, t2)
+        self.assertRaises(ValueError, SI, utcnow() + hour, 1)
+        self.assertRaises(ValueError, SI, SI._now + hour, 1)
+
+        # The trusted constructor skips the validation
+        instance = SI.from_normalised(t1, 1)
+        self.assertIsInstance(instance, SI)
+        self.assertEqual(instance, SI(t1, 1))
+
+        # Batches keep the order of their input, aligned timestamps are used as they are and others are normalised
+        aligned = t1 + 2 * second
+        batch = SI.from_arrays([aligned, t1 + timedelta(microseconds=1999), t1], [1, 2, 3])
+        self.assertListEqual(batch, [SI(aligned, 1), SI(t1 + timedelta(milliseconds=1), 2), SI(t1, 3)])
+        self.assertTrue(all(isinstance(instance, SI) for instance in batch))
+        self.assertIs(batch[0].timestamp, aligned)
+        self.assertGreater(SI._now, t2)
+        self.assertListEqual(SI.from_arrays([], []), [])
+
+        # A future timestamp anywhere in the batch is rejected
+        self.assertRaises(ValueError, SI.from_arrays, [t1, utcnow() + hour, t2], [1, 2, 3])
+        self.assertRaises(ValueError, SI.from_arrays, [t1, "not a date"], [1, 2])
+        self.assertRaises(ValueError, SI.from_arrays, [t1, t2], [1])
+
+    def test_stream_id(self):
+        a = StreamId("stream_id", (("resident", "1"), ("house", "1")))
+        b = StreamId("stream_id", [("house", "1"), ("resident", "1")])
+        self.assertEqual(a, b)
+        self.assertEqual(hash(a), hash(b))
+        self.assertNotEqual(a, StreamId("stream_id", (("house", "1"),)))
+        self.assertEqual(a.as_dict(), dict(name="stream_id", meta_data=(("resident", "1"), ("house", "1"))))
+        self.assertRaises(AttributeError, setattr, a, "meta_data", ())
+        self.assertIs(a.intern(), b.intern())
+
+    def test_lazy_stream_registry(self):
+        from hyperstream.channels.channel_manager import ChannelManager
+        with HyperStream(file_logger=False, console_logger=False, mqtt_logger=None) as hs:
+            sid = StreamId(sys._getframe().f_code.co_name)
+            stream = hs.channel_manager.mongo.get_or_create_stream(sid)
+            stream.writer(StreamInstance(t1 + second, 1))
+            stream.calculated_intervals = TimeIntervals([TimeInterval(t1, t1 + minute)])
+
+            channel_manager = ChannelManager(hs.config.plugins)
+            streams = channel_manager.mongo.streams
+            self.assertIn(sid, streams)
+            pending = streams.num_pending
+            self.assertGreater(pending, 0)
+
+            # The stream is only constructed (and its calculated intervals read) when accessed
+            stream.calculated_intervals = TimeIntervals([TimeInterval(t1, t1 + 2 * minute)])
+            loaded = streams[sid]
+            self.assertEqual(streams.num_pending, pending - 1)
+            self.assertEqual(loaded, stream)
+            self.assertEqual(loaded.calculated_intervals, stream.calculated_intervals)
+            self.assertListEqual(loaded.window().items(), [StreamInstance(t1 + second, 1)])
+            hs.channel_manager.mongo.purge_stream(sid, remove_definition=True)
+
+    def test_database_channel_batched_writes(self):
+        from mongoengine import NotUniqueError, ValidationError
+        from mongoengine.context_managers import switch_db
+        from hyperstream.channels import DatabaseChannel
+        from hyperstream.models import StreamInstanceModel
+
+        with HyperStream(file_logger=False, console_logger=False, mqtt_logger=None) as hs:
+            D = DatabaseChannel("mongo", write_batch_size=3)
+            sid = StreamId(sys._getframe().f_code.co_name)
+            stream = D.create_stream(sid)
+
+            def count():
+                with switch_db(StreamInstanceModel, 'hyperstream'):
+                    return StreamInstanceModel.objects(__raw__=sid.as_raw()).count()
+
+            try:
+                # Written in batches of three, with the remainder buffered until the stream is flushed
+                instances = [StreamInstance(t1 + i * second, i) for i in range(5)]
+                writer = stream.writer
+                for instance in instances:
+                    writer(instance)
+                self.assertEqual(count(), 3)
+                stream.flush()
+                self.assertEqual(count(), 5)
+
+                # Duplicates of existing documents are reconciled, but conflicting values raise an error
+                stream.writer(instances[:3])
+                stream.flush()
+                self.assertEqual(count(), 5)
+                stream.writer([StreamInstance(t1, 99), StreamInstance(t1 + 10 * second, 10)])
+                self.assertRaises(NotUniqueError, stream.flush)
+                self.assertEqual(count(), 6)
+
+                # The failed batch stays buffered, so it is not lost
+                self.assertEqual(len(D._write_buffers[sid]), 2)
+                self.assertRaises(NotUniqueError, stream.flush)
+                D._write_buffers.pop(sid)
+
+                # Documents are validated before the bulk insert. When a batch fails, it and the batches after it
+                # stay buffered, and are written by the next flush once the problem has been fixed
+                documents = [StreamInstance(t1 + (20 + i) * second, i) for i in range(9)]
+                documents[4] = ("not a date", 4)
+                self.assertRaises(ValidationError, stream.writer, documents)
+                self.assertEqual(count(), 9)
+                self.assertListEqual(D._write_buffers[sid], documents[3:])
+                D._write_buffers[sid][1] = StreamInstance(t1 + 24 * second, 4)
+                stream.flush()
+                self.assertEqual(count(), 15)
+                self.assertNotIn(sid, D._write_buffers)
+
+                # The buffered documents are written before the calculated intervals are advanced
+                sink = D.create_stream(StreamId(sid.name + "_sink"))
+                counts = []
+                save_calculated_intervals = sink.save_calculated_intervals
+
+                def save():
+                    with switch_db(StreamInstanceModel, 'hyperstream'):
+                        counts.append(StreamInstanceModel.objects(__raw__=sink.stream_id.as_raw()).count())
+                    save_calculated_intervals()
+
+                sink.save_calculated_intervals = save
+                D.write_batch_size = 1000
+                hs.tools.clock().execute(sources=[], sink=sink, interval=TimeInterval(t1, t1 + 10 * second))
+                self.assertListEqual(counts, [10])
+                self.assertEqual(sink.calculated_intervals, TimeIntervals([TimeInterval(t1, t1 + 10 * second)]))
+                D.purge_stream(sink.stream_id, remove_definition=True)
+            finally:
+                D.purge_stream(sid, remove_definition=True)
+
+    def test_database_stream_calculated_intervals(self):
+        from mongoengine.context_managers import switch_db
+        from hyperstream.channels import DatabaseChannel
+        from hyperstream.models import StreamDefinitionModel
+
+        def stored(stream_id):
+            with switch_db(StreamDefinitionModel, 'hyperstream'):
+                return StreamDefinitionModel.objects.get(__raw__=stream_id.as_raw())
+
+        with HyperStream(file_logger=False, console_logger=False, mqtt_logger=None) as hs:
+            D = DatabaseChannel("mongo", coalesce_calculated_intervals=True)
+            sid = StreamId(sys._getframe().f_code.co_name)
+            workflow_id = sid.name
+            stream = D.create_stream(sid)
+            try:
+                # Changes to other fields of the definition are not overwritten by the update
+                with switch_db(StreamDefinitionModel, 'hyperstream'):
+                    StreamDefinitionModel.objects(pk=stream.mongo_model.pk).update_one(set__last_updated=t2)
+
+                # Updates are only kept in memory until the stream is flushed
+                stream.calculated_intervals += TimeInterval(t1, t1 + minute)
+                stream.calculated_intervals += TimeInterval(t1 + minute, t1 + hour)
+                self.assertEqual(stream.calculated_intervals, TimeIntervals([TimeInterval(t1, t1 + hour)]))
+                self.assertEqual(len(stream.mongo_model.calculated_intervals), 0)
+                self.assertEqual(stored(sid).get_calculated_intervals(), TimeIntervals())
+
+                stream.flush()
+                self.assertEqual(stored(sid).get_calculated_intervals(), TimeIntervals([TimeInterval(t1, t1 + hour)]))
+                self.assertEqual(stored(sid).last_updated.replace(tzinfo=UTC), t2)
+
+                # Factors flush their sinks at the end of their execution
+                with hs.create_workflow(workflow_id=workflow_id, name=workflow_id, owner="tests",
+                                        description="Coalesced calculated intervals") as w:
+                    ticker = w.create_node(stream_name=workflow_id + "_ticker", channel=D, plates=None)
+                    w.create_factor(hs.tools.clock(), sources=[], sink=ticker)
+                w.execute(TimeInterval(t1, t1 + minute))
+                sink = ticker.streams[None]
+                self.assertEqual(stored(sink.stream_id).get_calculated_intervals(),
+                                 TimeIntervals([TimeInterval(t1, t1 + minute)]))
+                D.purge_stream(sink.stream_id, remove_definition=True)
+            finally:
+                hs.workflow_manager.delete_workflow(workflow_id)
+                D.purge_stream(sid, remove_definition=True)
+
+    def test_array_memory_channel(self):
+        from hyperstream.channels import MemoryChannel, ArrayMemoryChannel
+        M = MemoryChannel("memory")
+        A = ArrayMemoryChannel("array_memory")
+        sid = StreamId(sys._getframe().f_code.co_name)
+        m = M.create_stream(sid)
+        a = A.create_stream(sid)
+        start = datetime(2017, 1, 1, tzinfo=UTC)
+        # Out of order, with repeats
+        for i in [5, 1, 9, 3, 7, 2, 8, 4, 6, 0, 5, 1]:
+            instance = StreamInstance(start + timedelta(seconds=i), float(i))
+            m.writer(instance)
+            a.writer(instance)
+        ti = TimeInterval(start + timedelta(seconds=2), start + timedelta(seconds=7))
+        self.assertListEqual(M.get_results(m, ti), A.get_results(a, ti))
+        self.assertRaises(KeyError, a.writer, StreamInstance(start, 1.0))
+
     def test_tool_channel(self):
         with HyperStream(file_logger=False, console_logger=False, mqtt_logger=None) as hs:
             T = hs.channel_manager.tools
@@ -78,6 +278,47 @@ class TestChannels(unittest.TestCase):
 
             self.assertListEqual(ticker_old.window().values(), ticker_new.window().values())
 
+    def test_tool_cache(self):
+        with HyperStream(file_logger=False, console_logger=False, mqtt_logger=None) as hs:
+            T = hs.channel_manager.tools
+            clock_class = hs.channel_manager.get_tool_class("clock")
+            entry = T.tool_cache[(StreamId("clock"), None, None)]
+            self.assertIs(entry["tool_class"], clock_class)
+
+            # Resolved from the cache, with the argument specification cached on first use
+            hs.channel_manager.get_tool("clock", dict(first=MIN_DATE))
+            self.assertIs(T.tool_cache[(StreamId("clock"), None, None)], entry)
+            self.assertIsNotNone(entry["arg_spec"])
+
+            # Changing the tool directory invalidates the entry
+            path = os.path.join(T.path, "clock")
+            stat = os.stat(path)
+            try:
+                os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+                hs.channel_manager.get_tool_class("clock")
+                self.assertIsNot(T.tool_cache[(StreamId("clock"), None, None)], entry)
+            finally:
+                os.utime(path, (stat.st_atime, stat.st_mtime))
+
+    def test_tool_versions(self):
+        with HyperStream(file_logger=False, console_logger=False, mqtt_logger=None) as hs:
+            T = hs.channel_manager.tools
+
+            self.assertEqual(str(T.find_tool("clock").version), "0.1.0")
+            self.assertEqual(T.find_tool("clock", version="0.0.1").timestamp, datetime(2016, 7, 11, 12, 9, tzinfo=UTC))
+            self.assertEqual(str(T.find_tool("clock", as_of=datetime(2016, 8, 1, tzinfo=UTC)).version), "0.0.1")
+            self.assertIsNone(T.find_tool("clock", as_of=datetime(2016, 1, 1, tzinfo=UTC)))
+            self.assertIsNone(T.find_tool("clock", version="9.9.9"))
+
+            # Pinned versions
+            old_clock = hs.channel_manager.get_tool_class("clock", version="0.0.1")
+            self.assertEqual(old_clock.version, "0.0.1")
+            self.assertEqual(hs.channel_manager.get_tool_class("clock").version, "0.1.0")
+            clock = hs.channel_manager.get_tool("clock", dict(first=MIN_DATE), version="0.0.1")
+            self.assertIsInstance(clock, old_clock)
+            self.assertEqual(clock.get_model().version, "0.0.1")
+            self.assertRaises(ToolNotFoundError, hs.channel_manager.get_tool, "clock", None, version="9.9.9")
+
     def test_plugins(self):
         with HyperStream(file_logger=False, console_logger=False, mqtt_logger=None) as hs:
             M = hs.channel_manager.memory
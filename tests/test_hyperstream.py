@@ -51,6 +51,13 @@ class HyperStreamTests(unittest.TestCase):
     def test___str__(self):
         self.assertIs(type(self.hs.__str__()), str)
 
+    def test_startup_profile(self):
+        profile = self.hs.startup_profile
+        self.assertListEqual(list(profile['phases']), [
+            'logger', 'config', 'client', 'channel_manager', 'plate_manager', 'workflow_manager', 'tools'])
+        self.assertAlmostEqual(profile['total'], sum(profile['phases'].values()))
+        self.assertGreater(profile['counts']['streams'], 0)
+
     def test_create_workflow(self):
         workflow_id = 1
         name = 'test_workflow'
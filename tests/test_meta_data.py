@@ -21,6 +21,7 @@
 
 import unittest
 
+from hyperstream.plate import Plate
 from .helpers import *
 
 
@@ -44,6 +45,26 @@ class TestMetaData(unittest.TestCase):
             self.assertListEqual(sorted(hs.plate_manager.plates["T1"].values), expected)
             delete_plate(hs, "T1")  # note this now deletes meta data as well
 
+    def test_overlapping_plate_values(self):
+        house = Plate("H", "house", [[("house", "1")], [("house", "2")]])
+        location = Plate("H.L", "location", [
+            [("house", "1"), ("location", "hallway")],
+            [("house", "1"), ("location", "kitchen")],
+            [("house", "2"), ("location", "bed")]], house)
+        scripted = Plate("H.S", "scripted", [[("house", "1"), ("scripted", "15")]], house)
+
+        self.assertListEqual(location.ancestor_plate_ids, ["H", "H.L"])
+        self.assertListEqual(Plate.get_overlapping_values([location, scripted]), [
+            (("house", "1"), ("location", "hallway"), ("scripted", "15")),
+            (("house", "1"), ("location", "kitchen"), ("scripted", "15"))])
+        self.assertListEqual(Plate.get_overlapping_values([house, location]), location.values)
+
+        # The values are cached until the plate is invalidated
+        values = Plate.get_overlapping_values([location, scripted])
+        self.assertIs(Plate.get_overlapping_values([location, scripted]), values)
+        location.invalidate_cache()
+        self.assertIsNot(Plate.get_overlapping_values([location, scripted]), values)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -91,3 +91,21 @@ class SessionTests(unittest.TestCase):
         assert (len(hs.sessions) == 1)
         assert hs.sessions[0].end is not None
         assert not hs.sessions[0].active
+
+    def test_history_timestamps(self):
+        from hyperstream.utils import utcnow
+        with HyperStream(file_logger=False, console_logger=False, mqtt_logger=None) as hs:
+            session = hs.current_session
+            n = len(session.history)
+            for i in range(20):
+                session.write_to_history(tool="test_history_timestamps", index=i)
+            timestamps = [item.timestamp for item in session.history[n:]]
+            self.assertEqual(len(timestamps), 20)
+            self.assertListEqual(timestamps, sorted(set(timestamps)))
+
+            # An entry whose timestamp is allocated ahead of the clock (as in a burst of entries) is only written once
+            # the clock has reached it
+            last = session._last_history_timestamp = utcnow() + timedelta(milliseconds=50)
+            session.write_to_history(tool="test_history_timestamps", index=20)
+            self.assertEqual(session.history[-1].timestamp, last + session.history_resolution)
+            self.assertLessEqual(session.history[-1].timestamp, utcnow())
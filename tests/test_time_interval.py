@@ -19,6 +19,7 @@
 #  OR OTHER DEALINGS IN THE SOFTWARE.
 
 import unittest
+import warnings
 
 from hyperstream import TimeIntervals, RelativeTimeInterval, TimeInterval
 from .helpers import *
@@ -61,6 +62,87 @@ class HyperStreamTimeIntervalTests(unittest.TestCase):
         # print(d)
         # print()
 
+        # Operands are left unchanged
+        assert (len(i1) == 2 and len(i2) == 1)
+
+        assert (i1 & i2 == TimeIntervals(intervals=[TimeInterval(start=datetime(2016, 1, 1, 0, 30),
+                                                                  end=datetime(2016, 1, 1, 1, 0)),
+                                                     TimeInterval(start=datetime(2016, 1, 1, 2, 0),
+                                                                  end=datetime(2016, 1, 1, 2, 30))]))
+
+    def test_time_intervals_normalised(self):
+        # Unsorted, overlapping and touching intervals are sorted and merged on construction
+        i = TimeIntervals([
+            TimeInterval(now + 2 * hour, now + 3 * hour),
+            TimeInterval(now, now + hour),
+            TimeInterval(now + 30 * minute, now + 90 * minute),
+            TimeInterval(now + 3 * hour, now + 4 * hour),
+        ])
+        assert (i == TimeIntervals([TimeInterval(now, now + 90 * minute),
+                                    TimeInterval(now + 2 * hour, now + 4 * hour)]))
+        assert (i.span == TimeInterval(now, now + 4 * hour))
+        assert (i - i == TimeIntervals())
+        assert (i + TimeInterval(now + 90 * minute, now + 2 * hour) == TimeIntervals([(now, now + 4 * hour)]))
+
+    def test_time_intervals_tail(self):
+        gaps = TimeIntervals([TimeInterval(now + 2 * k * minute, now + (2 * k + 1) * minute) for k in range(10)])
+        last = gaps[-1]
+
+        # Touching, overlapping and contained intervals only change the last interval
+        extended = gaps + TimeInterval(last.end, last.end + minute)
+        self.assertEqual(len(extended), 10)
+        self.assertEqual(extended[-1], TimeInterval(last.start, last.end + minute))
+        self.assertTupleEqual(extended.intervals[:-1], gaps.intervals[:-1])
+        self.assertEqual(gaps + TimeInterval(last.start + second, last.end - second), gaps)
+        self.assertEqual(gaps + TimeIntervals([TimeInterval(last.start, last.end + minute),
+                                               TimeInterval(last.end + 2 * minute, last.end + 3 * minute)]),
+                         TimeIntervals(list(gaps)[:-1] + [TimeInterval(last.start, last.end + minute),
+                                                          TimeInterval(last.end + 2 * minute, last.end + 3 * minute)]))
+
+        # Contiguous appends
+        calculated = TimeIntervals()
+        for k in range(10):
+            calculated += TimeInterval(now + k * minute, now + (k + 1) * minute)
+        self.assertEqual(calculated, TimeIntervals([TimeInterval(now, now + 10 * minute)]))
+
+        # Setting the end points is deprecated, but still validates them, and does not change the sets built from it
+        interval = TimeInterval(now, now + minute)
+        added = calculated + interval
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            interval.end = now + hour
+            interval.start = now + 30 * minute
+            self.assertListEqual([x.category for x in w], [DeprecationWarning] * 2)
+        self.assertEqual(interval, TimeInterval(now + 30 * minute, now + hour))
+        self.assertEqual(interval.width, 30 * minute)
+        self.assertEqual(added, TimeIntervals([TimeInterval(now, now + 10 * minute)]))
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            self.assertRaises(ValueError, setattr, interval, "start", now + 2 * hour)
+
+            relative = RelativeTimeInterval(-10, 0)
+            relative.start = -5
+            self.assertEqual(relative.start, -5)
+            self.assertRaises(ValueError, setattr, relative, "end", 5)
+
+    def test_normalisation(self):
+        from hyperstream.utils import remove_microseconds
+        ts = datetime(2016, 1, 1, 0, 0, 0, 123000, UTC)
+        self.assertIs(remove_microseconds(ts), ts)
+
+        # Sub-millisecond precision is truncated, and naive datetimes are taken to be UTC
+        self.assertEqual(remove_microseconds(datetime(2016, 1, 1, 0, 0, 0, 123999, UTC)), ts)
+        self.assertEqual(remove_microseconds(datetime(2016, 1, 1, 0, 0, 0, 123456)), ts)
+        self.assertIs(remove_microseconds(datetime(2016, 1, 1, 0, 0, 0, 123456)).tzinfo, UTC)
+
+        # The validating constructor normalises, the trusted one does not
+        start = datetime(2016, 1, 1, 0, 0, 0, 999, UTC)
+        self.assertEqual(TimeInterval(start, start + hour).start, datetime(2016, 1, 1, tzinfo=UTC))
+        trusted = TimeInterval.from_normalised(ts, ts + hour)
+        self.assertEqual(trusted, TimeInterval(ts, ts + hour))
+        self.assertIs(trusted.start, ts)
+        self.assertEqual(trusted.width, hour)
+
     def test_relative_time_interval(self):
         # TODO ... write some tests here
         r1 = RelativeTimeInterval(-30 * second, zero)
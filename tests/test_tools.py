@@ -21,7 +21,7 @@
 import unittest
 import sys
 
-from hyperstream import TimeInterval
+from hyperstream import TimeInterval, StreamInstance
 from hyperstream.utils import datetime2unix
 from .helpers import *
 
@@ -369,6 +369,395 @@ class TestTools(unittest.TestCase):
                 list(map(sum, zip(gauss.window().values(), custom.window().values())))
             )
 
+    def test_tool_fingerprint(self):
+        with HyperStream(file_logger=False, console_logger=False, mqtt_logger=None) as hs:
+            first = hs.tools.apply(func=lambda x: x + 1)
+            second = hs.tools.apply(func=lambda x: x + 1)
+            self.assertEqual(first.fingerprint, second.fingerprint)
+            self.assertEqual(first, second)
+            self.assertEqual(len({first, second}), 1)
+
+            first.func = lambda x: x + 2
+            self.assertNotEqual(first, second)
+            self.assertNotEqual(first.fingerprint, hs.tools.apply(func=lambda x: x + 3).fingerprint)
+
+    def test_fingerprint(self):
+        import types
+        from hyperstream.utils import fingerprint
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+
+        if np is not None:
+            # Arrays are fingerprinted on all of their data, not on their (truncated) repr
+            a = np.zeros(10000)
+            b = a.copy()
+            b[5000] = 1
+            self.assertEqual(fingerprint(dict(a=a)), fingerprint(dict(a=a.copy())))
+            self.assertNotEqual(fingerprint(a), fingerprint(b))
+            self.assertNotEqual(fingerprint(a), fingerprint(a.astype(np.float32)))
+            self.assertNotEqual(fingerprint(a), fingerprint(a.reshape(100, 100)))
+
+        # The values of the globals that functions reference are included
+        def scaled(scale):
+            return types.FunctionType((lambda x: x * factor).__code__, dict(factor=scale))
+        self.assertEqual(fingerprint(scaled(2)), fingerprint(scaled(2)))
+        self.assertNotEqual(fingerprint(scaled(2)), fingerprint(scaled(3)))
+
+        # Self-referencing closures and empty closure cells
+        def recursive():
+            def f(x):
+                return f(x - 1) if x else 0
+            return f
+
+        def empty():
+            def g():
+                return value
+            fp = fingerprint(g)
+            value = 1
+            return fp
+
+        self.assertEqual(fingerprint(recursive()), fingerprint(recursive()))
+        self.assertEqual(empty(), empty())
+        with HyperStream(file_logger=False, console_logger=False, mqtt_logger=None) as hs:
+            self.assertEqual(hs.tools.apply(func=recursive()), hs.tools.apply(func=recursive()))
+            self.assertEqual(len({hs.tools.apply(func=recursive()), hs.tools.apply(func=scaled(2))}), 2)
+
+    def test_aggregate(self):
+        with HyperStream(file_logger=False, console_logger=False, mqtt_logger=None) as hs:
+            ti = TimeInterval(t1, t1 + minute)
+            M = hs.channel_manager.memory
+
+            # Streams with partially overlapping timestamps
+            sources = []
+            for i, step in enumerate((1, 2, 3)):
+                source = M.get_or_create_stream("aggregate_source_{}".format(i))
+                for j in range(0, 60, step):
+                    source.writer(StreamInstance(t1 + (j + 1) * second, step))
+                source.calculated_intervals = ti
+                sources.append(source)
+
+            aggregated = M.get_or_create_stream("aggregated")
+            hs.tools.aggregate(func=sum, aggregation_meta_data="test").execute(
+                sources=sources, sink=aggregated, interval=ti)
+
+            expected = [(t1 + (j + 1) * second, sum(step for step in (1, 2, 3) if j % step == 0)) for j in range(60)]
+            self.assertListEqual(aggregated.window(ti).items(), [StreamInstance(*x) for x in expected])
+
+    def test_plate_executor(self):
+        from hyperstream.factor import PlateExecutor
+        with HyperStream(file_logger=False, console_logger=False, mqtt_logger=None) as hs:
+            ti = TimeInterval(t1, t1 + minute)
+            M = hs.channel_manager.memory
+
+            sources = []
+            for i in range(4):
+                source = M.get_or_create_stream("plate_executor_source_{}".format(i))
+                for j in range(60):
+                    source.writer(StreamInstance(t1 + (j + 1) * second, i * j))
+                source.calculated_intervals = ti
+                sources.append(source)
+
+            def run(kind, func):
+                sinks = [M.get_or_create_stream("plate_executor_{}_{}".format(kind, i)) for i in range(len(sources))]
+                tasks = [dict(sources=[source], sink=sink, interval=ti, alignment_stream=None)
+                         for source, sink in zip(sources, sinks)]
+                PlateExecutor(kind, max_workers=2).execute(hs.tools.apply(func=func), tasks)
+                return [sink.window(ti).items() for sink in sinks]
+
+            # The same results are written, along with a history entry for each plate value
+            history = len(hs.current_session.history)
+            expected = run("serial", lambda x: x + 1)
+            self.assertEqual(len(expected[3]), 60)
+            self.assertEqual(expected[3][-1], StreamInstance(t1 + minute, 3 * 59 + 1))
+            for kind in ("thread", "process"):
+                self.assertListEqual(run(kind, lambda x: x + 1), expected)
+            entries = hs.current_session.history[history:]
+            self.assertEqual(len(entries), 3 * len(sources))
+            self.assertEqual(len(set(entry.timestamp for entry in entries)), len(entries))
+
+            # Errors raised in the workers reach the caller
+            def fail(x):
+                raise ValueError(x)
+
+            for kind in PlateExecutor.kinds:
+                self.assertRaises(ValueError, run, kind + "_error", fail)
+
+    def test_multi_output_routing(self):
+        import logging
+        from hyperstream import StreamId, MultiOutputTool
+
+        class Recorder(logging.Handler):
+            def __init__(self):
+                logging.Handler.__init__(self)
+                self.messages = []
+
+            def emit(self, record):
+                self.messages.append(record.getMessage())
+
+        with HyperStream(file_logger=False, console_logger=False, mqtt_logger=None) as hs:
+            ti = TimeInterval(t1, t1 + minute)
+            M = hs.channel_manager.memory
+            name = sys._getframe().f_code.co_name
+
+            source = M.get_or_create_stream(StreamId(name, (("home", "0"), )))
+            for j in range(60):
+                source.writer(StreamInstance(t1 + (j + 1) * second, dict(house=str(j % 3), value=j)))
+            source.calculated_intervals = ti
+
+            # The sinks are on the same input plate value as the source, and there is no sink for house 2
+            sinks = [M.get_or_create_stream(StreamId(name + "_sink", (("home", "0"), ("house", house))))
+                     for house in ("0", "1")]
+            sink_index, parent_meta_data = MultiOutputTool.index_sinks(sinks, "house")
+            self.assertEqual(parent_meta_data, frozenset([("home", "0")]))
+            self.assertIs(MultiOutputTool.find_sink(sink_index, parent_meta_data, (("house", "1"), )), sinks[1])
+            self.assertIs(MultiOutputTool.find_sink(sink_index, parent_meta_data, (("home", "0"), ("house", "0"))),
+                          sinks[0])
+            self.assertIsNone(MultiOutputTool.find_sink(sink_index, parent_meta_data, (("home", "1"), ("house", "0"))))
+            self.assertRaises(TypeError, MultiOutputTool.find_sink, sink_index, parent_meta_data, (("house", []), ))
+
+            recorder = Recorder()
+            logging.getLogger().addHandler(recorder)
+            try:
+                splitter = hs.tools.splitter(element="house", mapping=dict((h, h) for h in ("0", "1", "2")))
+                splitter.execute(source=source, splitting_stream=None, sinks=sinks, interval=ti, meta_data_id="house",
+                                 output_plate_values=[(("house", "0"), ), (("house", "1"), )])
+            finally:
+                logging.getLogger().removeHandler(recorder)
+
+            for house, sink in enumerate(sinks):
+                self.assertListEqual(sink.window(ti).values(), [dict(value=j) for j in range(house, 60, 3)])
+            self.assertEqual(len([m for m in recorder.messages if "does not belong to the output plate" in m]), 20)
+
+    def test_window_tool_versions(self):
+        with HyperStream(file_logger=False, console_logger=False, mqtt_logger=None) as hs:
+            ti = TimeInterval(t1, t1 + minute)
+            M = hs.channel_manager.memory
+            C = hs.channel_manager
+
+            ticker = M.get_or_create_stream("window_tool_versions_ticker")
+            hs.tools.clock().execute(sources=[], sink=ticker, interval=ti)
+
+            # The latest versions only skip revalidating the windows, so the results are those of v0.1.0
+            results = []
+            for version in ("0.1.0", "0.1.1"):
+                windows = M.get_or_create_stream("window_tool_versions_sliding_{}".format(version))
+                C.get_tool("sliding_window", dict(lower=-10.0, upper=0.0, increment=5.0), version=version).execute(
+                    sources=[], sink=windows, interval=ti)
+                aligned = M.get_or_create_stream("window_tool_versions_aligning_{}".format(version))
+                C.get_tool("aligning_window", dict(lower=-2.5, upper=0.0), version=version).execute(
+                    sources=[ticker], sink=aligned, interval=ti)
+                results.append((windows.window(ti).items(), aligned.window(ti).items()))
+
+            self.assertEqual(len(results[0][0]), 11)
+            self.assertEqual(len(results[0][1]), 60)
+            self.assertEqual(results[0], results[1])
+
+    def test_aligned_merge_versions(self):
+        with HyperStream(file_logger=False, console_logger=False, mqtt_logger=None) as hs:
+            ti = TimeInterval(t1, t1 + minute)
+            M = hs.channel_manager.memory
+            C = hs.channel_manager
+            name = sys._getframe().f_code.co_name
+
+            # Each stream is missing different timestamps, and they start and end at different times
+            missing = [{3, 10, 11, 12}, {0, 1, 10, 30}, {20, 21, 50, 58, 59}]
+            sources = []
+            for i, gaps in enumerate(missing):
+                source = M.get_or_create_stream("{}_{}".format(name, i))
+                for j in range(60):
+                    if j not in gaps:
+                        source.writer(StreamInstance(t1 + (j + 1) * second, i * 100 + j))
+                source.calculated_intervals = ti
+                sources.append(source)
+            empty = M.get_or_create_stream(name + "_empty")
+            empty.calculated_intervals = ti
+
+            def merge(version, parameters, streams, case):
+                sink = M.get_or_create_stream("{}_{}_{}".format(name, version, case))
+                C.get_tool("aligned_merge", parameters, version=version).execute(
+                    sources=streams, sink=sink, interval=ti, alignment_stream=None)
+                return sink.window(ti).items()
+
+            expected = [StreamInstance(t1 + (j + 1) * second, (j, 100 + j, 200 + j))
+                        for j in range(60) if not any(j in gaps for gaps in missing)]
+            cases = [
+                (dict(), sources, expected),
+                (dict(names=["a", "b", "c"]), sources,
+                 [StreamInstance(t, dict(zip("abc", v))) for t, v in expected]),
+                (dict(), list(reversed(sources)), [StreamInstance(t, tuple(reversed(v))) for t, v in expected]),
+                (dict(), sources[:1], [StreamInstance(t1 + (j + 1) * second, (j, )) for j in range(60)
+                                       if j not in missing[0]]),
+                (dict(), sources + [empty], []),
+            ]
+            for case, (parameters, streams, result) in enumerate(cases):
+                self.assertListEqual(merge("0.1.2", parameters, streams, case), result)
+                self.assertListEqual(merge("0.2.0", parameters, streams, case), result)
+
+    def test_sliding_window_buffer(self):
+        from hyperstream.itertools2 import SlidingWindowBuffer, online_average, online_variance
+        values = [3, 1, 4, 1, 5, 9, 2, 6, 5, 3]
+        data = [StreamInstance(t1 + (i + 1) * second, v) for i, v in enumerate(values)]
+        window = SlidingWindowBuffer(data, aggregators=dict(sum="sum", count="count", min="min", max="max",
+                                                            mean="mean", variance="variance"))
+
+        for i in range(len(values)):
+            window.update(t1 + (i - 2) * second, t1 + (i + 1) * second)
+            expected = values[max(i - 2, 0):i + 1]
+            self.assertListEqual(window.values(), expected)
+            aggregates = window.aggregates
+            self.assertAlmostEqual(aggregates.pop("mean"), online_average(expected))
+            if len(expected) > 1:
+                self.assertAlmostEqual(aggregates.pop("variance"), online_variance(expected))
+            else:
+                aggregates.pop("variance")
+            self.assertDictEqual(aggregates, dict(
+                sum=sum(expected), count=len(expected), min=min(expected), max=max(expected)))
+
+    def test_make_window_aggregator(self):
+        from hyperstream.itertools2 import SlidingWindowBuffer, WindowSum, make_window_aggregator
+
+        class Last(object):
+            # Not a WindowAggregator, and the value is an attribute rather than a property
+            def __init__(self):
+                self.items = []
+                self.value = None
+
+            def add(self, value):
+                self.items.append(value)
+                self.value = value
+
+            def remove(self, value):
+                self.items.pop(0)
+                self.value = self.items[-1] if self.items else None
+
+        data = [StreamInstance(t1 + (i + 1) * second, i) for i in range(5)]
+        shared = WindowSum()
+        for aggregator in ("sum", WindowSum, shared, Last, Last()):
+            first = make_window_aggregator(aggregator)
+            self.assertIsNot(first, make_window_aggregator(aggregator))
+            self.assertIsNot(first, aggregator)
+
+            # Windows built from the same aggregator do not share its state
+            windows = [SlidingWindowBuffer(data, aggregators=dict(a=aggregator)) for _ in range(2)]
+            windows[0].update(t1, t1 + 3 * second)
+            windows[1].update(t1, t1 + 5 * second)
+            expected = (3, 10) if aggregator in ("sum", WindowSum, shared) else (2, 4)
+            self.assertTupleEqual(tuple(w.aggregates["a"] for w in windows), expected)
+        self.assertEqual(shared.value, 0)
+
+        self.assertRaises(ValueError, make_window_aggregator, "median")
+        self.assertRaises(ValueError, make_window_aggregator, ["sum"])
+        self.assertRaises(TypeError, make_window_aggregator, lambda: 0)
+
+    def test_sliding_aggregate(self):
+        with HyperStream(file_logger=False, console_logger=False, mqtt_logger=None) as hs:
+            from hyperstream.itertools2 import online_sum, online_variance
+            ti = TimeInterval(t1, t1 + minute)
+            M = hs.channel_manager.memory
+
+            ticker = M.get_or_create_stream("ticker")
+            hs.tools.clock().execute(sources=[], sink=ticker, interval=ti)
+            gauss = rng_helper(hs, ticker, ti, "gauss", seed=1234)
+
+            windows = M.get_or_create_stream("sliding_aggregate_windows")
+            hs.tools.sliding_window(lower=-10.0, upper=0.0, increment=5.0).execute(
+                sources=[], sink=windows, interval=ti)
+
+            applied = M.get_or_create_stream("sliding_aggregate_applied")
+            hs.tools.sliding_apply(func=lambda data: [x.value for x in data]).execute(
+                sources=[windows, gauss], sink=applied, interval=ti)
+
+            aggregated = M.get_or_create_stream("sliding_aggregate_aggregated")
+            hs.tools.sliding_aggregate(aggregators=dict(sum="sum", variance="variance", max="max")).execute(
+                sources=[windows, gauss], sink=aggregated, interval=ti)
+
+            applied = dict(applied.window().items())
+            self.assertGreater(len(applied), 0)
+            for timestamp, d in aggregated.window().items():
+                values = applied.get(timestamp, [])
+                self.assertAlmostEqual(d['sum'], online_sum(values))
+                if len(values) > 1:
+                    self.assertAlmostEqual(d['variance'], online_variance(values))
+                self.assertEqual(d['max'], max(values) if values else None)
+
+    def test_statistics(self):
+        import random
+        from hyperstream.utils import histogram, percentile
+        from hyperstream.utils.statistics.histogram import histogram_python, histogram_numpy, np
+        from hyperstream.utils.statistics.percentile import percentile_values_python, percentile_values_numpy
+
+        # Known values
+        a = [0, 1, 1, 2, 3, 3, 3, 4, 5, 5.5, 6, 10]
+        bins = [0, 2, 4, 6]
+        for counts in (histogram(a, bins)[0], histogram_python(a, bins)):
+            self.assertIsInstance(counts, list)
+            self.assertListEqual(counts, [3, 4, 1])
+        self.assertRaises(ValueError, histogram, a, [0, 2, 1])
+
+        q = [0, 20, 50, 80, 100]
+        r = percentile([[10, 7, 4], [3, 2, 1]], q)
+        self.assertIsInstance(r, list)
+        self.assertListEqual(r, [1.0, 2.0, 3.5, 7.0, 10.0])
+        self.assertListEqual(q, [0, 20, 50, 80, 100])
+        self.assertEqual(percentile(list(range(40)), 25), 9.75)
+        self.assertIsNone(percentile([], 50))
+        self.assertRaises(ValueError, percentile, a, [50, 101])
+        nested = [[5, 1], [4, [2, 3]]]
+        self.assertEqual(percentile(nested, 50), 3.0)
+        self.assertListEqual(percentile_values_python(["a", "c", "b"], [0., 1.]),
+                             [(0., 0, 0, ("a", "a")), (2., 2, 2, ("c", "c"))])
+
+        if np is None:
+            return
+
+        # The numpy and pure python implementations agree
+        self.assertIsInstance(histogram_numpy(a, bins), list)
+        self.assertListEqual(histogram_numpy(a, bins), [3, 4, 1])
+        rng = random.Random(1234)
+        qq = [0., 0.01, 0.25, 0.5, 0.75, 0.99, 1.]
+        for data in ([rng.gauss(0, 1) for _ in range(1001)], [rng.randint(0, 10) for _ in range(100)], [3], 4.5, []):
+            self.assertListEqual(histogram_numpy(data, [-1, 0, 0.5, 1, 5]), histogram_python(data, [-1, 0, 0.5, 1, 5]))
+            if isinstance(data, list) and data:
+                self.assertListEqual(percentile_values_numpy(data, qq), percentile_values_python(data, qq))
+
+        # Data that is not an array of numbers is left to the pure python implementations
+        self.assertIsNone(percentile_values_numpy(nested, qq))
+        self.assertIsNone(histogram_numpy(["a", "b"], bins))
+        self.assertIsNone(percentile_values_numpy(["a", "b"], qq))
+
+    def test_quantile_sketch(self):
+        with HyperStream(file_logger=False, console_logger=False, mqtt_logger=None) as hs:
+            from hyperstream.utils import percentile, merge_quantile_sketches
+            ti = TimeInterval(t1, t1 + minute)
+            M = hs.channel_manager.memory
+
+            ticker = M.get_or_create_stream("ticker")
+            hs.tools.clock().execute(sources=[], sink=ticker, interval=ti)
+            gauss = rng_helper(hs, ticker, ti, "gauss", seed=1234)
+
+            windows = M.get_or_create_stream("quantile_sketch_windows")
+            hs.tools.sliding_window(lower=-20.0, upper=0.0, increment=10.0).execute(
+                sources=[], sink=windows, interval=ti)
+
+            listified = M.get_or_create_stream("quantile_sketch_listified")
+            hs.tools.sliding_listify().execute(sources=[windows, gauss], sink=listified, interval=ti)
+
+            sketched = M.get_or_create_stream("quantile_sketch_sketched")
+            hs.tools.quantile_sketch(percentiles=[5, 50, 95]).execute(
+                sources=[windows, gauss], sink=sketched, interval=ti)
+
+            # Small windows are summarised exactly
+            self.assertListEqual(sketched.window().timestamps(), listified.window().timestamps())
+            for values, d in zip(listified.window().values(), sketched.window().values()):
+                for estimate, exact in zip(d['values'], percentile(values, [5, 50, 95])):
+                    self.assertAlmostEqual(estimate, exact)
+
+            merged = merge_quantile_sketches(sketched.window().values())
+            self.assertEqual(merged['sketch']['min'], min(gauss.window().values()))
+            self.assertEqual(merged['sketch']['max'], max(gauss.window().values()))
+
     def test_data_importers(self):
         with HyperStream(file_logger=False, console_logger=False, mqtt_logger=None) as hs:
             reader = hs.plugins.data_importers.tools.csv_reader('plugins/data_importers/data/sea_ice.csv')
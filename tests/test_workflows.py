@@ -26,7 +26,8 @@ import sys
 import unittest
 import simplejson as json
 
-from hyperstream import TimeInterval, IncompatiblePlatesError
+from hyperstream import TimeInterval, TimeIntervals, IncompatiblePlatesError
+from hyperstream.online_engine import OnlineEngine
 from .helpers import *
 
 W_DICT = {
@@ -126,6 +127,53 @@ class HyperStreamWorkflowTests(unittest.TestCase):
         # And then reload it
         hs.workflow_manager.load_workflow(workflow_id)
 
+    def test_lazy_workflow_manager(self):
+        from hyperstream.workflow import WorkflowManager
+        hs = HyperStream(file_logger=False, console_logger=False, mqtt_logger=None)
+        workflow_id = sys._getframe().f_code.co_name
+
+        hs.workflow_manager.delete_workflow(workflow_id)
+        basic_workflow(hs, workflow_id)
+        hs.workflow_manager.commit_workflow(workflow_id)
+
+        # The workflow definition is only indexed until it is accessed
+        manager = WorkflowManager(channel_manager=hs.channel_manager, plate_manager=hs.plate_manager, lazy=True)
+        self.assertIn(workflow_id, manager.workflows)
+        self.assertIn(workflow_id, manager.workflows.unloaded)
+        self.assertFalse(manager.workflows.is_online(workflow_id))
+
+        w = manager.workflows[workflow_id]
+        self.assertNotIn(workflow_id, manager.workflows.unloaded)
+        self.assertListEqual(sorted(w.nodes), sorted(hs.workflow_manager.workflows[workflow_id].nodes))
+        hs.workflow_manager.delete_workflow(workflow_id)
+
+    def test_save_sliding_aggregate_workflow(self):
+        hs = HyperStream(file_logger=False, console_logger=False, mqtt_logger=None)
+        workflow_id = sys._getframe().f_code.co_name
+        hs.workflow_manager.delete_workflow(workflow_id)
+
+        # Only the names of the built in aggregators are accepted, since other aggregators cannot be committed
+        self.assertRaises(ValueError, hs.tools.sliding_aggregate, aggregators="median")
+        self.assertRaises(ValueError, hs.tools.sliding_aggregate, aggregators=dict(total=lambda: 0))
+
+        M = hs.channel_manager.memory
+        with hs.create_workflow(workflow_id=workflow_id, **get_workflow_parameters()) as w:
+            ticker = w.create_node("ticker", M, None)
+            windows = w.create_node("sliding_aggregate_windows", M, None)
+            aggregated = w.create_node("sliding_aggregate_aggregated", M, None)
+            w.create_factor(hs.tools.clock(), sources=[], sink=ticker)
+            w.create_factor(hs.tools.sliding_window(lower=-10.0, upper=0.0, increment=5.0), sources=[], sink=windows)
+            tool = hs.tools.sliding_aggregate(aggregators=dict(total="sum", variance="variance"))
+            w.create_factor(tool, sources=[windows, ticker], sink=aggregated)
+
+        hs.workflow_manager.commit_workflow(workflow_id)
+        del hs.workflow_manager.workflows[workflow_id]
+        w = hs.workflow_manager.load_workflow(workflow_id)
+
+        self.assertEqual(w.factors[-1].tool, tool)
+        self.assertDictEqual(w.factors[-1].tool.aggregators, dict(total="sum", variance="variance"))
+        hs.workflow_manager.delete_workflow(workflow_id)
+
     def test_new_api(self):
         hs = HyperStream(file_logger=False, console_logger=False, mqtt_logger=None)
         workflow_id = sys._getframe().f_code.co_name
@@ -253,5 +301,140 @@ class HyperStreamWorkflowTests(unittest.TestCase):
 
             assert_dict_equal(json.loads(j), W_VIZ)
 
+    def test_online_engine_watermarks(self):
+        hs = HyperStream(file_logger=False, console_logger=False, mqtt_logger=None)
+        workflow_id = sys._getframe().f_code.co_name
+
+        # First delete the workflow if it's there
+        hs.workflow_manager.delete_workflow(workflow_id)
+
+        with hs.create_workflow(workflow_id=workflow_id, online=True, **get_workflow_parameters(" online")) as w:
+            ticker = w.create_node("online_ticker", hs.channel_manager.memory, None)
+            w.create_factor(hs.tools.clock(), sources=[], sink=ticker)
+
+        # Only execute this workflow, not the other online workflows in the database
+        engine = OnlineEngine(hs, workflow_ids=[workflow_id])
+        self.assertListEqual([workflow.workflow_id for workflow in engine.online_workflows], [workflow_id])
+        self.assertIsNone(w.watermark)
+
+        time_interval = TimeInterval(t1, t1 + minute)
+        self.assertEqual(engine.get_workflow_interval(w, time_interval), time_interval)
+        self.assertIn(workflow_id, engine.execute_tick(time_interval))
+        self.assertEqual(w.watermark, t1 + minute)
+
+        # Nothing new to calculate
+        self.assertIsNone(engine.get_workflow_interval(w, time_interval))
+        self.assertNotIn(workflow_id, engine.execute_tick(time_interval))
+
+        # Only the new slice is calculated
+        time_interval = TimeInterval(t1 + second, t1 + 2 * minute)
+        self.assertEqual(engine.get_workflow_interval(w, time_interval), TimeInterval(t1 + minute, t1 + 2 * minute))
+        engine.execute_tick(time_interval)
+        self.assertEqual(w.watermark, t1 + 2 * minute)
+        self.assertEqual(len(ticker.streams[None].window(TimeInterval(t1, t1 + 2 * minute)).items()), 120)
+
+        # A backlog is executed over several ticks
+        engine.max_catch_up = minute
+        time_interval = TimeInterval(t1, t1 + 5 * minute)
+        self.assertEqual(engine.get_workflow_interval(w, time_interval, engine.max_catch_up),
+                         TimeInterval(t1 + 2 * minute, t1 + 3 * minute))
+        engine.execute_tick(time_interval)
+        self.assertEqual(w.watermark, t1 + 3 * minute)
+        engine.execute_tick(time_interval)
+        engine.execute_tick(time_interval)
+        self.assertEqual(w.watermark, t1 + 5 * minute)
+        self.assertListEqual(engine.execute_tick(time_interval), [])
+
+        # A gap (e.g. from a failed execution) is calculated rather than skipped
+        stream = ticker.streams[None]
+        stream.calculated_intervals = TimeIntervals([TimeInterval(t1, t1 + 2 * minute),
+                                                     TimeInterval(t1 + 3 * minute, t1 + 5 * minute)])
+        self.assertEqual(w.watermark, t1 + 2 * minute)
+        time_interval = TimeInterval(t1 + 4 * minute, t1 + 5 * minute)
+        self.assertEqual(engine.get_workflow_interval(w, time_interval, engine.max_catch_up),
+                         TimeInterval(t1 + 2 * minute, t1 + 3 * minute))
+        self.assertListEqual(engine.execute_tick(time_interval), [workflow_id])
+        self.assertEqual(stream.calculated_intervals, TimeIntervals([TimeInterval(t1, t1 + 5 * minute)]))
+        self.assertEqual(w.watermark, t1 + 5 * minute)
+
+        hs.workflow_manager.delete_workflow(workflow_id)
+
+    def test_workflow_scheduler(self):
+        import threading
+        import time
+        from hyperstream.factor import PlateExecutor, limit_workers
+
+        hs = HyperStream(file_logger=False, console_logger=False, mqtt_logger=None)
+        workflow_id = sys._getframe().f_code.co_name
+        M = hs.channel_manager.memory
+
+        # First delete the workflow if it's there
+        hs.workflow_manager.delete_workflow(workflow_id)
+
+        with hs.create_workflow(workflow_id=workflow_id, plate_executor=dict(kind="thread", max_workers=4),
+                                **get_workflow_parameters(" scheduled")) as w:
+            nodes = dict((name, w.create_node(workflow_id + "_" + name, M, None)) for name in "tabc")
+            # Defined out of order: c depends on a, which depends on t
+            factor_c = w.create_factor(hs.tools.apply(func=lambda x: x), sources=[nodes["a"]], sink=nodes["c"])
+            w.create_factor(hs.tools.apply(func=lambda x: x), sources=[nodes["t"]], sink=nodes["a"])
+            w.create_factor(hs.tools.apply(func=lambda x: x), sources=[nodes["t"]], sink=nodes["b"])
+            w.create_factor(hs.tools.clock(), sources=[], sink=nodes["t"])
+
+        plan = w.execution_plan
+        self.assertListEqual([[f["sink"] for f in wave] for wave in plan],
+                             [[workflow_id + "_t"], [workflow_id + "_a", workflow_id + "_b"], [workflow_id + "_c"]])
+        self.assertListEqual([after["reason"] for after in plan[2][0]["after"]],
+                             ["produces node {}_a".format(workflow_id)])
+        self.assertEqual(w.scheduler.max_workers, 4)
+
+        time_interval = TimeInterval(t1, t1 + minute)
+        w.execute(time_interval)
+        for name in "tabc":
+            self.assertEqual(len(nodes[name].streams[None].window(time_interval).items()), 60)
+
+        # Waves are executed serially with process pools, and the plate workers are limited within a wave
+        w.plate_executor = dict(kind="process", max_workers=4)
+        self.assertEqual(w.scheduler.max_workers, 1)
+        self.assertEqual(PlateExecutor("thread", max_workers=8).workers(10), 8)
+        with limit_workers(2):
+            self.assertEqual(PlateExecutor("thread", max_workers=8).workers(10), 2)
+
+        # A factor is only executed by one thread at a time
+        active = []
+        overlaps = []
+        execute = factor_c.tool.execute
+
+        def tracked_execute(**kwargs):
+            active.append(1)
+            overlaps.append(len(active))
+            time.sleep(0.05)
+            active.pop()
+            return execute(**kwargs)
+
+        factor_c.tool.execute = tracked_execute
+        time_interval = TimeInterval(t1 + minute, t1 + 2 * minute)
+        threads = [threading.Thread(target=factor_c.execute, args=(time_interval, )) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertListEqual(overlaps, [1, 1, 1])
+
+        hs.workflow_manager.delete_workflow(workflow_id)
+
+    def test_streams_for_plate_value(self):
+        from hyperstream.node import Node
+        from hyperstream.stream import Stream, StreamId
+
+        keys = [(('house', h), ('resident', r), ('sensor', s)) for h in "12" for r in "12" for s in "abc"]
+        streams = dict((key, Stream(None, StreamId("node_index", key), None, None)) for key in keys)
+        node = Node(None, "node_index", streams, None)
+
+        for pv in [(('house', '1'),), (('resident', '2'), ('house', '1')), (('sensor', 'c'),), ()]:
+            expected = [streams[s] for s in streams if all([v in s for v in pv])]
+            self.assertListEqual(node.streams_for_plate_value(pv), expected)
+        self.assertListEqual(node.streams_for_plate_value((('house', '3'),)), [])
+
+
 if __name__ == '__main__':
     unittest.main()